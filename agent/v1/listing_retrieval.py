@@ -0,0 +1,381 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.v2.tools.listing_index import ListingIndex, get_listing_index
+from utility.env import env_int, env_str
+from utility.tokens import count_tokens
+from utility.units import METRES_PER_FOOT, SQFT_PER_ACRE, SQFT_PER_SQM, amount_suffix_pattern, parse_amount
+
+logger = logging.getLogger(__name__)
+
+# business_nature keywords -> ListingFilter categories
+BUSINESS_CATEGORIES: List[Tuple[Tuple[str, ...], List[str]]] = [
+    (('warehouse', 'logistic', 'storage', 'distribution', '3pl', 'e-commerce', 'ecommerce', 'cold room', 'fulfil'),
+     ['warehouse']),
+    (('factory', 'manufactur', 'production', 'assembly', 'plant', 'fabricat', 'processing', 'workshop'),
+     ['factory', 'detached-factory', 'semi-d-factory', 'terrace-factory', 'cluster-factory']),
+    (('land', 'yard', 'open storage', 'container depot'), ['industrial-land']),
+    (('showroom', 'car', 'automotive', 'dealer'), ['showroom', 'car-showroom']),
+    (('shop', 'retail', 'office'), ['shoplot']),
+    (('agri', 'farm', 'plantation'), ['agricultural-land']),
+]
+
+_AMOUNT_RE = re.compile(r"(\d+(?:,\d{3})*(?:\.\d+)?)\s*(" + amount_suffix_pattern() + r")?(?![a-z])", re.I)
+_NUMBER_RE = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?")
+
+_MIN_WORDS = ('at least', 'min', 'above', 'over', 'more than', 'from', 'starting', '>')
+_MAX_WORDS = ('under', 'below', 'max', 'up to', 'less than', 'within', 'not more than', 'budget', '<')
+
+Bounds = Tuple[Optional[float], Optional[float]]
+
+
+def _amounts(text: str) -> List[float]:
+    return [parse_amount(number, suffix) for number, suffix in _AMOUNT_RE.findall(text)]
+
+
+def _numbers(text: str) -> List[float]:
+    return [float(n.replace(',', '')) for n in _NUMBER_RE.findall(text)]
+
+
+def _bounds(text: str, values: List[float], default: str) -> Optional[Bounds]:
+    """(min, max) for a free-text requirement; ``default`` applies to a bare number."""
+
+    if not values:
+        return None
+    lowered = text.lower()
+    if len(values) >= 2:
+        return min(values[:2]), max(values[:2])
+    value = values[0]
+    if any(word in lowered for word in _MAX_WORDS):
+        return None, value
+    if any(word in lowered for word in _MIN_WORDS):
+        return value, None
+    if default == 'max':
+        return None, value
+    if default == 'min':
+        return value, None
+    # "around 10,000 sqft"
+    return value * 0.8, value * 1.25
+
+
+def _scale(bounds: Optional[Bounds], factor: float) -> Optional[Bounds]:
+    if bounds is None:
+        return None
+    low, high = bounds
+    return (low * factor if low is not None else None, high * factor if high is not None else None)
+
+
+def parse_preferences(preferences: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Planner ``Preference`` strings -> ListingFilter plus soft-only requirements.
+
+    Returns ``{"filters": ListingFilter, "floor_loading": bounds | None}``;
+    anything that cannot be parsed is left out rather than guessed.
+    """
+
+    preferences = {k: v for k, v in (preferences or {}).items() if isinstance(v, str) and v.strip()}
+    filters: Dict[str, Any] = {}
+
+    buy_rent = preferences.get('buy_rent', '').lower()
+    if buy_rent in {'buy', 'sale', 'purchase'}:
+        filters['offer_type'] = 'sale'
+    elif buy_rent == 'rent':
+        filters['offer_type'] = 'rent'
+
+    if 'location' in preferences:
+        terms = [t.strip() for t in re.split(r",|/|\bor\b", preferences['location']) if t.strip()]
+        if terms:
+            filters['location'] = terms
+
+    nature = preferences.get('business_nature', '').lower()
+    categories = [c for keywords, cats in BUSINESS_CATEGORIES if any(k in nature for k in keywords) for c in cats]
+    if categories:
+        filters['category'] = list(dict.fromkeys(categories))
+
+    size = preferences.get('size')
+    if size:
+        lowered = size.lower()
+        bounds = _bounds(size, _numbers(size), 'around')
+        if 'acre' in lowered:
+            bounds = _scale(bounds, SQFT_PER_ACRE)
+        elif 'sqm' in lowered or 'square met' in lowered or 'm2' in lowered:
+            bounds = _scale(bounds, SQFT_PER_SQM)
+        field = 'land_size' if 'land' in lowered or 'acre' in lowered else 'built_up_size'
+        _set_bounds(filters, field, bounds)
+
+    budget = preferences.get('budget')
+    if budget:
+        _set_bounds(filters, 'price', _bounds(budget, _amounts(budget), 'max'))
+
+    power = preferences.get('power_requirement')
+    if power:
+        bounds = _bounds(power, _numbers(power), 'min')
+        if 'mva' in power.lower():
+            bounds = _scale(bounds, 1000.0)
+        _set_bounds(filters, 'power_supply', bounds)
+
+    height = preferences.get('ceiling_height')
+    if height:
+        bounds = _bounds(height, _numbers(height), 'min')
+        if re.search(r"\d\s*(ft|feet|')", height.lower()):
+            bounds = _scale(bounds, METRES_PER_FOOT)
+        _set_bounds(filters, 'ceiling_height', bounds)
+
+    loading = preferences.get('floor_loading_capacity')
+    floor_loading = _bounds(loading, _numbers(loading), 'min') if loading else None
+    if floor_loading and 'kn' in loading.lower():
+        floor_loading = _scale(floor_loading, 1 / 9.81)
+
+    return {'filters': filters, 'floor_loading': floor_loading}
+
+
+def _set_bounds(filters: Dict[str, Any], field: str, bounds: Optional[Bounds]) -> None:
+    if bounds is None:
+        return
+    low, high = bounds
+    if low is not None:
+        filters[f'min_{field}'] = low
+    if high is not None:
+        filters[f'max_{field}'] = high
+
+
+# ----------------------------
+# Scoring
+# ----------------------------
+
+# Relative importance of each requirement when ranking candidates
+WEIGHTS: Dict[str, float] = {
+    'location': 3.0,
+    'category': 2.0,
+    'price': 2.0,
+    'built_up_size': 1.5,
+    'land_size': 1.5,
+    'power_supply': 1.0,
+    'ceiling_height': 1.0,
+    'floor_loading': 1.0,
+}
+
+# Path of each ranged value in a listing document
+VALUE_PATHS: Dict[str, Tuple[str, ...]] = {
+    'price': ('offer', 'price'),
+    'built_up_size': ('built_up_area', 'value'),
+    'land_size': ('land_size', 'value'),
+    'power_supply': ('power_supply', 'value'),
+    'ceiling_height': ('ceiling_height', 'value'),
+    'floor_loading': ('floor_loading', 'value'),
+}
+
+# Credit for a listing that does not state the value at all
+UNKNOWN_CREDIT = 0.3
+
+
+def _value(doc: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    value: Any = doc
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def range_credit(value: Optional[float], bounds: Bounds) -> float:
+    """1 inside the range, decaying linearly with the relative miss outside it."""
+
+    if value is None:
+        return UNKNOWN_CREDIT
+    low, high = bounds
+    if low is not None and value < low:
+        return max(0.0, 1.0 - (low - value) / low) if low else 0.0
+    if high is not None and value > high:
+        return max(0.0, 1.0 - (value - high) / high) if high else 0.0
+    return 1.0
+
+
+def _categories(doc: Dict[str, Any]) -> set:
+    categories = set(doc.get('sub_categories') or [])
+    if doc.get('main_category'):
+        categories.add(doc['main_category'])
+    return categories
+
+
+def shortlist(
+    parsed: Dict[str, Any],
+    top_k: int,
+    index: Optional[ListingIndex] = None,
+) -> Tuple[List[Tuple[float, Dict[str, Any]]], int]:
+    """Top-``top_k`` (score, document) pairs and the size of the catalog scored.
+
+    Only the offer type is a hard filter; every other requirement adds
+    partial credit, so near misses still surface when nothing fits exactly.
+    """
+
+    if index is None:
+        index = get_listing_index()
+    filters = parsed['filters']
+    hard = {'offer_type': filters['offer_type']} if 'offer_type' in filters else {}
+    documents = index.search_documents(hard)
+
+    ranges: Dict[str, Bounds] = {}
+    for field in VALUE_PATHS:
+        if f'min_{field}' in filters or f'max_{field}' in filters:
+            ranges[field] = (filters.get(f'min_{field}'), filters.get(f'max_{field}'))
+    if parsed.get('floor_loading'):
+        ranges['floor_loading'] = parsed['floor_loading']
+
+    location_scores: Dict[str, float] = {}
+    for term in filters.get('location', []):
+        for property_id, score in index.resolve_location(term):
+            location_scores[property_id] = max(score, location_scores.get(property_id, 0.0))
+
+    wanted_categories = set(filters.get('category', []))
+    total_weight = sum(WEIGHTS[f] for f in ranges)
+    total_weight += WEIGHTS['location'] if 'location' in filters else 0.0
+    total_weight += WEIGHTS['category'] if wanted_categories else 0.0
+
+    scored = []
+    for doc in documents:
+        score = 0.0
+        if 'location' in filters:
+            score += WEIGHTS['location'] * location_scores.get(doc.get('property_id'), 0.0)
+        if wanted_categories and _categories(doc) & wanted_categories:
+            score += WEIGHTS['category']
+        for field, bounds in ranges.items():
+            score += WEIGHTS[field] * range_credit(_value(doc, VALUE_PATHS[field]), bounds)
+        scored.append((score / total_weight if total_weight else 0.0, doc))
+
+    # Best score first, then the most recently updated listing
+    scored.sort(key=lambda item: str(item[1].get('last_updated') or ''), reverse=True)
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:top_k], len(documents)
+
+
+# ----------------------------
+# Compact rendering
+# ----------------------------
+
+CANDIDATE_COLUMNS = (
+    'property_id', 'source', 'location', 'category', 'offer_type', 'asking_price',
+    'built_up_area_sqft', 'land_area_sqft', 'power_capacity_kva',
+    'floor_loading_ton_per_sqm', 'clear_height_m',
+)
+
+
+def _compact(value: Optional[float]) -> str:
+    if value is None:
+        return ''
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def candidate_row(doc: Dict[str, Any]) -> str:
+    location = doc.get('location') or {}
+    address = location.get('address') or {}
+    places = [location.get('industrial_park_name'), address.get('address_locality'), address.get('address_region')]
+    place = ', '.join(dict.fromkeys(p for p in places if p))
+    offer = doc.get('offer') or {}
+    price = _compact(_value(doc, VALUE_PATHS['price']))
+    if price and offer.get('price_currency'):
+        price = f"{offer['price_currency']} {price}"
+    cells = [
+        doc.get('property_id') or '',
+        doc.get('source') or doc.get('slug') or '',
+        place,
+        doc.get('main_category') or '',
+        offer.get('offer_type') or '',
+        price,
+        _compact(_value(doc, VALUE_PATHS['built_up_size'])),
+        _compact(_value(doc, VALUE_PATHS['land_size'])),
+        _compact(_value(doc, VALUE_PATHS['power_supply'])),
+        _compact(_value(doc, VALUE_PATHS['floor_loading'])),
+        _compact(_value(doc, VALUE_PATHS['ceiling_height'])),
+    ]
+    return '|'.join(str(c).replace('|', '/').replace('\n', ' ') for c in cells)
+
+
+def render_candidates(documents: List[Dict[str, Any]], token_budget: int, model: str) -> Tuple[str, int, int]:
+    """Pipe-separated table of as many candidates as fit ``token_budget``.
+
+    Returns (text, tokens, rows rendered). Rows arrive best first, so the
+    ones dropped are always the weakest.
+    """
+
+    lines = ['|'.join(CANDIDATE_COLUMNS)]
+    tokens = count_tokens(lines[0], model)
+    for doc in documents:
+        row = candidate_row(doc)
+        row_tokens = count_tokens(row, model) + 1  # newline
+        if tokens + row_tokens > token_budget:
+            break
+        lines.append(row)
+        tokens += row_tokens
+    return '\n'.join(lines), tokens, len(lines) - 1
+
+
+class CatalogTokenCounter:
+    """Tokens the full catalog would cost in the prompt, counted per listing.
+
+    Counts are memoised by (property_id, last_updated), so after the first
+    lookup only changed listings are re-tokenised.
+    """
+
+    def __init__(self):
+        self._counts: Dict[Tuple[Any, Any], int] = {}
+
+    def count(self, documents: List[Dict[str, Any]], model: str) -> int:
+        total = 0
+        keys = set()
+        for doc in documents:
+            key = (doc.get('property_id'), str(doc.get('last_updated')))
+            keys.add(key)
+            tokens = self._counts.get(key)
+            if tokens is None:
+                tokens = self._counts[key] = count_tokens(str(doc), model)
+            total += tokens
+        if len(self._counts) > 2 * len(keys):
+            self._counts = {k: v for k, v in self._counts.items() if k in keys}
+        return total
+
+
+_catalog_tokens = CatalogTokenCounter()
+
+
+def retrieve_candidates(
+    preferences: Optional[Dict[str, Any]],
+    index: Optional[ListingIndex] = None,
+    baseline: Optional[bool] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Candidate table for the lookup prompt plus stats for the turn.
+
+    Size is controlled by LOOKUP_TOP_K, LOOKUP_TOKEN_BUDGET and
+    LOOKUP_TOKEN_MODEL (the tokenizer used for counting). ``baseline`` adds
+    the full-catalog token cost (``baseline_tokens``/``tokens_saved``); it
+    walks every listing, so by default it is only computed at DEBUG level.
+    """
+
+    if index is None:
+        index = get_listing_index()
+    top_k = env_int("LOOKUP_TOP_K", 20)
+    token_budget = env_int("LOOKUP_TOKEN_BUDGET", 2000)
+    model = env_str("LOOKUP_TOKEN_MODEL", "gpt-4.1")
+
+    parsed = parse_preferences(preferences)
+    ranked, catalog_size = shortlist(parsed, top_k, index)
+    text, prompt_tokens, rendered = render_candidates([doc for _, doc in ranked], token_budget, model)
+
+    stats = {
+        "filters": parsed['filters'],
+        "catalog_size": catalog_size,
+        "candidates": rendered,
+        "top_score": round(ranked[0][0], 3) if ranked else None,
+        "token_budget": token_budget,
+        "prompt_tokens": prompt_tokens,
+    }
+    logger.info("Lookup shortlist: %s/%s listings, %s tokens", rendered, catalog_size, prompt_tokens)
+
+    if baseline if baseline is not None else logger.isEnabledFor(logging.DEBUG):
+        baseline_tokens = _catalog_tokens.count(index.search_documents({}), model)
+        stats["baseline_tokens"] = baseline_tokens
+        stats["tokens_saved"] = max(0, baseline_tokens - prompt_tokens)
+        logger.debug("Lookup shortlist saved %s of %s catalog tokens", stats["tokens_saved"], baseline_tokens)
+    return text, stats
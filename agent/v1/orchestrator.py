@@ -1,6 +1,8 @@
 from schema.schema import OverallState
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from utility.bounded_checkpointer import BoundedMemorySaver
+from utility.checkpointer_init import get_sync_checkpointer
+from utility.env import env_bool, env_float, env_int
 from agent.v1.landy_agent import Landy_Planner
 from agent.v1.property_lookup_agent import Property_Lookup_Agent
 
@@ -11,5 +13,12 @@ builder.add_node("Property_Lookup_Agent", Property_Lookup_Agent)
 builder.add_edge(START, "Landy_Planner")
 builder.add_edge("Property_Lookup_Agent", END)
 
-memory = MemorySaver()
+# Bounded so every state_id ever seen does not stay in process memory
+memory = BoundedMemorySaver(
+    max_threads=env_int("V1_CHECKPOINT_MAX_THREADS", 10_000),
+    max_bytes=env_int("V1_CHECKPOINT_MAX_BYTES", 256 * 1024 * 1024),
+    ttl=env_float("V1_CHECKPOINT_TTL_SECONDS", 3600.0),
+    spill_factory=get_sync_checkpointer if env_bool("V1_CHECKPOINT_SPILL", False) else None,
+    active_window=env_float("V1_CHECKPOINT_ACTIVE_SECONDS", 600.0),
+)
 graph = builder.compile(checkpointer=memory)
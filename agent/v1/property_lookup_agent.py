@@ -4,7 +4,8 @@ from schema.schema import FinalOutput, OverallState
 from langgraph.types import Command
 from langgraph.graph import END
 from utility.llm_init import load_llm
-from utility.property_listing_init import get_property_listing
+from agent.v1.listing_retrieval import retrieve_candidates
+from utility.timing import stage_span
 
 def Property_Lookup_Agent(state: OverallState):
     property_search_prompt = get_property_search_prompt()
@@ -16,9 +17,13 @@ def Property_Lookup_Agent(state: OverallState):
         ]
     )
 
+    # Only a scored, token-budgeted shortlist reaches the model, not the whole catalog
+    with stage_span('retrieval'):
+        candidates, retrieval = retrieve_candidates(state['preferences'])
+
     chain = template | load_llm().with_structured_output(FinalOutput)
     response = chain.invoke({
-        "listing": get_property_listing(),
+        "listing": candidates,
         "user_preferences": state['preferences'],
     })
 
@@ -26,7 +31,8 @@ def Property_Lookup_Agent(state: OverallState):
     return Command(
         update = {
             'graph_output': response['messages'],
-            'recommended_listing': response['recommended_listing']
+            'recommended_listing': response['recommended_listing'],
+            'retrieval': retrieval,
             },
         goto = END
     )
\ No newline at end of file
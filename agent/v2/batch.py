@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agent.v2.filter_extraction import PREFETCH_NODE
+from utility.logging_config import Payload
+
+logger = logging.getLogger(__name__)
+
+
+async def run_turn(agent, message: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one search-agent turn to completion.
+
+    Returns the ``graph_output``, ``preferences`` and ``recommended_listings``
+    fields of the ``/api/v2/invoke`` response.
+    """
+
+    graph_output = ""
+    preferences: Optional[Dict[str, Any]] = None
+    recommended_listings = None
+
+    chunk_count = 0
+    async for chunk in agent.astream({"messages": [{"role": "user", "content": message}]}, config):
+        chunk_count += 1
+        logger.debug("Processing chunk %d: %s", chunk_count, chunk.keys(), extra={"sample": "stream_chunk"})
+
+        # Model (LLM) output
+        if "model" in chunk:
+            messages = chunk["model"].get("messages", [])
+            if messages:
+                graph_output = messages[0].content
+                logger.info("Model output received: %s", Payload(graph_output, max_chars=100))
+
+        # Tool output, from the tool node or the first-turn prefetch
+        elif "tools" in chunk or PREFETCH_NODE in chunk:
+            update = chunk.get("tools") or chunk.get(PREFETCH_NODE) or {}
+            messages = [m for m in update.get("messages", []) if m.type == "tool"]
+            if messages:
+                # Structured results travel as the tool artifact; no re-parse or re-fetch
+                tool_artifact = getattr(messages[0], "artifact", None)
+                if not tool_artifact:
+                    logger.warning("Tool message without artifact: %s", Payload(messages[0].content, max_chars=200))
+                else:
+                    preferences = tool_artifact.get("filters_applied", preferences)
+                    # Facet counts carry no listings; keep the last search's
+                    if "listings" in tool_artifact:
+                        recommended_listings = tool_artifact["listings"]
+                    logger.info("Preferences extracted: %s", Payload(preferences))
+                    logger.info("Found %s listings", tool_artifact.get('listing_count'))
+
+    logger.info("Agent stream completed. Processed %d chunks", chunk_count)
+    return {
+        "graph_output": graph_output,
+        "preferences": preferences,
+        "recommended_listings": recommended_listings,
+    }
+
+
+async def run_batch(
+    items: List[Dict[str, Any]],
+    run_item: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    """Run ``run_item`` for every item, at most ``concurrency`` at a time.
+
+    Results keep the input order. A failing item becomes an ``error`` entry
+    and does not affect the others.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await run_item(item)
+            except Exception as error:
+                logger.exception("Batch item %d (thread %s) failed: %s", index, item.get("thread_id"), error)
+                return {
+                    "index": index,
+                    "thread_id": item.get("thread_id"),
+                    "status": "error",
+                    "error": str(error),
+                    "error_type": type(error).__name__,
+                }
+        return {"index": index, "thread_id": item.get("thread_id"), **result, "status": "success"}
+
+    return list(await asyncio.gather(*(guarded(index, item) for index, item in enumerate(items))))
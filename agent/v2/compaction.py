@@ -0,0 +1,234 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import (
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from typing_extensions import NotRequired
+
+from utility.env import env_int
+from utility.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tools whose calls carry the user's ListingFilter
+FILTER_TOOLS = ("search_listing_property_from_database", "count_listing_facets")
+
+SUMMARY_MESSAGE_ID = "conversation-summary"
+
+# Per-call context sizes kept in state
+MAX_TOKEN_HISTORY = 50
+
+# Earlier user messages quoted in the summary, and how much of each
+SUMMARY_USER_LINES = 12
+SUMMARY_LINE_CHARS = 160
+
+# Overhead per message in the chat format
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class CompactionState(AgentState):
+    # Latest ListingFilter the agent searched with, plus its match count
+    preferences: NotRequired[Optional[Dict[str, Any]]]
+    # Estimated prompt tokens of each model call, most recent last
+    context_tokens: NotRequired[List[int]]
+
+
+def message_tokens(message: AnyMessage) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    tokens = count_tokens(content) + _MESSAGE_OVERHEAD_TOKENS
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(call["name"] + json.dumps(call["args"], default=str))
+    return tokens
+
+
+def _latest_preferences(messages: List[AnyMessage], current: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    call_filters: Dict[str, Any] = {}
+    preferences = current
+    for message in messages:
+        for call in getattr(message, "tool_calls", None) or []:
+            if call["name"] in FILTER_TOOLS:
+                call_filters[call["id"]] = call["args"].get("input", call["args"])
+        if isinstance(message, ToolMessage) and message.tool_call_id in call_filters:
+            artifact = message.artifact if isinstance(message.artifact, dict) else {}
+            preferences = {
+                "filters": call_filters[message.tool_call_id],
+                "listing_count": artifact.get("listing_count", (preferences or {}).get("listing_count")),
+            }
+    return preferences
+
+
+def _tool_summary(message: ToolMessage) -> str:
+    source = message.artifact if isinstance(message.artifact, dict) else None
+    if source is None:
+        try:
+            source = json.loads(message.content)
+        except (TypeError, ValueError):
+            source = None
+    if isinstance(source, dict) and "listing_count" in source:
+        return json.dumps(
+            {"filters_applied": source.get("filters_applied"), "listing_count": source["listing_count"], "stale": True},
+            default=str,
+        )
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    return text[:SUMMARY_LINE_CHARS]
+
+
+def compact_tool_messages(messages: List[AnyMessage]) -> List[ToolMessage]:
+    """Compact replacements for tool results from before the latest user message.
+
+    The model only needs what was searched and how many matched; the full
+    payload (every property_id, inline listings) and the artifact are dropped.
+    """
+
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+    replacements = []
+    for message in messages[:last_human]:
+        if not isinstance(message, ToolMessage) or message.additional_kwargs.get("compacted"):
+            continue
+        replacements.append(ToolMessage(
+            content=_tool_summary(message),
+            tool_call_id=message.tool_call_id,
+            name=message.name,
+            id=message.id,
+            status=message.status,
+            additional_kwargs={"compacted": True},
+        ))
+    return replacements
+
+
+def _turn_starts(messages: List[AnyMessage]) -> List[int]:
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+
+def _summary_text(previous: Optional[str], dropped: List[AnyMessage], preferences: Optional[Dict[str, Any]]) -> str:
+    lines = []
+    if previous:
+        lines.extend(line for line in previous.splitlines() if line.startswith("- "))
+    for message in dropped:
+        if isinstance(message, HumanMessage) and isinstance(message.content, str):
+            text = " ".join(message.content.split())
+            lines.append(f"- {text[:SUMMARY_LINE_CHARS]}")
+    lines = lines[-SUMMARY_USER_LINES:]
+
+    parts = ["Earlier turns of this conversation were compacted. The user previously said:"]
+    parts.extend(lines or ["- (nothing recorded)"])
+    if preferences:
+        parts.append(
+            f"Latest search filters: {json.dumps(preferences.get('filters'), default=str)} "
+            f"({preferences.get('listing_count')} listings)."
+        )
+    return "\n".join(parts)
+
+
+def trim_history(
+    messages: List[AnyMessage],
+    trigger_tokens: int,
+    target_tokens: int,
+    keep_turns: int,
+    preferences: Optional[Dict[str, Any]],
+) -> Optional[List[AnyMessage]]:
+    """New history with the oldest whole turns folded into one summary, or None.
+
+    Turns are cut at user messages only, so tool calls always stay paired
+    with their results.
+    """
+
+    sizes = [message_tokens(m) for m in messages]
+    if sum(sizes) <= trigger_tokens:
+        return None
+
+    starts = _turn_starts(messages)
+    if len(starts) <= keep_turns:
+        return None
+
+    cut = starts[-keep_turns]
+    kept_tokens = sum(sizes[cut:])
+    for start in reversed(starts[:-keep_turns]):
+        extra = sum(sizes[start:cut])
+        if kept_tokens + extra > target_tokens:
+            break
+        cut, kept_tokens = start, kept_tokens + extra
+
+    previous = None
+    dropped = []
+    for message in messages[:cut]:
+        if message.id == SUMMARY_MESSAGE_ID:
+            previous = message.content
+        else:
+            dropped.append(message)
+    if not dropped:
+        return None
+
+    summary = SystemMessage(content=_summary_text(previous, dropped, preferences), id=SUMMARY_MESSAGE_ID)
+    return [summary] + [m for m in messages[cut:] if m.id != SUMMARY_MESSAGE_ID]
+
+
+class ConversationCompactionMiddleware(AgentMiddleware):
+    """Keeps long v2 threads at a bounded size before every model call.
+
+    * tool results from earlier turns become ``{filters_applied, listing_count}``;
+    * past ``trigger_tokens`` the oldest whole turns are folded into one
+      summary message until the history fits ``target_tokens``, keeping at
+      least the last ``keep_turns`` turns;
+    * the latest searched ListingFilter is kept as ``preferences`` state and
+      each call's context size is appended to ``context_tokens``.
+
+    Changes are written back through the message reducer, so the checkpoint
+    shrinks along with the prompt.
+    """
+
+    state_schema = CompactionState
+
+    def __init__(
+        self,
+        trigger_tokens: Optional[int] = None,
+        target_tokens: Optional[int] = None,
+        keep_turns: Optional[int] = None,
+    ):
+        super().__init__()
+        self.trigger_tokens = trigger_tokens if trigger_tokens is not None else env_int("COMPACTION_TRIGGER_TOKENS", 6000)
+        self.target_tokens = target_tokens if target_tokens is not None else env_int("COMPACTION_TARGET_TOKENS", 3000)
+        self.keep_turns = max(1, keep_turns if keep_turns is not None else env_int("COMPACTION_KEEP_TURNS", 2))
+
+    def _compact(self, state: CompactionState) -> Tuple[Dict[str, Any], int]:
+        messages = list(state["messages"])
+        preferences = _latest_preferences(messages, state.get("preferences"))
+        update: Dict[str, Any] = {}
+
+        replacements = {m.id: m for m in compact_tool_messages(messages)}
+        if replacements:
+            messages = [replacements.get(m.id, m) for m in messages]
+
+        trimmed = None
+        if self.trigger_tokens > 0:
+            trimmed = trim_history(messages, self.trigger_tokens, self.target_tokens, self.keep_turns, preferences)
+
+        if trimmed is not None:
+            update["messages"] = [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + trimmed
+            messages = trimmed
+        elif replacements:
+            # Same ids: the reducer swaps them in place
+            update["messages"] = list(replacements.values())
+
+        if preferences != state.get("preferences"):
+            update["preferences"] = preferences
+
+        tokens = sum(message_tokens(m) for m in messages)
+        update["context_tokens"] = (state.get("context_tokens") or [])[-(MAX_TOKEN_HISTORY - 1):] + [tokens]
+        if trimmed is not None:
+            logger.info(f"Compacted conversation to {len(messages)} messages, ~{tokens} tokens")
+        return update, tokens
+
+    def before_model(self, state: CompactionState, runtime) -> Dict[str, Any]:
+        return self._compact(state)[0]
+
+    async def abefore_model(self, state: CompactionState, runtime) -> Dict[str, Any]:
+        return self._compact(state)[0]
@@ -0,0 +1,405 @@
+import logging
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.config import get_config
+
+from agent.v2.compaction import SUMMARY_MESSAGE_ID
+from agent.v2.tools.location_index import LOCATION_ALIASES
+from agent.v2.tools.search_listing_database import TOOL_NAME, search_listing_property_from_database
+from utility.env import env_bool
+from utility.units import AMOUNT_MULTIPLIERS, METRES_PER_FOOT, SQFT_PER_ACRE, amount_suffix_pattern, parse_amount
+
+logger = logging.getLogger(__name__)
+
+# Phrase -> ListingFilter category; longer phrases win over the words they contain
+CATEGORY_PHRASES: Dict[str, str] = {
+    'car showroom': 'car-showroom',
+    'car-showroom': 'car-showroom',
+    'auto showroom': 'car-showroom',
+    'showroom': 'showroom',
+    'shoplot': 'shoplot',
+    'shop lot': 'shoplot',
+    'shophouse': 'shoplot',
+    'shop house': 'shoplot',
+    'agricultural land': 'agricultural-land',
+    'agriculture land': 'agricultural-land',
+    'agri land': 'agricultural-land',
+    'farm land': 'agricultural-land',
+    'farmland': 'agricultural-land',
+    'industrial land': 'industrial-land',
+    'industrial-land': 'industrial-land',
+    'cluster factory': 'cluster-factory',
+    'cluster-factory': 'cluster-factory',
+    'semi-d factory': 'semi-d-factory',
+    'semi d factory': 'semi-d-factory',
+    'semi-detached factory': 'semi-d-factory',
+    'semi detached factory': 'semi-d-factory',
+    'semi-d': 'semi-d-factory',
+    'detached factory': 'detached-factory',
+    'detached-factory': 'detached-factory',
+    'terrace factory': 'terrace-factory',
+    'terraced factory': 'terrace-factory',
+    'terrace-factory': 'terrace-factory',
+    'factory': 'factory',
+    'kilang': 'factory',
+    'warehouse': 'warehouse',
+    'gudang': 'warehouse',
+}
+
+# Places that appear in the catalog but have no alias entry
+EXTRA_LOCATIONS = (
+    'balakong', 'banting', 'beranang', 'brickfields', 'bukit raja', 'bandar enstek', 'enstek',
+    'cheras', 'chan sow lin', 'cyberjaya', 'dengkil', 'glenmarie', 'jenjarom', 'kajang', 'kapar',
+    'kota damansara', 'kuala langat', 'meru', 'nilai', 'olak lempit', 'puncak jalil', 'selesa jaya',
+    'semenyih', 'serenia city', 'seremban', 'sijangkang', 'sungai lalang', 'bandar sunway',
+)
+
+# Wording that would change what a plain filter means; left to the model
+_NEGATION_RE = re.compile(
+    r"\b(?:not(?! more than| less than)|no(?! more than| less than)|except|excluding|exclude|other than"
+    r"|instead of|without|avoid)\b"
+)
+
+_RENT_RE = re.compile(r"\b(?:rent(?:al|ing)?|lease|leasing|to let|tenancy|(?:di)?sewa|per month|monthly|/month|a month)\b|/mo\b")
+_SALE_RE = re.compile(r"\b(?:sale|sell(?:ing)?|buy(?:ing)?|purchase|purchasing|(?:di)?jual|beli)\b")
+
+_TENURE_RE = {
+    'freehold': re.compile(r"\bfree ?hold\b"),
+    'leasehold': re.compile(r"\blease ?hold\b"),
+}
+_MARKET_RE = {
+    'subsales': re.compile(r"\bsub-? ?sales?\b"),
+    'primary': re.compile(r"\b(?:primary|new launch|developer unit)\b"),
+}
+
+_QUANTITY_RE = re.compile(
+    r"""
+    (?<![\w.])
+    (?P<currency>rm|myr)?\s?
+    (?P<number>\d+(?:,\d{3})*(?:\.\d+)?)
+    (?:\s?(?P<multiplier>""" + amount_suffix_pattern(exclude=('m',)) + r""")(?![a-z]))?
+    (?:\s?(?P<unit>sq\.?\s?ft|sqft|sf|square\s(?:feet|foot)|acres?|ac|kva|ft|feet|foot|'|metres?|meters?|m)(?![a-z]))?
+    """,
+    re.VERBOSE,
+)
+
+_MAX_RE = re.compile(
+    r"(?:under|below|bawah|less than|lower than|cheaper than|smaller than|max(?:imum)?|up to|upto|not more than"
+    r"|at most|within|budget(?: of| is| around| about)?|<=?)\s*$"
+)
+_MIN_RE = re.compile(
+    r"(?:above|over|more than|greater than|bigger than|larger than|at least|min(?:imum)?|from|starting(?: from| at)?"
+    r"|no less than|>=?)\s*$"
+)
+_RANGE_START_RE = re.compile(r"between\s*$")
+_RANGE_JOIN_RE = re.compile(r"^\s*(?:-|–|to|and)\s*$")
+# Rates such as "RM3.5 psf" are not a total price
+_RATE_RE = re.compile(r"\s?(?:psf|per\s?sq|/\s?sq)")
+
+_AREA_UNITS = re.compile(r"^(?:sq\.?\s?ft|sqft|sf|square\s(?:feet|foot))$")
+_LENGTH_FEET = ('ft', 'feet', 'foot', "'")
+_LENGTH_METRES = ('m', 'metre', 'metres', 'meter', 'meters')
+
+# Words around a quantity that say which field it measures
+_CEILING_CONTEXT = re.compile(r"ceiling|height|clearance|clear|headroom|eave")
+_AREA_CONTEXT = {
+    'land_size': re.compile(r"\bland\b"),
+    'built_up_size': re.compile(r"\bbuilt|\bbua\b|\bfloor area\b|\bgfa\b"),
+    'office_area': re.compile(r"\boffice\b"),
+}
+_CONTEXT_CHARS = 24
+
+
+@dataclass
+class _Quantity:
+    start: int
+    end: int
+    value: float
+    currency: bool
+    multiplier: Optional[str]
+    unit: Optional[str]
+
+
+@dataclass
+class FilterExtraction:
+    """Outcome of :func:`extract_listing_filter`.
+
+    ``unresolved`` lists the pieces of the message the rules could not place
+    (a bare number, a negation...). The fast path only trusts an extraction
+    that is non-empty and leaves nothing unresolved.
+    """
+
+    filters: Dict[str, Any] = field(default_factory=dict)
+    unresolved: List[str] = field(default_factory=list)
+
+    @property
+    def confident(self) -> bool:
+        return bool(self.filters) and not self.unresolved
+
+
+def _phrase_pattern(phrases) -> re.Pattern:
+    ordered = sorted(phrases, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(p) for p in ordered) + r")s?\b")
+
+
+_CATEGORY_RE = _phrase_pattern(CATEGORY_PHRASES)
+
+
+def _location_gazetteer() -> Dict[str, str]:
+    gazetteer = {place: place for place in EXTRA_LOCATIONS}
+    for canonical, aliases in LOCATION_ALIASES.items():
+        gazetteer[canonical] = canonical
+        for alias in aliases:
+            gazetteer[alias] = canonical
+    return gazetteer
+
+
+_LOCATIONS = _location_gazetteer()
+_LOCATION_RE = _phrase_pattern(_LOCATIONS)
+
+
+def _display_name(place: str) -> str:
+    return 'Kuala Lumpur' if place == 'kuala lumpur' else place.title()
+
+
+def _quantities(text: str) -> List[_Quantity]:
+    quantities = []
+    for match in _QUANTITY_RE.finditer(text):
+        multiplier = match.group('multiplier')
+        unit = match.group('unit')
+        currency = match.group('currency') is not None
+        if currency and unit == 'm' and multiplier is None:
+            # "RM2m" is two million ringgit, not two metres
+            multiplier, unit = 'm', None
+        value = parse_amount(match.group('number'))
+        if unit is None and _RATE_RE.match(text, match.end()):
+            unit = 'rate'
+        quantities.append(_Quantity(match.start(), match.end(), value, currency, multiplier, unit))
+    return quantities
+
+
+def _pair_ranges(text: str, quantities: List[_Quantity]) -> List[Tuple[_Quantity, Optional[_Quantity]]]:
+    """Group "A - B", "A to B" and "between A and B"; the upper end lends its units to the lower."""
+
+    grouped: List[Tuple[_Quantity, Optional[_Quantity]]] = []
+    index = 0
+    while index < len(quantities):
+        low = quantities[index]
+        high = quantities[index + 1] if index + 1 < len(quantities) else None
+        if high is not None and _RANGE_JOIN_RE.match(text[low.end:high.start]):
+            if not low.currency and high.currency:
+                low.currency = True
+            if low.multiplier is None and low.unit is None:
+                low.multiplier = high.multiplier
+            if low.unit is None:
+                low.unit = high.unit
+            grouped.append((low, high))
+            index += 2
+        else:
+            grouped.append((low, None))
+            index += 1
+    return grouped
+
+
+def _direction(text: str, start: int) -> Optional[str]:
+    before = text[max(0, start - _CONTEXT_CHARS):start]
+    if _RANGE_START_RE.search(before):
+        return 'range'
+    if _MAX_RE.search(before):
+        return 'max'
+    if _MIN_RE.search(before):
+        return 'min'
+    return None
+
+
+def _area_field(text: str, quantity: _Quantity, categories: List[str]) -> str:
+    # The nearest of "land" / "built-up" / "office" decides; land categories default to land
+    start = max(0, quantity.start - _CONTEXT_CHARS)
+    window = text[start:quantity.end + _CONTEXT_CHARS]
+    nearest, distance = None, _CONTEXT_CHARS + 1
+    for stem, pattern in _AREA_CONTEXT.items():
+        for match in pattern.finditer(window):
+            gap = max(quantity.start - start - match.end(), match.start() - (quantity.end - start), 0)
+            if gap < distance:
+                nearest, distance = stem, gap
+    if nearest:
+        return nearest
+    if categories and all(c.endswith('-land') for c in categories):
+        return 'land_size'
+    return 'built_up_size'
+
+
+def _field_for(text: str, quantity: _Quantity, categories: List[str]) -> Optional[Tuple[str, float]]:
+    """(field stem, value in stored units) for one quantity, or None when it cannot be placed."""
+
+    window = text[max(0, quantity.start - _CONTEXT_CHARS):quantity.end + _CONTEXT_CHARS]
+    value = quantity.value * AMOUNT_MULTIPLIERS.get(quantity.multiplier or '', 1)
+    unit = quantity.unit
+
+    if unit == 'rate':
+        return None
+    if unit and _AREA_UNITS.match(unit):
+        return _area_field(text, quantity, categories), value
+    if unit in ('acre', 'acres', 'ac'):
+        return 'land_size', value * SQFT_PER_ACRE
+    if unit == 'kva':
+        return 'power_supply', value
+    if unit in _LENGTH_FEET + _LENGTH_METRES:
+        if not _CEILING_CONTEXT.search(window):
+            return None
+        metres = value * METRES_PER_FOOT if unit in _LENGTH_FEET else value
+        return 'ceiling_height', round(metres, 2)
+    if quantity.currency or quantity.multiplier:
+        return 'price', value
+    return None
+
+
+# Which end a requirement with no qualifier sets: budgets are ceilings, needs are floors
+_DEFAULT_DIRECTION = {
+    'price': 'max',
+    'land_size': 'min',
+    'built_up_size': 'min',
+    'office_area': 'min',
+    'power_supply': 'min',
+    'ceiling_height': 'min',
+}
+
+
+def extract_listing_filter(message: str) -> FilterExtraction:
+    """Deterministic ListingFilter for explicit requests.
+
+    Covers offer type, tenure, market status, categories, prices (RM/MYR with
+    k/mil/juta suffixes), sizes in sqft or acres, kVA, ceiling heights in ft
+    or m and the known locations. Anything it cannot place is reported in
+    ``unresolved`` rather than guessed.
+    """
+
+    text = ' '.join(message.lower().split())
+    result = FilterExtraction()
+    filters = result.filters
+
+    negation = _NEGATION_RE.search(text)
+    if negation:
+        result.unresolved.append(negation.group(0))
+
+    rent, sale = bool(_RENT_RE.search(text)), bool(_SALE_RE.search(text))
+    if rent != sale:
+        filters['offer_type'] = 'rent' if rent else 'sale'
+
+    for value, pattern in _TENURE_RE.items():
+        if pattern.search(text):
+            filters['tenure'] = value
+    for value, pattern in _MARKET_RE.items():
+        if pattern.search(text):
+            filters['market_status'] = value
+
+    categories: List[str] = []
+    for match in _CATEGORY_RE.finditer(text):
+        category = CATEGORY_PHRASES[match.group(1)]
+        if category not in categories:
+            categories.append(category)
+    if categories:
+        filters['category'] = categories
+
+    locations: List[str] = []
+    for match in _LOCATION_RE.finditer(text):
+        place = _display_name(_LOCATIONS[match.group(1)])
+        if place not in locations:
+            locations.append(place)
+    if locations:
+        filters['location'] = locations
+
+    for low, high in _pair_ranges(text, _quantities(text)):
+        placed = _field_for(text, low, categories)
+        if placed is None:
+            result.unresolved.append(text[low.start:(high or low).end].strip())
+            continue
+        stem, value = placed
+        if high is not None:
+            high_placed = _field_for(text, high, categories)
+            if high_placed is None or high_placed[0] != stem:
+                result.unresolved.append(text[low.start:high.end].strip())
+                continue
+            filters[f'min_{stem}'], filters[f'max_{stem}'] = sorted((value, high_placed[1]))
+            continue
+        direction = _direction(text, low.start) or _DEFAULT_DIRECTION[stem]
+        if direction == 'range':
+            result.unresolved.append(text[low.start:low.end].strip())
+            continue
+        filters[f'{direction}_{stem}'] = value
+
+    if any(key.endswith('_price') for key in filters):
+        filters['currency'] = 'MYR'
+    return result
+
+
+def _is_first_turn(messages) -> bool:
+    # Compaction can leave a single HumanMessage in a later turn; its summary
+    # message (or any earlier reply) means the thread has history
+    if any(m.id == SUMMARY_MESSAGE_ID or isinstance(m, (AIMessage, ToolMessage)) for m in messages):
+        return False
+    humans = [m for m in messages if isinstance(m, HumanMessage)]
+    return len(humans) == 1 and messages[-1] is humans[0]
+
+
+class ListingFilterPrefetchMiddleware(AgentMiddleware):
+    """Runs the listing search before the first model call of a thread.
+
+    When :func:`extract_listing_filter` is confident about the opening
+    message, the search tool runs with that filter and its call and result
+    are added to the history, so the model can answer from the result in one
+    call instead of first spending a round trip on the tool arguments. Later
+    turns, and messages the rules cannot fully place, go to the model as
+    before. Disable with ``FILTER_FAST_PATH=false``.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        super().__init__()
+        self.enabled = enabled if enabled is not None else env_bool("FILTER_FAST_PATH", True)
+
+    def _tool_call(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        messages = state["messages"]
+        if not self.enabled or not messages or not _is_first_turn(messages):
+            return None
+        content = messages[-1].content
+        if not isinstance(content, str):
+            return None
+        extraction = extract_listing_filter(content)
+        if not extraction.confident:
+            if extraction.unresolved:
+                logger.debug("Filter fast path skipped, unresolved: %s", extraction.unresolved)
+            return None
+        logger.info("Filter fast path: %s", extraction.filters)
+        return {
+            "type": "tool_call",
+            "name": TOOL_NAME,
+            "args": {"input": extraction.filters},
+            "id": f"prefetch_{uuid.uuid4().hex[:12]}",
+        }
+
+    @staticmethod
+    def _update(tool_call: Dict[str, Any], tool_message) -> Dict[str, Any]:
+        call = {key: tool_call[key] for key in ("name", "args", "id")}
+        return {"messages": [AIMessage(content="", tool_calls=[call]), tool_message]}
+
+    def before_model(self, state: AgentState, runtime) -> Optional[Dict[str, Any]]:
+        tool_call = self._tool_call(state)
+        if tool_call is None:
+            return None
+        # The node's config carries the timing callbacks to the tool run
+        return self._update(tool_call, search_listing_property_from_database.invoke(tool_call, get_config()))
+
+    async def abefore_model(self, state: AgentState, runtime) -> Optional[Dict[str, Any]]:
+        tool_call = self._tool_call(state)
+        if tool_call is None:
+            return None
+        return self._update(tool_call, await search_listing_property_from_database.ainvoke(tool_call, get_config()))
+
+
+# Update key of the prefetch step in ``stream_mode="updates"`` output
+PREFETCH_NODE = f"{ListingFilterPrefetchMiddleware.__name__}.before_model"
@@ -1,6 +1,7 @@
-def get_slug_prompt(property_by_slug):
+from agent.v2.prompt.layout import PromptPrefix
 
-    slug_prompt = f'''
+# Same for every property; the property section is appended after it
+SLUG_INSTRUCTIONS = '''
 You are **Landy AI**, an AI property consultant,
 ---
 ## 🎯 Objective
@@ -38,10 +39,12 @@ Provide clear, accurate answers to user questions **strictly based on the provid
   Contact Jay Kew, Real Estate Consultant, Clarify that only property-specific information is provided, not personalized selection  
 Whenver user need to speak to someone, refer to Jay Kew +6011-33199291 from CID Realtors
 
---
+--'''
+
+SLUG_PREFIX = PromptPrefix("slug", SLUG_INSTRUCTIONS)
 
-provided property information:
-{property_by_slug}
 
-    '''
-    return slug_prompt
\ No newline at end of file
+def get_slug_prompt(property_by_slug):
+    """Slug system prompt: the static instructions, then the property information."""
+
+    return SLUG_PREFIX.render(f"provided property information:\n{property_by_slug}")
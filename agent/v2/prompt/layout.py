@@ -0,0 +1,52 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import xxhash
+
+
+def prompt_version(text: str) -> str:
+    """Short, stable digest identifying a prompt's exact content."""
+
+    return xxhash.xxh64_hexdigest(text.encode("utf-8"))[:12]
+
+
+def tool_schemas(tools: Sequence[Any]) -> str:
+    """Canonical JSON of the tool definitions, in the order they are sent."""
+
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    return json.dumps([convert_to_openai_tool(tool) for tool in tools], sort_keys=True)
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """Static start of an agent's prompt: its instructions plus the tool schemas.
+
+    OpenAI caches the longest previously seen prompt prefix (tools first,
+    then messages). Per-request and per-property text therefore only goes
+    after ``instructions`` (see :meth:`render`), so every request of an agent
+    starts with the same bytes. ``version`` changes with any edit to either
+    part and names the prefix in ``prompt_cache_key`` and in metrics.
+    """
+
+    name: str
+    instructions: str
+    tools: str = ""
+
+    @classmethod
+    def build(cls, name: str, instructions: str, tools: Sequence[Any] = ()) -> "PromptPrefix":
+        return cls(name, instructions, tool_schemas(tools) if tools else "")
+
+    @property
+    def version(self) -> str:
+        return prompt_version(self.instructions + self.tools)
+
+    @property
+    def cache_key(self) -> str:
+        return f"landy-{self.name}-{self.version}"
+
+    def render(self, *sections: str) -> str:
+        """The system prompt: the instructions, then the non-empty ``sections``."""
+
+        return "\n\n".join([self.instructions, *(s for s in sections if s)])
@@ -0,0 +1,126 @@
+import logging
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+from langchain.agents import create_agent
+from langchain.agents.middleware import ModelRequest, dynamic_prompt
+from langgraph.config import get_config
+
+from agent.v2.compaction import ConversationCompactionMiddleware
+from agent.v2.filter_extraction import ListingFilterPrefetchMiddleware
+from agent.v2.prompt.landy_slug_prompt import SLUG_PREFIX, get_slug_prompt
+from agent.v2.prompt.landy_system_prompt import prompt
+from agent.v2.prompt.layout import PromptPrefix
+from agent.v2.tools.listing_facets import count_listing_facets
+from agent.v2.tools.search_listing_database import search_listing_property_from_database
+from utility.env import env_bool
+from utility.llm_init import load_llm
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4.1"
+
+SEARCH_TOOLS = [search_listing_property_from_database, count_listing_facets]
+
+SEARCH_PREFIX = PromptPrefix.build("search", prompt, SEARCH_TOOLS)
+
+# configurable key carrying the rendered property prompt for slug turns
+SLUG_PROMPT_KEY = "slug_prompt"
+
+_agents: Dict[Tuple[Any, ...], Any] = {}
+_lock = threading.Lock()
+
+
+def _tool_names(tools: Sequence[Any]) -> Tuple[str, ...]:
+    return tuple(sorted(getattr(t, "name", repr(t)) for t in tools))
+
+
+@dynamic_prompt
+def _slug_system_prompt(request: ModelRequest) -> str:
+    """Read the per-thread property prompt from ``configurable``."""
+
+    configurable = get_config().get("configurable", {})
+    slug_prompt = configurable.get(SLUG_PROMPT_KEY)
+    if slug_prompt is None:
+        return get_slug_prompt(None)
+    return slug_prompt
+
+
+def _get_or_build(key: Tuple[Any, ...], build):
+    agent = _agents.get(key)
+    if agent is not None:
+        return agent
+
+    with _lock:
+        agent = _agents.get(key)
+        if agent is None:
+            agent = build()
+            _agents[key] = agent
+            logger.info(f"Compiled agent {key[:4]}")
+    return agent
+
+
+def _cache_routing(prefix: PromptPrefix) -> Dict[str, Any]:
+    # load_llm overrides sending prompt_cache_key, so requests sharing a prefix reach the
+    # same OpenAI cache; PROMPT_CACHE_KEY=false omits it for servers that reject the field
+    if env_bool("PROMPT_CACHE_KEY", True):
+        return {"model_kwargs": {"prompt_cache_key": prefix.cache_key}}
+    return {}
+
+
+def get_search_agent(checkpointer, model: str = DEFAULT_MODEL):
+    """Compiled v2 search agent, built once per (model, prefix version, tool set)."""
+
+    tools = SEARCH_TOOLS
+    fast_path = env_bool("FILTER_FAST_PATH", True)
+    routing = _cache_routing(SEARCH_PREFIX)
+    key = ("search", model, SEARCH_PREFIX.version, _tool_names(tools), fast_path, bool(routing), id(checkpointer))
+
+    def build():
+        return create_agent(
+            system_prompt=SEARCH_PREFIX.instructions,
+            model=load_llm(model=model, **routing).bind_tools(tools),
+            tools=tools,
+            middleware=[ConversationCompactionMiddleware(), ListingFilterPrefetchMiddleware(enabled=fast_path)],
+            checkpointer=checkpointer,
+        )
+
+    return _get_or_build(key, build)
+
+
+def get_slug_agent(checkpointer, model: str = DEFAULT_MODEL):
+    """Compiled slug agent; the property prompt is supplied per call via ``configurable``."""
+
+    routing = _cache_routing(SLUG_PREFIX)
+    key = ("slug", model, SLUG_PREFIX.version, (), bool(routing), id(checkpointer))
+
+    def build():
+        return create_agent(
+            model=load_llm(model=model, **routing),
+            middleware=[_slug_system_prompt, ConversationCompactionMiddleware()],
+            checkpointer=checkpointer,
+        )
+
+    return _get_or_build(key, build)
+
+
+def slug_agent_config(thread_id: str, slug_prompt: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id, SLUG_PROMPT_KEY: slug_prompt}}
+
+
+def warm_agents(checkpointer, model: str = DEFAULT_MODEL) -> None:
+    """Compile every v2 agent ahead of the first request."""
+
+    get_search_agent(checkpointer, model=model)
+    get_slug_agent(checkpointer, model=model)
+
+
+def registered_agents() -> Tuple[Tuple[Any, ...], ...]:
+    return tuple(_agents)
+
+
+def clear_agent_registry() -> None:
+    """Drop compiled agents (testing helper / checkpointer reload)."""
+
+    with _lock:
+        _agents.clear()
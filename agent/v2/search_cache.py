@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import xxhash
+
+from agent.v2.tools.listing_index import get_search_engine
+from agent.v2.tools.location_index import get_location_match
+from utility.cache import LRUTTLCache
+from utility.env import env_float, env_int
+from utility.executor import run_sync
+from utility.property_listing_init import get_property_listing_collections
+
+logger = logging.getLogger(__name__)
+
+ToolResult = Tuple[str, Dict[str, Any]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def canonical_filter(input: Dict[str, Any]) -> Dict[str, Any]:
+    """Equivalent ListingFilter in one canonical form; this is what gets executed.
+
+    Lists are de-duplicated and sorted, empty lists dropped (the query
+    builder ignores them), whitespace collapsed and currency upper-cased,
+    since the stored codes are upper case and equality is exact.
+    """
+
+    canonical: Dict[str, Any] = {}
+    for key, value in input.items():
+        if isinstance(value, list):
+            items = sorted({_WHITESPACE_RE.sub(' ', str(v)).strip() for v in value} - {''})
+            if items:
+                canonical[key] = items
+        elif isinstance(value, str):
+            value = _WHITESPACE_RE.sub(' ', value).strip()
+            canonical[key] = value.upper() if key == 'currency' else value
+        else:
+            canonical[key] = value
+    return canonical
+
+
+def filter_key(kind: str, canonical: Dict[str, Any]) -> str:
+    """Stable hash of a canonical filter plus everything else that shapes the result."""
+
+    keyed: Dict[str, Any] = {}
+    for key, value in canonical.items():
+        if key == 'location':
+            # Location matching is case-insensitive in every engine and mode
+            value = sorted({v.casefold() for v in value})
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        keyed[key] = value
+    material = json.dumps(
+        [kind, get_search_engine(), get_location_match(), keyed],
+        sort_keys=True,
+        default=str,
+    )
+    return xxhash.xxh64(material.encode('utf-8')).hexdigest()
+
+
+def catalog_version(collection_getter: Callable[[], Any] = get_property_listing_collections) -> Tuple[int, Any]:
+    """(document count, newest ``last_updated``): changes on insert, update and delete."""
+
+    collection = collection_getter()
+    newest = collection.find_one({}, {'last_updated': 1, '_id': 0}, sort=[('last_updated', -1)])
+    return collection.count_documents({}), (newest or {}).get('last_updated')
+
+
+class SearchResultCache:
+    """Search tool results keyed by canonical filter hash.
+
+    Each entry holds the tool's (content, artifact) pair, so a hit serves
+    both the property ID list and the serialized listings. The catalog
+    version is re-read at most every ``revalidate_after`` seconds and any
+    change drops every entry.
+    """
+
+    def __init__(
+        self,
+        version_getter: Callable[[], Any] = catalog_version,
+        max_entries: int = 512,
+        max_bytes: Optional[int] = 32 * 1024 * 1024,
+        ttl: Optional[float] = 300.0,
+        revalidate_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._version_getter = version_getter
+        self._clock = clock
+        self.revalidate_after = revalidate_after
+        self._cache = LRUTTLCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        self._version: Any = None
+        # No version is known yet; the first check clears whatever was cached before it
+        self._checked_at = clock()
+        self.catalog_changes = 0
+
+    def revalidation_due(self) -> bool:
+        return self._clock() - self._checked_at >= self.revalidate_after
+
+    def revalidate(self) -> bool:
+        """Re-read the catalog version; returns True when entries were dropped."""
+
+        version = self._version_getter()
+        with self._lock:
+            self._checked_at = self._clock()
+            if version == self._version:
+                return False
+            if self._version is not None:
+                self.catalog_changes += 1
+                logger.info("Listing catalog changed; clearing search result cache")
+            self._version = version
+        self._cache.clear()
+        return True
+
+    def get(self, key: str) -> Optional[ToolResult]:
+        return self._cache.get(key)
+
+    def set(self, key: str, result: ToolResult) -> None:
+        content, artifact = result
+        size = len(content.encode('utf-8')) + len(json.dumps(artifact, default=str).encode('utf-8'))
+        self._cache.set(key, result, size=size)
+
+    def invalidate(self) -> int:
+        return self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["catalog_changes"] = self.catalog_changes
+        stats["revalidate_after_seconds"] = self.revalidate_after
+        return stats
+
+
+_search_cache: Optional[SearchResultCache] = None
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Process-wide cache from SEARCH_CACHE_* variables; None when SEARCH_CACHE_MAX_ENTRIES=0."""
+
+    global _search_cache
+
+    if _search_cache is None:
+        max_entries = env_int("SEARCH_CACHE_MAX_ENTRIES", 512)
+        if max_entries <= 0:
+            return None
+        _search_cache = SearchResultCache(
+            max_entries=max_entries,
+            max_bytes=env_int("SEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+            ttl=env_float("SEARCH_CACHE_TTL_SECONDS", 300.0),
+            revalidate_after=env_float("SEARCH_CACHE_REVALIDATE_SECONDS", 30.0),
+        )
+    return _search_cache
+
+
+def reset_search_cache_for_tests() -> None:
+    global _search_cache
+    _search_cache = None
+
+
+def cached_result(kind: str, input: Dict[str, Any], compute: Callable[[Dict[str, Any]], ToolResult]) -> ToolResult:
+    """Run ``compute`` on the canonical filter unless an equivalent result is cached."""
+
+    input = canonical_filter(input)
+    cache = get_search_cache()
+    if cache is None:
+        return compute(input)
+
+    if cache.revalidation_due():
+        cache.revalidate()
+    key = filter_key(kind, input)
+    result = cache.get(key)
+    if result is None:
+        result = compute(input)
+        cache.set(key, result)
+    return result
+
+
+# (event loop, filter key) -> running lookup; concurrent equal searches await the same task
+_inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[ToolResult]"] = {}
+
+
+async def _shared_lookup(
+    key: str,
+    input: Dict[str, Any],
+    compute: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+) -> ToolResult:
+    loop = asyncio.get_running_loop()
+    slot = (loop, key)
+    task = _inflight.get(slot)
+    if task is None:
+        task = loop.create_task(compute(input))
+        _inflight[slot] = task
+        task.add_done_callback(lambda _: _inflight.pop(slot, None))
+    # One caller being cancelled must not cancel the lookup the others wait on
+    return await asyncio.shield(task)
+
+
+async def acached_result(
+    kind: str,
+    input: Dict[str, Any],
+    compute: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+) -> ToolResult:
+    """Async twin of :func:`cached_result`; the version check runs in the blocking pool.
+
+    Concurrent calls with an equivalent filter (e.g. within one batch) share a
+    single lookup, with or without the cache.
+    """
+
+    input = canonical_filter(input)
+    key = filter_key(kind, input)
+    cache = get_search_cache()
+    if cache is None:
+        return await _shared_lookup(key, input, compute)
+
+    if cache.revalidation_due():
+        await run_sync(cache.revalidate)
+    result = cache.get(key)
+    if result is None:
+        result = await _shared_lookup(key, input, compute)
+        cache.set(key, result)
+    return result
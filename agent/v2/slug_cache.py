@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from agent.v2.prompt.landy_slug_prompt import get_slug_prompt
+from agent.v2.utility import render_listing_context
+from utility.cache import LRUTTLCache
+from utility.env import env_float, env_int
+from utility.property_listing_init import get_property_listing_collections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedProperty:
+    slug: str
+    document: Optional[Dict[str, Any]]
+    prompt: str
+    last_updated: Any
+    checked_at: float
+
+
+def _approx_size(document: Optional[Dict[str, Any]], prompt: str) -> int:
+    return len(prompt.encode("utf-8")) + len(json.dumps(document, default=str).encode("utf-8"))
+
+
+class SlugPropertyCache:
+    """Property documents and rendered slug prompts, keyed by slug.
+
+    Cached entries are revalidated against the listing's ``last_updated``
+    with a one-field projection at most every ``revalidate_after`` seconds,
+    so follow-up turns skip both the full fetch and the prompt render. The
+    property section of the prompt is capped at ``context_tokens``.
+    """
+
+    def __init__(
+        self,
+        collection_getter: Callable[[], Any] = get_property_listing_collections,
+        max_entries: int = 256,
+        max_bytes: Optional[int] = 8 * 1024 * 1024,
+        ttl: Optional[float] = 900.0,
+        revalidate_after: float = 30.0,
+        context_tokens: Optional[int] = 800,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._collection_getter = collection_getter
+        self.context_tokens = context_tokens
+        self._clock = clock
+        self.revalidate_after = revalidate_after
+        self._cache = LRUTTLCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        self.stale_reloads = 0
+
+    def _load(self, slug: str) -> CachedProperty:
+        document = self._collection_getter().find_one({"slug": slug})
+        entry = CachedProperty(
+            slug=slug,
+            document=document,
+            prompt=get_slug_prompt(render_listing_context(document, self.context_tokens)),
+            last_updated=(document or {}).get("last_updated"),
+            checked_at=self._clock(),
+        )
+        # Unknown slugs are not cached so a newly published listing shows up at once
+        if document is not None:
+            self._cache.set(slug, entry, size=_approx_size(document, entry.prompt))
+        return entry
+
+    def _is_current(self, entry: CachedProperty) -> bool:
+        if self._clock() - entry.checked_at < self.revalidate_after:
+            return True
+        current = self._collection_getter().find_one(
+            {"slug": entry.slug}, {"last_updated": 1, "_id": 0}
+        )
+        if current is None or current.get("last_updated") != entry.last_updated:
+            return False
+        entry.checked_at = self._clock()
+        return True
+
+    def get(self, slug: str) -> CachedProperty:
+        entry = self._cache.get(slug)
+        if entry is not None:
+            if self._is_current(entry):
+                return entry
+            logger.info(f"Listing for slug {slug} changed; reloading")
+            with self._lock:
+                self.stale_reloads += 1
+            self._cache.invalidate(slug)
+        return self._load(slug)
+
+    def invalidate(self, slug: Optional[str] = None) -> int:
+        """Drop one slug, or everything when ``slug`` is None."""
+
+        if slug is None:
+            return self._cache.clear()
+        return int(self._cache.invalidate(slug))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["stale_reloads"] = self.stale_reloads
+        stats["revalidate_after_seconds"] = self.revalidate_after
+        return stats
+
+
+_slug_cache: Optional[SlugPropertyCache] = None
+
+
+def get_slug_cache() -> SlugPropertyCache:
+    """Process-wide cache configured from SLUG_CACHE_* environment variables."""
+
+    global _slug_cache
+
+    if _slug_cache is None:
+        _slug_cache = SlugPropertyCache(
+            max_entries=env_int("SLUG_CACHE_MAX_ENTRIES", 256),
+            max_bytes=env_int("SLUG_CACHE_MAX_BYTES", 8 * 1024 * 1024),
+            ttl=env_float("SLUG_CACHE_TTL_SECONDS", 900.0),
+            revalidate_after=env_float("SLUG_CACHE_REVALIDATE_SECONDS", 30.0),
+            context_tokens=env_int("SLUG_PROMPT_MAX_TOKENS", 800) or None,
+        )
+    return _slug_cache
+
+
+def reset_slug_cache_for_tests() -> None:
+    global _slug_cache
+    _slug_cache = None
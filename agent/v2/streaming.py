@@ -0,0 +1,122 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from agent.v2.filter_extraction import PREFETCH_NODE
+
+logger = logging.getLogger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+async def stream_turn_events(
+    agent,
+    message: str,
+    config: Dict[str, Any],
+    thread_id: str,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run one agent turn and yield events as they happen.
+
+    Event types: ``token`` (model text deltas), ``tool_start``,
+    ``tool_result``, ``listings``, ``facets`` and a final ``done`` summary. Failures
+    end the stream with an ``error`` event.
+    """
+
+    graph_output = ""
+    preferences: Optional[Dict[str, Any]] = None
+    listing_count: Optional[int] = None
+
+    initial_input = {"messages": [{"role": "user", "content": message}]}
+
+    try:
+        async for mode, chunk in agent.astream(
+            initial_input,
+            config,
+            stream_mode=["messages", "updates"],
+        ):
+            if mode == "messages":
+                message_chunk, metadata = chunk
+                if metadata.get("langgraph_node") != "model":
+                    continue
+                text = message_chunk.content if isinstance(message_chunk.content, str) else ""
+                if text:
+                    yield {"event": "token", "data": {"delta": text}}
+                continue
+
+            # mode == "updates"
+            if "model" in chunk:
+                for model_message in (chunk["model"] or {}).get("messages", []):
+                    for tool_call in getattr(model_message, "tool_calls", None) or []:
+                        yield {
+                            "event": "tool_start",
+                            "data": {"name": tool_call["name"], "args": tool_call["args"]},
+                        }
+                    if not getattr(model_message, "tool_calls", None):
+                        graph_output = model_message.content
+
+            elif "tools" in chunk or PREFETCH_NODE in chunk:
+                update = chunk.get("tools") or chunk.get(PREFETCH_NODE) or {}
+                for tool_message in update.get("messages", []):
+                    # The prefetch adds the tool call next to its result
+                    for tool_call in getattr(tool_message, "tool_calls", None) or []:
+                        yield {
+                            "event": "tool_start",
+                            "data": {"name": tool_call["name"], "args": tool_call["args"]},
+                        }
+                    if tool_message.type != "tool":
+                        continue
+                    artifact = getattr(tool_message, "artifact", None) or {}
+                    preferences = artifact.get("filters_applied", preferences)
+                    listing_count = artifact.get("listing_count", listing_count)
+                    yield {
+                        "event": "tool_result",
+                        "data": {
+                            "name": tool_message.name,
+                            "listing_count": artifact.get("listing_count"),
+                            "preferences": artifact.get("filters_applied"),
+                        },
+                    }
+                    if "listings" in artifact:
+                        yield {"event": "listings", "data": {"recommended_listings": artifact["listings"]}}
+                    if "facets" in artifact:
+                        yield {"event": "facets", "data": {"facets": artifact["facets"]}}
+
+    except Exception as error:
+        logger.exception(f"Streaming turn failed for thread {thread_id}")
+        yield {
+            "event": "error",
+            "data": {"thread_id": thread_id, "status": "error", "error": str(error), "error_type": type(error).__name__},
+        }
+        return
+
+    yield {
+        "event": "done",
+        "data": {
+            "thread_id": thread_id,
+            "graph_output": graph_output,
+            "preferences": preferences,
+            "listing_count": listing_count,
+            "status": "success",
+        },
+    }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+def format_ndjson(event: Dict[str, Any]) -> str:
+    return json.dumps({"event": event["event"], **event["data"]}, default=str) + "\n"
+
+
+async def encode_events(events: AsyncIterator[Dict[str, Any]], fmt: str) -> AsyncIterator[str]:
+    formatter = format_ndjson if fmt == "ndjson" else format_sse
+    async for event in events:
+        yield formatter(event)
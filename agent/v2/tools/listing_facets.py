@@ -0,0 +1,158 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.tools import StructuredTool
+
+from agent.v2.search_cache import acached_result, cached_result
+from agent.v2.tools.listing_index import CODED_FIELDS, FACET_FIELDS, NUMERIC_FIELDS, get_listing_index, get_search_engine
+from agent.v2.tools.location_index import get_location_match
+from agent.v2.tools.search_listing_database import ListingFilter, _execution_query, build_listing_query
+from utility.executor import run_sync
+from utility.property_listing_init import (
+    get_async_property_listing_collections,
+    get_property_listing_collections,
+)
+from utility.timing import stage_span
+
+TOOL_NAME = 'count_listing_facets'
+
+# Facet name -> coded ListingIndex column counted with $sortByCount
+GROUP_FACETS: Dict[str, str] = {
+    'category': 'main_category',
+    'offer_type': 'offer_type',
+    'region': 'region',
+}
+
+PRICE_BOUNDARIES: List[float] = [0, 5_000, 20_000, 50_000, 500_000, 2_000_000, 5_000_000, 10_000_000, 30_000_000, float('inf')]
+
+# Square feet
+SIZE_BOUNDARIES: List[float] = [0, 5_000, 10_000, 20_000, 50_000, 100_000, 200_000, float('inf')]
+
+# Facet name -> (numeric ListingIndex column, bucket boundaries)
+BUCKET_FACETS: Dict[str, Tuple[str, List[float]]] = {
+    'price': ('price', PRICE_BOUNDARIES),
+    'built_up_size': ('built_up_size', SIZE_BOUNDARIES),
+    'land_size': ('land_size', SIZE_BOUNDARIES),
+}
+
+UNKNOWN = 'unknown'
+
+
+def _field_ref(path: Tuple[str, ...]) -> str:
+    return '$' + '.'.join(path)
+
+
+def build_facet_pipeline(execute_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One ``$match`` + ``$facet`` round trip; only counts come back."""
+
+    paths = {**CODED_FIELDS, **FACET_FIELDS}
+    facets: Dict[str, List[Dict[str, Any]]] = {'total': [{'$count': 'total'}]}
+    for name, column in GROUP_FACETS.items():
+        facets[name] = [{'$sortByCount': _field_ref(paths[column])}]
+    for name, (column, boundaries) in BUCKET_FACETS.items():
+        facets[name] = [{'$bucket': {
+            'groupBy': _field_ref(NUMERIC_FIELDS[column]),
+            'boundaries': boundaries,
+            'default': UNKNOWN,
+        }}]
+    return [{'$match': execute_query}, {'$facet': facets}]
+
+
+def _format_amount(value: float) -> str:
+    for divisor, suffix in ((1_000_000, 'M'), (1_000, 'k')):
+        if value >= divisor:
+            return f"{value / divisor:g}{suffix}"
+    return f"{value:g}"
+
+
+def bucket_label(boundaries: List[float], lower: Any) -> str:
+    if lower == UNKNOWN:
+        return UNKNOWN
+    upper = boundaries[boundaries.index(lower) + 1]
+    if upper == float('inf'):
+        return f"{_format_amount(lower)}+"
+    return f"{_format_amount(lower)}-{_format_amount(upper)}"
+
+
+def build_facet_payload(query: Dict[str, Any], raw: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Normalise ``$facet`` output (or ListingIndex.facet_counts) into label -> count maps."""
+
+    total = raw.get('total') or []
+    facets: Dict[str, Dict[str, int]] = {}
+
+    for name in GROUP_FACETS:
+        counts: Dict[str, int] = {}
+        for entry in raw.get(name) or []:
+            label = entry['_id'] if isinstance(entry['_id'], str) and entry['_id'] else UNKNOWN
+            counts[label] = counts.get(label, 0) + entry['count']
+        # Largest groups first; ties by label so both engines agree
+        facets[name] = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+    for name, (_, boundaries) in BUCKET_FACETS.items():
+        facets[name] = {bucket_label(boundaries, entry['_id']): entry['count'] for entry in raw.get(name) or []}
+
+    return {
+        "filters_applied": query,
+        "listing_count": total[0]['total'] if total else 0,
+        "facets": facets,
+    }
+
+
+def count_matching_facets(input: ListingFilter, query: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    if get_search_engine() == 'memory':
+        return get_listing_index().facet_counts(input, GROUP_FACETS, BUCKET_FACETS)
+
+    pipeline = build_facet_pipeline(_execution_query(input, query))
+    return next(iter(get_property_listing_collections().aggregate(pipeline)), {})
+
+
+async def acount_matching_facets(input: ListingFilter, query: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    if get_search_engine() == 'memory':
+        return await run_sync(get_listing_index().facet_counts, input, GROUP_FACETS, BUCKET_FACETS)
+
+    execute_query = query
+    if input.get('location') and get_location_match() == 'index':
+        execute_query = await run_sync(_execution_query, input, query)
+
+    collection = await get_async_property_listing_collections()
+    results = await collection.aggregate(build_facet_pipeline(execute_query))
+    return results[0] if results else {}
+
+
+def _shape_facets(query: Dict[str, Any], raw: Dict[str, List[Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+    payload = build_facet_payload(query, raw)
+    return json.dumps(payload, default=str), payload
+
+
+def _run_facets(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    query = build_listing_query(input)
+    with stage_span('db_query', tool=TOOL_NAME):
+        raw = count_matching_facets(input, query)
+    return _shape_facets(query, raw)
+
+
+async def _arun_facets(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    query = build_listing_query(input)
+    with stage_span('db_query', tool=TOOL_NAME):
+        raw = await acount_matching_facets(input, query)
+    return _shape_facets(query, raw)
+
+
+def _count_listing_facets(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    return cached_result("facets", input, _run_facets)
+
+
+async def _acount_listing_facets(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    return await acached_result("facets", input, _arun_facets)
+
+
+count_listing_facets = StructuredTool.from_function(
+    func=_count_listing_facets,
+    coroutine=_acount_listing_facets,
+    name=TOOL_NAME,
+    description=(
+        "Count property listings matching structured optional filters and break the matches down "
+        "by category, offer type, region, price and size buckets. Returns no listings."
+    ),
+    response_format="content_and_artifact",
+)
@@ -0,0 +1,318 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agent.v2.tools.location_index import LocationIndex, get_location_match, location_fields
+from agent.v2.tools.polled_index import PolledIndex
+from agent.v2.utility import build_search_payload
+from utility.env import env_float, env_str
+
+logger = logging.getLogger(__name__)
+
+# ListingFilter range prefix -> document path of the numeric value
+NUMERIC_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'price': ('offer', 'price'),
+    'land_size': ('land_size', 'value'),
+    'built_up_size': ('built_up_area', 'value'),
+    'office_area': ('office_area', 'value'),
+    'ceiling_height': ('ceiling_height', 'value'),
+    'power_supply': ('power_supply', 'value'),
+}
+
+# ListingFilter equality key -> document path of the coded string value
+CODED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'offer_type': ('offer', 'offer_type'),
+    'tenure': ('tenure',),
+    'market_status': ('market_status',),
+    'currency': ('offer', 'price_currency'),
+}
+
+# Coded columns kept only for facet counts; never filtered on
+FACET_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'main_category': ('main_category',),
+    'region': ('location', 'address', 'address_region'),
+}
+
+_CODED_COLUMNS: Dict[str, Tuple[str, ...]] = {**CODED_FIELDS, **FACET_FIELDS}
+
+LOCATION_FIELDS: List[Tuple[str, ...]] = [
+    ('location', 'industrial_park_name'),
+    ('location', 'address', 'address_locality'),
+    ('location', 'address', 'street_address'),
+    ('location', 'address', 'address_region'),
+    ('description',),
+]
+
+
+def _get_path(doc: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value: Any = doc
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _as_number(value: Any) -> float:
+    # Mongo only compares numbers with numbers; anything else never matches a range
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _categories_of(doc: Dict[str, Any]) -> List[str]:
+    categories = []
+    for value in (doc.get('main_category'), doc.get('sub_categories')):
+        if isinstance(value, str):
+            categories.append(value)
+        elif isinstance(value, list):
+            categories.extend(v for v in value if isinstance(v, str))
+    return categories
+
+
+class ListingIndex(PolledIndex):
+    """Column store of property_listing that evaluates ListingFilter in process.
+
+    Numeric ranges are NumPy float columns (NaN when missing or non-numeric),
+    equality filters are integer-coded columns and categories are one boolean
+    column per category. Rows are refreshed incrementally by polling
+    ``last_updated`` (see :class:`PolledIndex`).
+    """
+
+    label = "Listing index"
+
+    def _clear(self) -> None:
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._row_of: Dict[Any, int] = {}
+        self._size = 0
+        self._capacity = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._numeric = {name: np.zeros(0) for name in NUMERIC_FIELDS}
+        self._codes = {name: np.zeros(0, dtype=np.int32) for name in _CODED_COLUMNS}
+        self._vocab: Dict[str, Dict[str, int]] = {name: {} for name in _CODED_COLUMNS}
+        self._categories: Dict[str, np.ndarray] = {}
+        self._locations: List[List[str]] = [[] for _ in LOCATION_FIELDS]
+        self._location_index = LocationIndex()
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+
+    def __len__(self) -> int:
+        return int(self._alive[:self._size].sum())
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, 64)
+        extra = capacity - self._capacity
+
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        for name, column in self._numeric.items():
+            self._numeric[name] = np.concatenate([column, np.full(extra, np.nan)])
+        for name, column in self._codes.items():
+            self._codes[name] = np.concatenate([column, np.full(extra, -1, dtype=np.int32)])
+        for name, column in self._categories.items():
+            self._categories[name] = np.concatenate([column, np.zeros(extra, dtype=bool)])
+        self._capacity = capacity
+
+    def _write_row(self, row: int, doc: Dict[str, Any]) -> None:
+        self._docs[row] = doc
+        self._alive[row] = True
+
+        for name, path in NUMERIC_FIELDS.items():
+            self._numeric[name][row] = _as_number(_get_path(doc, path))
+
+        for name, path in _CODED_COLUMNS.items():
+            value = _get_path(doc, path)
+            if isinstance(value, str):
+                vocab = self._vocab[name]
+                self._codes[name][row] = vocab.setdefault(value, len(vocab))
+            else:
+                self._codes[name][row] = -1
+
+        for column in self._categories.values():
+            column[row] = False
+        for category in _categories_of(doc):
+            if category not in self._categories:
+                self._categories[category] = np.zeros(self._capacity, dtype=bool)
+            self._categories[category][row] = True
+
+        for i, path in enumerate(LOCATION_FIELDS):
+            value = _get_path(doc, path)
+            self._locations[i][row] = value if isinstance(value, str) else ''
+        self._location_index.add(row, location_fields(doc))
+
+    def _upsert(self, documents: List[Dict[str, Any]]) -> int:
+        new_docs = [d for d in documents if d.get('property_id') not in self._row_of]
+        self._grow(self._size + len(new_docs))
+
+        updated = 0
+        for doc in documents:
+            key = doc.get('property_id')
+            row = self._row_of.get(key)
+            if row is not None and self._docs[row] == doc:
+                # Re-read at the watermark without changes
+                continue
+            updated += 1
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._docs.append(None)
+                for column in self._locations:
+                    column.append('')
+                self._row_of[key] = row
+            self._write_row(row, doc)
+        return updated
+
+    def _remove(self, property_ids: set) -> None:
+        for key in property_ids:
+            row = self._row_of.pop(key, None)
+            if row is not None:
+                self._alive[row] = False
+                self._docs[row] = None
+                self._location_index.remove(row)
+
+    # ----------------------------
+    # Query evaluation
+    # ----------------------------
+
+    def _location_mask(self, terms: List[str]) -> np.ndarray:
+        mask = np.zeros(self._capacity, dtype=bool)
+        if get_location_match() == 'index':
+            rows = list(self._location_index.candidates(terms))
+            mask[rows] = True
+            return mask
+
+        patterns = [re.compile(term, re.IGNORECASE) for term in terms]
+        for column in self._locations:
+            for row, value in enumerate(column):
+                if value and not mask[row] and any(p.search(value) for p in patterns):
+                    mask[row] = True
+        return mask
+
+    def mask(self, input: Dict[str, Any]) -> np.ndarray:
+        mask = self._alive.copy()
+
+        for name in CODED_FIELDS:
+            if name in input:
+                if input[name] is None:
+                    mask &= self._codes[name] == -1
+                    continue
+                code = self._vocab[name].get(input[name])
+                if code is None:
+                    return np.zeros(self._capacity, dtype=bool)
+                mask &= self._codes[name] == code
+
+        if input.get('category'):
+            category_mask = np.zeros(self._capacity, dtype=bool)
+            for category in input['category']:
+                column = self._categories.get(category)
+                if column is not None:
+                    category_mask |= column
+            mask &= category_mask
+
+        for name in NUMERIC_FIELDS:
+            column = self._numeric[name]
+            if f'min_{name}' in input:
+                mask &= column >= input[f'min_{name}']
+            if f'max_{name}' in input:
+                mask &= column <= input[f'max_{name}']
+
+        if input.get('location'):
+            mask &= self._location_mask(input['location'])
+
+        return mask
+
+    def resolve_location(self, term: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Ranked (property_id, score) fuzzy matches for a location term."""
+
+        self.ensure_fresh()
+        with self._lock:
+            return [
+                (self._docs[row]['property_id'], score)
+                for row, score in self._location_index.resolve(term, limit=limit)
+            ]
+
+    def search_documents(self, input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self.ensure_fresh()
+        with self._lock:
+            rows = np.flatnonzero(self.mask(input))
+            return [self._docs[row] for row in rows]
+
+    def search(self, input: Dict[str, Any], query: Dict[str, Any]) -> Dict[str, Any]:
+        """Same payload as the Mongo-backed search tool."""
+
+        return build_search_payload(query, self.search_documents(input))
+
+    def facet_counts(
+        self,
+        input: Dict[str, Any],
+        groups: Dict[str, str],
+        buckets: Dict[str, Tuple[str, List[float]]],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Counts over the matching rows, shaped like the Mongo ``$facet`` output.
+
+        ``groups`` maps a facet name to a coded column (``$sortByCount``) and
+        ``buckets`` maps one to a numeric column plus boundaries (``$bucket``
+        with an ``"unknown"`` default). No documents are touched.
+        """
+
+        self.ensure_fresh()
+        with self._lock:
+            mask = self.mask(input)
+            total = int(mask.sum())
+            result: Dict[str, List[Dict[str, Any]]] = {"total": [{"total": total}] if total else []}
+
+            for name, column in groups.items():
+                codes = self._codes[column][mask]
+                labels = {code: label for label, code in self._vocab[column].items()}
+                counts = np.bincount(codes + 1, minlength=len(labels) + 1)
+                result[name] = [
+                    {"_id": labels.get(code - 1), "count": int(count)}
+                    for code, count in enumerate(counts) if count
+                ]
+
+            for name, (column, boundaries) in buckets.items():
+                values = self._numeric[column][mask]
+                slots = np.searchsorted(boundaries, values, side='right') - 1
+                # NaN and out-of-range values fall into the default bucket
+                slots[np.isnan(values) | (slots < 0) | (slots >= len(boundaries) - 1)] = -1
+                counts = np.bincount(slots + 1, minlength=len(boundaries))
+                result[name] = [
+                    {"_id": boundaries[slot], "count": int(counts[slot + 1])}
+                    for slot in range(len(boundaries) - 1) if counts[slot + 1]
+                ]
+                if counts[0]:
+                    result[name].append({"_id": "unknown", "count": int(counts[0])})
+
+            return result
+
+
+_listing_index: Optional[ListingIndex] = None
+
+
+def get_search_engine() -> str:
+    """``mongo`` (default) or ``memory``, from LISTING_SEARCH_ENGINE."""
+
+    engine = (env_str("LISTING_SEARCH_ENGINE", "mongo") or "mongo").lower()
+    if engine not in {"mongo", "memory"}:
+        raise RuntimeError(f"Unknown LISTING_SEARCH_ENGINE {engine!r}; expected 'mongo' or 'memory'.")
+    return engine
+
+
+def get_listing_index() -> ListingIndex:
+    global _listing_index
+
+    if _listing_index is None:
+        _listing_index = ListingIndex(
+            refresh_interval=env_float("LISTING_INDEX_REFRESH_SECONDS", 60.0),
+        )
+    return _listing_index
+
+
+def reset_listing_index_for_tests() -> None:
+    global _listing_index
+    _listing_index = None
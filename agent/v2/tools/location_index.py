@@ -0,0 +1,374 @@
+import re
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from agent.v2.tools.polled_index import PolledIndex
+from utility.env import env_float, env_str
+
+# Canonical place -> spellings users (and listings) commonly use for it
+LOCATION_ALIASES: Dict[str, List[str]] = {
+    'petaling jaya': ['pj'],
+    'shah alam': ['shah alam city', 'bandar shah alam'],
+    'port klang': ['pelabuhan klang', 'westport', 'northport'],
+    'klang': ['kelang'],
+    'kuala lumpur': ['kl'],
+    'subang jaya': ['subang', 'usj'],
+    'sungai buloh': ['sg buloh', 'sungei buloh'],
+    'seri kembangan': ['sri kembangan'],
+    'bandar baru bangi': ['bangi'],
+    'telok panglima garang': ['teluk panglima garang', 'tpg'],
+    'telok gong': ['teluk gong'],
+    'sepang': ['klia', 'klia2'],
+    'puchong': ['puchong jaya'],
+    'rawang': ['rawang selangor'],
+    'hicom': ['hicom glenmarie', 'hicom industrial park'],
+}
+
+# Weight of a hit by the field it came from; the description is the noisiest source
+FIELD_WEIGHTS: Dict[str, float] = {
+    'industrial_park_name': 1.0,
+    'address_locality': 1.0,
+    'street_address': 0.9,
+    'address_region': 0.8,
+    'description': 0.5,
+}
+
+_ABBREVIATIONS = {
+    'jln': 'jalan',
+    'tmn': 'taman',
+    'bdr': 'bandar',
+    'bkt': 'bukit',
+    'sg': 'sungai',
+    'kg': 'kampung',
+    'kws': 'kawasan',
+    'sek': 'seksyen',
+    'section': 'seksyen',
+    'perindustrian': 'industri',
+    'industrial': 'industri',
+}
+
+_STOPWORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'near', 'of', 'on', 'the', 'to', 'with'}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+MIN_FUZZY_SIMILARITY = 0.45
+
+# Short tokens share few trigrams, so one-letter typos there are scored by edit distance
+MIN_EDIT_SIMILARITY = 0.7
+
+
+def normalize_tokens(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = _ABBREVIATIONS.get(token, token)
+        if token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_similarity(a: str, b: str) -> float:
+    """1 - normalised Levenshtein distance."""
+
+    if a == b:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return 1.0 - previous[-1] / max(len(a), len(b))
+
+
+def _build_alias_lookup() -> Dict[str, List[str]]:
+    lookup: Dict[str, List[str]] = {}
+    for canonical, variants in LOCATION_ALIASES.items():
+        forms = [canonical] + variants
+        for form in forms:
+            key = ' '.join(normalize_tokens(form))
+            lookup.setdefault(key, [])
+            lookup[key].extend(f for f in forms if f not in lookup[key])
+    return lookup
+
+
+_ALIAS_LOOKUP = _build_alias_lookup()
+
+
+def expand_aliases(term: str) -> List[List[str]]:
+    """Token lists for ``term`` and every alias spelling of it."""
+
+    key = ' '.join(normalize_tokens(term))
+    phrases = [key] + [f for f in _ALIAS_LOOKUP.get(key, []) if f != key]
+    expanded = []
+    for phrase in phrases:
+        tokens = normalize_tokens(phrase)
+        if tokens and tokens not in expanded:
+            expanded.append(tokens)
+    return expanded
+
+
+class LocationIndex:
+    """Token and trigram index over listing location fields.
+
+    Postings map each normalised token to the keys (rows or property IDs)
+    containing it, with the best field weight seen. Typos are handled at
+    vocabulary level through trigram similarity, and phrase matching works
+    on sorted NumPy posting arrays, so a lookup never scans the catalog.
+    """
+
+    def __init__(self):
+        self._keys: List[Hashable] = []
+        self._key_ids: Dict[Hashable, int] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._key_tokens: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._key_tokens)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def _key_id(self, key: Hashable) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_ids[key] = key_id
+        return key_id
+
+    def add(self, key: Hashable, fields: Dict[str, Optional[str]]) -> None:
+        self.remove(key)
+        key_id = self._key_id(key)
+        tokens: Set[str] = set()
+        for field, text in fields.items():
+            if not isinstance(text, str) or not text:
+                continue
+            weight = FIELD_WEIGHTS.get(field, 0.5)
+            for token in normalize_tokens(text):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    for gram in trigrams(token):
+                        self._trigrams[gram].add(token)
+                if postings.get(key_id, 0.0) < weight:
+                    postings[key_id] = weight
+                    self._arrays.pop(token, None)
+                tokens.add(token)
+        self._key_tokens[key_id] = tokens
+
+    def remove(self, key: Hashable) -> None:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            return
+        for token in self._key_tokens.pop(key_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key_id, None)
+            self._arrays.pop(token, None)
+            if not postings:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+
+    def _posting_arrays(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(token)
+        if arrays is None:
+            postings = self._postings[token]
+            ids = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            weights = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            order = np.argsort(ids)
+            arrays = self._arrays[token] = (ids[order], weights[order])
+        return arrays
+
+    def similar_tokens(self, token: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens close to ``token`` (exact match scores 1.0)."""
+
+        if token in self._postings:
+            return [(token, 1.0)]
+        grams = trigrams(token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] += 1
+        matches = []
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity < MIN_FUZZY_SIMILARITY and abs(len(candidate) - len(token)) <= 2:
+                edit = edit_similarity(token, candidate)
+                if edit >= MIN_EDIT_SIMILARITY:
+                    similarity = edit
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+    def _token_scores(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        parts = []
+        for candidate, similarity in self.similar_tokens(token):
+            ids, weights = self._posting_arrays(candidate)
+            parts.append((ids, weights * similarity))
+        return _max_by_id(parts)
+
+    def _phrase_scores(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        ids, scores = self._token_scores(tokens[0])
+        for token in tokens[1:]:
+            if not len(ids):
+                break
+            # Every token of the phrase must match
+            other_ids, other_scores = self._token_scores(token)
+            ids, left, right = np.intersect1d(ids, other_ids, assume_unique=True, return_indices=True)
+            scores = scores[left] + other_scores[right]
+        return ids, scores / len(tokens)
+
+    def _term_scores(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        return _max_by_id([self._phrase_scores(tokens) for tokens in expand_aliases(term)])
+
+    def resolve(self, term: str, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """Keys matching ``term`` (or one of its aliases), best match first."""
+
+        ids, scores = self._term_scores(term)
+        if limit and len(ids) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[top], scores[top]
+        # Highest score first; ties keep insertion order for stable output
+        order = np.lexsort((ids, -scores))
+        return [(self._keys[i], float(scores[i_pos])) for i_pos, i in zip(order, ids[order])]
+
+    def candidate_ids(self, terms: Iterable[str]) -> np.ndarray:
+        parts = [self._term_scores(term)[0] for term in terms]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def candidates(self, terms: Iterable[str]) -> List[Hashable]:
+        """Keys matching any of ``terms``, in insertion order."""
+
+        return [self._keys[i] for i in self.candidate_ids(terms)]
+
+
+def _max_by_id(parts: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge (ids, scores) pairs keeping the best score per id."""
+
+    parts = [p for p in parts if len(p[0])]
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    if len(parts) == 1:
+        return parts[0]
+    ids = np.concatenate([p[0] for p in parts])
+    scores = np.concatenate([p[1] for p in parts])
+    order = np.lexsort((-scores, ids))
+    ids, scores = ids[order], scores[order]
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ids[1:] != ids[:-1]
+    return ids[first], scores[first]
+
+
+def location_fields(doc: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    location = doc.get('location') or {}
+    address = location.get('address') or {}
+    return {
+        'industrial_park_name': location.get('industrial_park_name'),
+        'address_locality': address.get('address_locality'),
+        'street_address': address.get('street_address'),
+        'address_region': address.get('address_region'),
+        'description': doc.get('description'),
+    }
+
+
+class LocationResolver(PolledIndex):
+    """:class:`LocationIndex` keyed by property_id, fed from a projected read.
+
+    Used to turn location terms into property IDs for the Mongo engine, so
+    only ``property_id``, the location fields and ``last_updated`` are held
+    in memory, and it refreshes on its own interval.
+    """
+
+    label = "Location index"
+    projection = {
+        '_id': 0,
+        'property_id': 1,
+        'last_updated': 1,
+        'location.industrial_park_name': 1,
+        'location.address.address_locality': 1,
+        'location.address.street_address': 1,
+        'location.address.address_region': 1,
+        'description': 1,
+    }
+
+    def _clear(self) -> None:
+        self._index = LocationIndex()
+        self._fields: Dict[Hashable, Dict[str, Optional[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def _upsert(self, documents: List[Dict[str, Any]]) -> int:
+        updated = 0
+        for doc in documents:
+            key = doc.get('property_id')
+            fields = location_fields(doc)
+            if self._fields.get(key) == fields:
+                continue
+            self._fields[key] = fields
+            self._index.add(key, fields)
+            updated += 1
+        return updated
+
+    def _remove(self, property_ids: set) -> None:
+        for key in property_ids:
+            self._fields.pop(key, None)
+            self._index.remove(key)
+
+    def property_ids(self, terms: List[str]) -> List[str]:
+        self.ensure_fresh()
+        with self._lock:
+            return sorted(self._index.candidates(terms))
+
+    def resolve(self, term: str, limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        self.ensure_fresh()
+        with self._lock:
+            return self._index.resolve(term, limit=limit)
+
+
+_location_resolver: Optional[LocationResolver] = None
+
+
+def get_location_resolver() -> LocationResolver:
+    global _location_resolver
+
+    if _location_resolver is None:
+        _location_resolver = LocationResolver(
+            refresh_interval=env_float("LOCATION_INDEX_REFRESH_SECONDS", 60.0),
+        )
+    return _location_resolver
+
+
+def reset_location_resolver_for_tests() -> None:
+    global _location_resolver
+    _location_resolver = None
+
+
+def get_location_match() -> str:
+    """``index`` (default) or ``regex``, from LOCATION_MATCH."""
+
+    mode = (env_str("LOCATION_MATCH", "index") or "index").lower()
+    if mode not in {"index", "regex"}:
+        raise RuntimeError(f"Unknown LOCATION_MATCH {mode!r}; expected 'index' or 'regex'.")
+    return mode
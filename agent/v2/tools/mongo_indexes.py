@@ -0,0 +1,232 @@
+"""Indexes of the ``property_listing`` collection and query-plan checks.
+
+``python -m agent.v2.tools.mongo_indexes ensure`` creates the declared
+indexes (idempotent); ``check`` explains a representative set of listing
+queries and exits non-zero when any winning plan is a collection scan.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from agent.v2.tools.search_listing_database import ListingFilter, build_listing_query
+from utility.property_listing_init import get_property_listing_collections
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+EXISTS = "exists"
+CONFLICT = "conflict"
+ERROR = "error"
+
+COLLSCAN = "COLLSCAN"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+
+
+# Equality fields lead and the range field comes last, so one index serves
+# "offer type + price" as well as "category + offer type + price".
+LISTING_INDEXES: Tuple[IndexSpec, ...] = (
+    # Slug chat lookup and its last_updated revalidation
+    IndexSpec("slug_unique", (("slug", 1),), unique=True),
+    # Location matches resolved to ids, listing detail lookups
+    IndexSpec("property_id_unique", (("property_id", 1),), unique=True),
+    # Search cache catalog version and the listing index's incremental refresh
+    IndexSpec("last_updated", (("last_updated", -1),)),
+    IndexSpec("offer_type_price", (("offer.offer_type", 1), ("offer.price", 1))),
+    IndexSpec("price", (("offer.price", 1),)),
+    # Category filters are an $or over both fields; each branch needs its own index
+    IndexSpec("main_category_offer_price", (("main_category", 1), ("offer.offer_type", 1), ("offer.price", 1))),
+    IndexSpec("sub_categories_offer_price", (("sub_categories", 1), ("offer.offer_type", 1), ("offer.price", 1))),
+    IndexSpec("tenure", (("tenure", 1),)),
+    IndexSpec("market_status", (("market_status", 1),)),
+    IndexSpec("land_size", (("land_size.value", 1),)),
+    IndexSpec("built_up_area", (("built_up_area.value", 1),)),
+    IndexSpec("office_area", (("office_area.value", 1),)),
+    IndexSpec("ceiling_height", (("ceiling_height.value", 1),)),
+    IndexSpec("power_supply", (("power_supply.value", 1),)),
+)
+
+_CATEGORIES = ('warehouse', 'factory', 'industrial-land', 'detached-factory', 'shoplot')
+
+_RANGE_FIELDS = ('price', 'land_size', 'built_up_size', 'office_area', 'ceiling_height', 'power_supply')
+
+
+def _key_list(info: Dict[str, Any]) -> List[Tuple[str, int]]:
+    return [(field, int(direction)) for field, direction in info.get("key", [])]
+
+
+def ensure_indexes(collection, specs: Sequence[IndexSpec] = LISTING_INDEXES) -> Dict[str, str]:
+    """Create the missing indexes; returns ``created``/``exists``/``conflict``/``error`` per name.
+
+    An index whose name is taken by a different definition is reported as a
+    conflict and left alone; dropping it is an operator decision.
+    """
+
+    existing = {name: info for name, info in collection.index_information().items()}
+    by_keys = {tuple(_key_list(info)): name for name, info in existing.items()}
+    report: Dict[str, str] = {}
+    for spec in specs:
+        keys = list(spec.keys)
+        current = existing.get(spec.name)
+        if current is not None:
+            same = _key_list(current) == keys and bool(current.get("unique")) == spec.unique
+            report[spec.name] = EXISTS if same else CONFLICT
+            if not same:
+                logger.warning("Index %s exists with a different definition: %s", spec.name, current)
+            continue
+        if tuple(keys) in by_keys and bool(existing[by_keys[tuple(keys)]].get("unique")) == spec.unique:
+            # Same index under another name
+            report[spec.name] = EXISTS
+            continue
+        try:
+            collection.create_index(keys, name=spec.name, unique=spec.unique)
+        except Exception as exc:
+            logger.warning("Creating index %s failed: %s", spec.name, exc)
+            report[spec.name] = ERROR
+            continue
+        logger.info("Created index %s on %s", spec.name, keys)
+        report[spec.name] = CREATED
+    return report
+
+
+def _representative_filters() -> Iterator[Tuple[str, ListingFilter]]:
+    for offer_type in ('sale', 'rent'):
+        yield f"offer_type={offer_type}", {'offer_type': offer_type}
+        yield f"offer_type={offer_type}+price", {'offer_type': offer_type, 'max_price': 5_000_000, 'currency': 'MYR'}
+    for category in _CATEGORIES:
+        yield f"category={category}", {'category': [category]}
+        yield f"category={category}+rent+price", {'category': [category], 'offer_type': 'rent', 'max_price': 30_000}
+    yield "category=many", {'category': ['factory', 'warehouse', 'cluster-factory']}
+    yield "tenure", {'tenure': 'freehold'}
+    yield "market_status", {'market_status': 'subsales'}
+    for stem in _RANGE_FIELDS:
+        yield f"min_{stem}", {f'min_{stem}': 1}
+        yield f"max_{stem}", {f'max_{stem}': 1_000_000}
+        yield f"{stem}_range", {f'min_{stem}': 1, f'max_{stem}': 1_000_000}
+    yield "combined", {
+        'offer_type': 'sale', 'category': ['warehouse'], 'tenure': 'freehold',
+        'min_price': 1_000_000, 'max_price': 8_000_000, 'min_built_up_size': 20_000, 'min_power_supply': 500,
+    }
+
+
+def representative_queries() -> List[Dict[str, Any]]:
+    """Queries the app issues, as ``{"name", "filter", "sort", "limit"}``.
+
+    Search filters go through :func:`build_listing_query`, with locations in
+    their resolved ``property_id`` form. The regex form (LOCATION_MATCH=regex)
+    and the empty filter are full scans by design and are not included.
+    """
+
+    queries = [
+        {"name": "slug", "filter": {"slug": "warehouse-1"}},
+        {"name": "property_ids", "filter": {"property_id": {"$in": ["LP000001", "LP000002"]}}},
+        {"name": "catalog_version", "filter": {}, "sort": [("last_updated", -1)], "limit": 1},
+        {"name": "changed_since", "filter": {"last_updated": {"$gt": "2025-01-01T00:00:00"}}},
+    ]
+    for name, input in _representative_filters():
+        queries.append({"name": f"search:{name}", "filter": build_listing_query(input)})
+    located: ListingFilter = {'category': ['warehouse'], 'location': ['Shah Alam']}
+    queries.append({
+        "name": "search:category+location",
+        "filter": build_listing_query(located, location_ids=["LP000001", "LP000002"]),
+    })
+    return queries
+
+
+def plan_stages(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every stage of an explain plan tree (classic and slot-based layouts)."""
+
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan
+    for key in ("queryPlan", "inputStage", "outerStage", "innerStage", "thenStage", "elseStage"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def _explain(collection, query: Dict[str, Any]) -> Dict[str, Any]:
+    cursor = collection.find(query["filter"])
+    if query.get("sort"):
+        cursor = cursor.sort(query["sort"])
+    if query.get("limit"):
+        cursor = cursor.limit(query["limit"])
+    return cursor.explain()
+
+
+def check_query_plans(collection, queries: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Explain each query; ``collscan`` marks winning plans that scan the collection."""
+
+    results = []
+    for query in queries if queries is not None else representative_queries():
+        explain = _explain(collection, query)
+        stages = list(plan_stages((explain.get("queryPlanner") or {}).get("winningPlan") or {}))
+        results.append({
+            "name": query["name"],
+            "filter": query["filter"],
+            "stages": [stage["stage"] for stage in stages],
+            "indexes": sorted({stage["indexName"] for stage in stages if stage.get("indexName")}),
+            "collscan": any(stage["stage"] == COLLSCAN for stage in stages),
+        })
+    return results
+
+
+def _collection_from(uri: Optional[str]) -> Callable[[], Any]:
+    if not uri:
+        return get_property_listing_collections
+
+    def connect():
+        from pymongo import MongoClient
+
+        return MongoClient(uri)["property"]["property_listing"]
+
+    return connect
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["ensure", "check", "list"],
+                        help="ensure: create missing indexes; check: explain representative queries; "
+                             "list: print the declared indexes")
+    parser.add_argument("--uri", default=None, help="MongoDB URI (defaults to the MONGODB_PW cluster)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "list":
+        output: Any = [{"name": s.name, "keys": s.keys, "unique": s.unique} for s in LISTING_INDEXES]
+        print(json.dumps(output, indent=2))
+        return
+
+    collection = _collection_from(args.uri)()
+    if args.command == "ensure":
+        report = ensure_indexes(collection)
+        print(json.dumps(report, indent=2) if args.json else "\n".join(f"{n:<28} {s}" for n, s in report.items()))
+        sys.exit(1 if ERROR in report.values() else 0)
+
+    results = check_query_plans(collection)
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+    else:
+        for result in results:
+            flag = COLLSCAN if result["collscan"] else "ok"
+            print(f"{flag:<9}{result['name']:<40}{', '.join(result['indexes']) or '-'}")
+    scans = [r["name"] for r in results if r["collscan"]]
+    if scans:
+        print(f"{len(scans)} of {len(results)} queries scan the collection", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utility.property_listing_init import get_property_listing_collections
+
+logger = logging.getLogger(__name__)
+
+
+class PolledIndex:
+    """In-process copy of property_listing kept fresh by polling ``last_updated``.
+
+    Each refresh pulls the documents with ``last_updated`` at or after the
+    newest one seen (``$gte``, so a write sharing that timestamp is not
+    lost). The live ``property_id`` set is reconciled, catching deletions and
+    rows without a newer ``last_updated``, when the watermark moved or the
+    document count differs, and in any case every ``resync_interval``.
+    Subclasses keep the rows and implement ``_clear``, ``_upsert``,
+    ``_remove`` and ``__len__``.
+    """
+
+    label = "Polled index"
+    # find() projection of the documents kept; None keeps them whole
+    projection: Optional[Dict[str, Any]] = None
+
+    def __init__(
+        self,
+        collection_getter: Callable[[], Any] = get_property_listing_collections,
+        refresh_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        resync_interval: Optional[float] = None,
+    ):
+        self._collection_getter = collection_getter
+        self.refresh_interval = refresh_interval
+        self.resync_interval = resync_interval if resync_interval is not None else refresh_interval * 10
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._clear()
+        self._ids: set = set()
+        self._watermark: Any = None
+        self._loaded_at: Optional[float] = None
+        self._resynced_at: Optional[float] = None
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    def _upsert(self, documents: List[Dict[str, Any]]) -> int:
+        """Write ``documents`` (unique by property_id); returns how many rows changed."""
+
+        raise NotImplementedError
+
+    def _remove(self, property_ids: set) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _advance_watermark(self, documents: List[Dict[str, Any]]) -> None:
+        for doc in documents:
+            last_updated = doc.get('last_updated')
+            if last_updated is None:
+                continue
+            try:
+                if self._watermark is None or last_updated > self._watermark:
+                    self._watermark = last_updated
+            except TypeError:
+                logger.warning("Mixed last_updated types; falling back to full reloads")
+                self._watermark = None
+                return
+
+    def _apply(self, documents: List[Dict[str, Any]]) -> int:
+        unique = list({doc.get('property_id'): doc for doc in documents}.values())
+        updated = self._upsert(unique)
+        self._ids.update(doc.get('property_id') for doc in unique)
+        self._advance_watermark(unique)
+        return updated
+
+    def load(self) -> None:
+        """Full (re)load of the collection."""
+
+        documents = list(self._collection_getter().find({}, self.projection))
+        with self._lock:
+            self._reset()
+            self._apply(documents)
+            self._loaded_at = self._resynced_at = self._clock()
+        logger.info("%s loaded %d documents", self.label, len(documents))
+
+    def refresh(self) -> Dict[str, int]:
+        """Pull listings changed since the last seen ``last_updated`` and drop deleted ones."""
+
+        if not self.loaded or self._watermark is None:
+            self.load()
+            return {"updated": len(self), "removed": 0}
+
+        collection = self._collection_getter()
+        changed = list(collection.find({'last_updated': {'$gte': self._watermark}}, self.projection))
+        changed_ids = {d.get('property_id') for d in changed}
+        live = None
+        if self._needs_resync(collection, changed, changed_ids):
+            live = {d.get('property_id') for d in collection.find({}, {'property_id': 1, '_id': 0})}
+            # Present but never seen, e.g. inserted with an older last_updated
+            unseen = [key for key in live - self._ids - changed_ids if key is not None]
+            if unseen:
+                changed += list(collection.find({'property_id': {'$in': unseen}}, self.projection))
+
+        with self._lock:
+            now = self._clock()
+            if live is None:
+                updated = self._apply(changed)
+                gone: set = set()
+            else:
+                updated = self._apply([d for d in changed if d.get('property_id') in live])
+                gone = self._ids - live
+                self._remove(gone)
+                self._ids -= gone
+                self._resynced_at = now
+            self._loaded_at = now
+
+        if updated or gone:
+            logger.info("%s refreshed: %d updated, %d removed", self.label, updated, len(gone))
+        return {"updated": updated, "removed": len(gone)}
+
+    def _needs_resync(self, collection, changed: List[Dict[str, Any]], changed_ids: set) -> bool:
+        if self._clock() - self._resynced_at >= self.resync_interval:
+            return True
+        if any(doc.get('last_updated') != self._watermark for doc in changed):
+            return True
+        # Same watermark: only a deletion (or an insert without a newer last_updated) changes the count
+        return collection.count_documents({}) != len(self._ids | changed_ids)
+
+    def _stale(self) -> bool:
+        return not self.loaded or self._clock() - self._loaded_at >= self.refresh_interval
+
+    def ensure_fresh(self) -> None:
+        """Refresh when stale; one caller refreshes while the others read the current rows."""
+
+        with self._lock:
+            # Nothing to serve yet: wait for the load already in flight
+            while self._refreshing and not self.loaded:
+                self._refreshed.wait()
+            if self._refreshing or not self._stale():
+                return
+            self._refreshing = True
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._refreshed.notify_all()
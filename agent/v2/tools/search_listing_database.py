@@ -1,11 +1,10 @@
-from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
-from utility.llm_init import load_llm
-from langgraph.checkpoint.memory import InMemorySaver  
-
-from typing import Optional, Literal, TypedDict, Dict, Any, List
-from langchain.tools import tool
-from utility.property_listing_init import get_property_listing_collections
+from typing import Optional, Literal, Dict, Any, List, Tuple
+from typing_extensions import TypedDict
+from utility.property_listing_init import (
+    get_property_listing_collections,
+    get_async_property_listing_collections,
+)
+from utility.executor import run_sync
 # ----------------------------
 # TypedDict (NO defaults here)
 # ----------------------------
@@ -48,16 +47,23 @@ class ListingFilter(TypedDict, total=False):
 # ----------------------------
 
 from typing import Dict, Any
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 import json
-from agent.v2.utility import _serialize_listing_detail, _serialize_public_listing
-from agent.v2.utility import _serialize_listing_detail, get_listing_by_ids
+from agent.v2.utility import LISTING_PROJECTION, build_search_artifact, build_search_payload
+from agent.v2.tools.listing_index import get_listing_index, get_search_engine
+from agent.v2.tools.location_index import get_location_match, get_location_resolver
+from agent.v2.search_cache import acached_result, cached_result
+from utility.timing import stage_span
 
-@tool(
-    "search_listing_property_from_database",
-    description="Search property listings using structured optional filters"
-)
-def search_listing_property_from_database(input: ListingFilter) -> Dict[str, Any]:
+TOOL_NAME = "search_listing_property_from_database"
+
+def build_listing_query(input: ListingFilter, location_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Translate a ListingFilter into the Mongo query run against property_listing.
+
+    When ``location_ids`` is given, the location terms have already been
+    resolved through the location index and are matched by property_id
+    instead of by regex.
+    """
 
     query: Dict[str, Any] = {}
 
@@ -159,7 +165,10 @@ def search_listing_property_from_database(input: ListingFilter) -> Dict[str, Any
     # Location (fuzzy match)
     # ----------------------------
 
-    if input.get('location'):
+    if input.get('location') and location_ids is not None:
+        query['property_id'] = {'$in': location_ids}
+
+    elif input.get('location'):
         location_or = []
 
         for loc in input['location']:
@@ -171,34 +180,79 @@ def search_listing_property_from_database(input: ListingFilter) -> Dict[str, Any
                 {'description': {'$regex': loc, '$options': 'i'}},
             ])
 
-        query['$or'] = location_or
+        if '$or' in query:
+            # Keep the category clause; both alternatives must hold
+            query['$and'] = [{'$or': query.pop('$or')}, {'$or': location_or}]
+        else:
+            query['$or'] = location_or
 
-    # ----------------------------
-    # Execute query
-    # ----------------------------
+    return query
 
-    cursor = get_property_listing_collections().find(
-        query
-    )
 
-    results = list(cursor)
+def find_matching_listings(input: ListingFilter, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fetch every matching listing once, projected to the serialized fields."""
 
-    # ----------------------------
-    # Output shaping (LLM-friendly)
-    # ----------------------------
+    if get_search_engine() == 'memory':
+        return get_listing_index().search_documents(input)
+
+    return list(get_property_listing_collections().find(_execution_query(input, query), LISTING_PROJECTION))
+
+
+async def afind_matching_listings(input: ListingFilter, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Async twin of :func:`find_matching_listings`; blocking work runs in the bounded pool."""
+
+    if get_search_engine() == 'memory':
+        return await run_sync(get_listing_index().search_documents, input)
+
+    execute_query = query
+    if input.get('location') and get_location_match() == 'index':
+        execute_query = await run_sync(_execution_query, input, query)
 
-    if len(results) > 10:
-        return json.dumps({
-            "filters_applied": query,
-            "listing_count": len(results),
-            "property_ids": [r['property_id'] for r in results]
-        })
-    
-    all_industrial_listing = list(get_property_listing_collections().find())
+    collection = await get_async_property_listing_collections()
+    return await collection.find(execute_query, LISTING_PROJECTION)
 
-    return json.dumps({
-        "filters_applied": query,
-        "listing_count": len(results),
-        "property_ids": [r['property_id'] for r in results],
-        "recommended_listing": get_listing_by_ids(all_industrial_listing, [r['property_id'] for r in results])
-    })
+
+def _execution_query(input: ListingFilter, query: Dict[str, Any]) -> Dict[str, Any]:
+    if input.get('location') and get_location_match() == 'index':
+        location_ids = get_location_resolver().property_ids(input['location'])
+        return build_listing_query(input, location_ids=location_ids)
+    return query
+
+
+def _shape_results(query: Dict[str, Any], results: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    # Compact JSON for the LLM, structured artifact for the endpoint
+    content = json.dumps(build_search_payload(query, results), default=str)
+    return content, build_search_artifact(query, results)
+
+
+def _run_search(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    query = build_listing_query(input)
+    with stage_span('db_query', tool=TOOL_NAME):
+        results = find_matching_listings(input, query)
+    with stage_span('serialize', tool=TOOL_NAME):
+        return _shape_results(query, results)
+
+
+async def _arun_search(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    query = build_listing_query(input)
+    with stage_span('db_query', tool=TOOL_NAME):
+        results = await afind_matching_listings(input, query)
+    with stage_span('serialize', tool=TOOL_NAME):
+        return _shape_results(query, results)
+
+
+def _search_listing_property(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    return cached_result("search", input, _run_search)
+
+
+async def _asearch_listing_property(input: ListingFilter) -> Tuple[str, Dict[str, Any]]:
+    return await acached_result("search", input, _arun_search)
+
+
+search_listing_property_from_database = StructuredTool.from_function(
+    func=_search_listing_property,
+    coroutine=_asearch_listing_property,
+    name=TOOL_NAME,
+    description="Search property listings using structured optional filters",
+    response_format="content_and_artifact",
+)
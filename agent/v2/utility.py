@@ -1,4 +1,23 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from utility.tokens import count_tokens, truncate_to_tokens
+
+# Listings with at most this many matches are inlined for the LLM
+MAX_INLINE_LISTINGS = 10
+
+# Every top-level field read by the serializers below; anything else
+# (raw scrape data, extra media, ...) is left on the server.
+LISTING_FIELDS = (
+    "property_id", "slug", "title", "description",
+    "offer", "main_category", "sub_categories", "market_status", "tenure",
+    "location", "built_up_area", "land_size", "office_area", "construction",
+    "power_supply", "floor_loading", "ceiling_height", "loading_bays",
+    "key_features", "images", "thumbnail", "seo_title", "seo_description",
+    "is_featured", "listed_date", "last_updated",
+)
+
+LISTING_PROJECTION = {field: 1 for field in LISTING_FIELDS}
+LISTING_PROJECTION["_id"] = 0
 
 def _serialize_public_listing(doc: Dict[str, Any]) -> Dict[str, Any]:
     offer = doc.get("offer") or {}
@@ -107,6 +126,111 @@ def _serialize_listing_detail(doc: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# Detail fields the slug assistant never uses: identifiers, media, SEO, display counters
+_CONTEXT_DROPPED = (
+    "id", "slug", "images", "floor_plan", "seo", "featured", "views",
+    "business_nature", "created_at",
+)
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _context_value(value: Any) -> str:
+    if isinstance(value, dict) and "value" in value:
+        # Stored measures: {"value": 134000, "unit": "sqft"}
+        return f"{_context_value(value['value'])} {value.get('unit') or ''}".strip()
+    if isinstance(value, list):
+        return ", ".join(_context_value(v) for v in value if not _is_blank(v))
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (int, float)):
+        return f"{value:,}"
+    return " ".join(str(value).split())
+
+
+def _context_lines(detail: Dict[str, Any], doc: Dict[str, Any]) -> List[Tuple[str, str]]:
+    lines: List[Tuple[str, str]] = []
+
+    def add(key: str, value: Any) -> None:
+        if not _is_blank(value):
+            text = _context_value(value)
+            if text:
+                lines.append((key, text))
+
+    add("title", detail.get("title"))
+    add("offer", detail.get("type"))
+    price = detail.get("price")
+    if not _is_blank(price):
+        add("price", f"{detail.get('currency') or ''} {_context_value(price)}".strip())
+    add("category", list(dict.fromkeys(detail.get("category_type") or [])))
+    add("status", detail.get("status"))
+    # Not part of the detail payload, but buyers ask about both
+    add("tenure", doc.get("tenure"))
+
+    location = detail.get("location") or {}
+    parts: List[str] = []
+    for key in ("address", "area", "district", "state", "postcode"):
+        part = _context_value(location.get(key) or "")
+        # The street address often repeats the park or town name
+        if part and not any(part.lower() in p.lower() for p in parts):
+            parts.append(part)
+    add("location", parts)
+
+    for key, value in (detail.get("specifications") or {}).items():
+        add(key, value)
+        if key == "land_area":
+            add("office_area", doc.get("office_area"))
+    add("features", detail.get("features"))
+    add("updated", detail.get("updated_at"))
+    for key, value in detail.items():
+        if key not in _CONTEXT_DROPPED and key not in _CONTEXT_RENDERED:
+            add(key, value)
+    return lines
+
+
+# Detail fields placed by _context_lines itself
+_CONTEXT_RENDERED = (
+    "title", "type", "price", "currency", "category_type", "status", "location",
+    "specifications", "features", "updated_at", "description",
+)
+
+
+def render_listing_context(
+    doc: Optional[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    model: str = "gpt-4.1",
+) -> str:
+    """One listing as dense ``key: value`` lines for the slug prompt.
+
+    Built on :func:`_serialize_listing_detail`, without media, SEO and
+    bookkeeping fields, empty values or coordinates. Over ``max_tokens`` the
+    description is cut first, then the least important lines are dropped.
+    """
+
+    if doc is None:
+        return "No listing was found for this property."
+
+    detail = _serialize_listing_detail(doc)
+    lines = [f"{key}: {value}" for key, value in _context_lines(detail, doc)]
+    description = _context_value(detail.get("description") or "")
+
+    text = "\n".join(lines + ([f"description: {description}"] if description else []))
+    if not max_tokens or count_tokens(text, model) <= max_tokens:
+        return text
+
+    head = "\n".join(lines)
+    remaining = max_tokens - count_tokens(head + "\ndescription: ", model) - 1
+    if description and remaining > 0:
+        return f"{head}\ndescription: {truncate_to_tokens(description, remaining, model)}…"
+    while len(lines) > 1 and count_tokens("\n".join(lines), model) > max_tokens:
+        lines.pop()
+    return "\n".join(lines)
+
+
 def get_listing_by_ids(all_industrial_listing, property_ids):
     """
     Filter a list of listings and return only those whose property_id is in property_ids.
@@ -125,4 +249,28 @@ def get_listing_by_ids(all_industrial_listing, property_ids):
         if listing.get("property_id") in property_id_set
     ]
 
-    return [_serialize_listing_detail(x) for x in filtered_listings]
\ No newline at end of file
+    return [_serialize_listing_detail(x) for x in filtered_listings]
+
+
+def build_search_payload(query: Dict[str, Any], documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """LLM-facing search result: counts and IDs, plus details when the set is small."""
+
+    payload = {
+        "filters_applied": query,
+        "listing_count": len(documents),
+        "property_ids": [doc["property_id"] for doc in documents],
+    }
+    if len(documents) <= MAX_INLINE_LISTINGS:
+        payload["recommended_listing"] = [_serialize_listing_detail(doc) for doc in documents]
+    return payload
+
+
+def build_search_artifact(query: Dict[str, Any], documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Endpoint-facing search result, serialized from the same fetched documents."""
+
+    return {
+        "filters_applied": query,
+        "listing_count": len(documents),
+        "property_ids": [doc["property_id"] for doc in documents],
+        "listings": [_serialize_public_listing(doc) for doc in documents],
+    }
@@ -0,0 +1,81 @@
+"""Per-request agent setup cost: building agents per call vs. the registry.
+
+Run with ``python -m benchmarks.bench_agent_setup``. No network access is
+needed; the model client is constructed but never called.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain.agents import create_agent  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402
+from agent.v2.prompt.landy_slug_prompt import get_slug_prompt  # noqa: E402
+from agent.v2.prompt.landy_system_prompt import prompt  # noqa: E402
+from agent.v2.tools.search_listing_database import search_listing_property_from_database  # noqa: E402
+from utility.llm_init import load_llm  # noqa: E402
+
+
+def _per_request_setup(checkpointer):
+    """What each request did before the registry existed."""
+
+    tools = [search_listing_property_from_database]
+    create_agent(
+        system_prompt=prompt,
+        model=load_llm(model="gpt-4.1").bind_tools(tools),
+        tools=tools,
+        checkpointer=checkpointer,
+    )
+    create_agent(
+        system_prompt=get_slug_prompt({"slug": "demo"}),
+        model=load_llm(model="gpt-4.1"),
+        checkpointer=checkpointer,
+    )
+
+
+def _registry_setup(checkpointer):
+    registry.get_search_agent(checkpointer)
+    registry.get_slug_agent(checkpointer)
+    registry.slug_agent_config("thread", get_slug_prompt({"slug": "demo"}))
+
+
+def _measure(fn, checkpointer, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(checkpointer)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label, samples):
+    print(
+        f"{label:<22} mean={statistics.mean(samples):8.3f} ms  "
+        f"p50={statistics.median(samples):8.3f} ms  max={max(samples):8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    checkpointer = InMemorySaver()
+    registry.clear_agent_registry()
+    registry.warm_agents(checkpointer)
+
+    before = _measure(_per_request_setup, checkpointer, args.iterations)
+    after = _measure(_registry_setup, checkpointer, args.iterations)
+
+    _report("per-request build", before)
+    _report("registry lookup", after)
+    print(f"speed-up: {statistics.mean(before) / max(statistics.mean(after), 1e-9):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
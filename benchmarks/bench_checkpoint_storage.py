@@ -0,0 +1,129 @@
+"""Checkpoint bytes per thread and load latency before and after compact storage.
+
+Run with ``python -m benchmarks.bench_checkpoint_storage [--threads 20 --turns 15]``.
+Multi-turn search conversations run through the v2 search agent with a fake
+model, once on LangGraph's default serializer and once on
+``CompressedSerializer``; each is then pruned to the newest ``--keep-last``
+checkpoints with the same rule as ``utility.checkpoint_pruning``. This
+covers serialization and retention only. For a live database use
+``python -m utility.checkpointer_init measure``.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("LISTING_SEARCH_ENGINE", "mongo")
+os.environ.setdefault("LOCATION_MATCH", "regex")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, InMemoryCollection, load_listing_catalog, search_tool_call  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+from utility.checkpoint_serde import CompressedSerializer  # noqa: E402
+
+FILTERS = [
+    {"offer_type": "sale"},
+    {"category": ["warehouse"]},
+    {"category": ["factory", "warehouse"], "offer_type": "rent"},
+    {"offer_type": "sale", "location": ["Selangor"]},
+]
+
+
+def _model():
+    turn = {"n": 0}
+
+    def reply(messages):
+        if messages[-1].type == "tool":
+            return AIMessage(content="Here is what I found. Would you like to narrow it down by location or budget?")
+        turn["n"] += 1
+        return search_tool_call(FILTERS[turn["n"] % len(FILTERS)], call_id=f"call_{turn['n']}")
+
+    return FakeChatModel(replies=[reply])
+
+
+def _keep_last(saver: InMemorySaver, keep_last: int) -> None:
+    """In-memory equivalent of ``prune_checkpoints``."""
+
+    for thread_id, namespaces in saver.storage.items():
+        for ns, checkpoints in namespaces.items():
+            for checkpoint_id in sorted(checkpoints, reverse=True)[keep_last:]:
+                del checkpoints[checkpoint_id]
+                saver.writes.pop((thread_id, ns, checkpoint_id), None)
+
+    live = set()
+    for thread_id, namespaces in saver.storage.items():
+        for ns, checkpoints in namespaces.items():
+            for checkpoint, _, _ in checkpoints.values():
+                versions = saver.serde.loads_typed(checkpoint)["channel_versions"]
+                live.update((thread_id, ns, channel, version) for channel, version in versions.items())
+    for key in [k for k in saver.blobs if k not in live]:
+        del saver.blobs[key]
+
+
+def _stored_bytes(saver: InMemorySaver) -> int:
+    total = 0
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                total += len(checkpoint[1]) + len(metadata[1])
+    total += sum(len(blob[1] or b"") for blob in saver.blobs.values())
+    for writes in saver.writes.values():
+        total += sum(len(write[2][1]) for write in writes.values())
+    return total
+
+
+def _load_ms(saver: InMemorySaver, threads: int, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        for i in range(threads):
+            start = time.perf_counter()
+            saver.get_tuple({"configurable": {"thread_id": f"thread-{i}"}})
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _run(serde, args):
+    saver = InMemorySaver(serde=serde)
+    registry.clear_agent_registry()
+    agent = registry.get_search_agent(saver)
+    for i in range(args.threads):
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+        for turn in range(args.turns):
+            agent.invoke({"messages": [{"role": "user", "content": f"turn {turn}: show me more options"}]}, config)
+
+    checkpoints = sum(len(c) for ns in saver.storage.values() for c in ns.values())
+    rows = [("all checkpoints", checkpoints, _stored_bytes(saver), _load_ms(saver, args.threads))]
+    _keep_last(saver, args.keep_last)
+    checkpoints = sum(len(c) for ns in saver.storage.values() for c in ns.values())
+    rows.append((f"keep last {args.keep_last}", checkpoints, _stored_bytes(saver), _load_ms(saver, args.threads)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=15)
+    parser.add_argument("--keep-last", type=int, default=20)
+    parser.add_argument("--size", type=int, default=None)
+    args = parser.parse_args()
+
+    property_listing_init._client = {"property": {"property_listing": InMemoryCollection(load_listing_catalog(args.size))}}
+    model = _model()
+    registry.load_llm = lambda model_name="gpt-4.1", **_: model
+
+    print(f"threads={args.threads} turns={args.turns}\n")
+    print(f"{'serializer':<14}{'retention':<18}{'checkpoints':>12}{'KB/thread':>11}{'load ms':>9}")
+    for name, serde in (("msgpack", None), ("msgpack+zstd", CompressedSerializer())):
+        for retention, checkpoints, total, load_ms in _run(serde, args):
+            print(
+                f"{name:<14}{retention:<18}{checkpoints // args.threads:>12}"
+                f"{total / args.threads / 1024:>11.1f}{load_ms:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Cold-start cost: import time, import profile and first-request latency.
+
+Run with ``python -m benchmarks.bench_cold_start [--runs 5]``. Every run is a
+fresh interpreter, as on a serverless cold start. The child imports
+``src.index``, enters the FastAPI lifespan (with ``WARMUP_ON_STARTUP`` on or
+off) and times the first ``/health`` and ``/api/v2/invoke``. The OpenAI client
+is constructed but never called; replies come from ``FakeChatModel`` and the
+checkpointer and MongoDB are stubbed, so only local work is measured.
+
+``--profile`` adds the ``python -X importtime`` breakdown of ``src.index`` by
+top-level package.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MODES = {"no_warmup": "false", "warmup": "true"}
+
+
+def _child() -> None:
+    """One cold start; prints a JSON line with the timings in milliseconds."""
+
+    start = time.perf_counter()
+    import src.index as index
+    import_ms = (time.perf_counter() - start) * 1000
+
+    # Stubs are imported after the timed import so they don't pre-load anything
+    from fastapi.testclient import TestClient
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from agent.v2 import registry
+    from benchmarks.fixtures import FakeChatModel, InMemoryCollection, load_listing_catalog, search_then_answer
+    from utility import property_listing_init
+
+    model = FakeChatModel(replies=[search_then_answer({"category": ["warehouse"]})])
+    load_llm = registry.load_llm
+
+    def stub_llm(model_name="gpt-4.1", **kwargs):
+        # Build the real client for its import and setup cost; answer with the fake
+        load_llm(model=model_name)
+        return model
+
+    registry.load_llm = stub_llm
+    property_listing_init._client = {"property": {"property_listing": InMemoryCollection(load_listing_catalog())}}
+    checkpointer = InMemorySaver()
+
+    async def open_checkpointer(db_uri=None):
+        return checkpointer
+
+    index.DB_URI = "postgresql://benchmark"
+    index.open_checkpointer = open_checkpointer
+    index.start_checkpoint_pruning = lambda: None
+    index.get_checkpointer = lambda: checkpointer
+
+    start = time.perf_counter()
+    with TestClient(index.app) as client:
+        startup_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        client.get("/health").raise_for_status()
+        health_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        client.post("/api/v2/invoke", json={"message": "any warehouse?", "thread_id": "cold-1"}).raise_for_status()
+        first_invoke_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        client.post("/api/v2/invoke", json={"message": "any warehouse?", "thread_id": "cold-2"}).raise_for_status()
+        second_invoke_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({
+        "import_ms": import_ms,
+        "startup_ms": startup_ms,
+        "health_ms": health_ms,
+        "first_invoke_ms": first_invoke_ms,
+        "second_invoke_ms": second_invoke_ms,
+    }))
+
+
+def _child_env(warmup: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "WARMUP_ON_STARTUP": warmup,
+        "OPENAI_API_KEY": env.get("OPENAI_API_KEY") or "sk-benchmark",
+        "MONGODB_PW": "benchmark",
+        "LISTING_SEARCH_ENGINE": "mongo",
+        "LOG_LEVEL": "WARNING",
+    })
+    env.pop("DB_URI", None)
+    return env
+
+
+def cold_start(runs: int) -> Dict[str, Dict[str, float]]:
+    """Median timings per mode over ``runs`` fresh interpreters."""
+
+    results = {}
+    for mode, warmup in MODES.items():
+        samples: Dict[str, List[float]] = defaultdict(list)
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_cold_start", "--child"],
+                cwd=ROOT,
+                env=_child_env(warmup),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            for key, value in json.loads(output.strip().splitlines()[-1]).items():
+                samples[key].append(value)
+        results[mode] = {key: statistics.median(values) for key, values in samples.items()}
+    return results
+
+
+def import_profile(module: str = "src.index", top: int = 12) -> Dict[str, Any]:
+    """Self import time of ``module`` grouped by top-level package (``-X importtime``)."""
+
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=_child_env("false"),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    by_package: Dict[str, int] = defaultdict(int)
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        by_package[name.split(".")[0]] += int(self_us)
+        if name == module:
+            total_us = int(cumulative_us)
+
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"total_ms": total_us / 1000, "packages_ms": {name: us / 1000 for name, us in ranked}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", action="store_true", help="Also print the import-time profile")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    results: Dict[str, Any] = {"runs": args.runs, "cold_start": cold_start(args.runs)}
+    if args.profile:
+        results["import_profile"] = import_profile()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Median of {args.runs} fresh interpreters (ms)")
+    columns = ["import_ms", "startup_ms", "health_ms", "first_invoke_ms", "second_invoke_ms"]
+    print(f"{'mode':<11}" + "".join(f"{column:>18}" for column in columns))
+    for mode, timings in results["cold_start"].items():
+        print(f"{mode:<11}" + "".join(f"{timings[column]:>18.1f}" for column in columns))
+
+    if args.profile:
+        profile = results["import_profile"]
+        print(f"\nimport src.index: {profile['total_ms']:.1f} ms (self time by package)")
+        for name, ms in profile["packages_ms"].items():
+            print(f"  {name:<24}{ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Throughput of /api/v2/invoke as concurrent users grow.
+
+Run with ``python -m benchmarks.bench_concurrency``. The LLM and Mongo are
+stubbed with fixed latencies (async sleep for the model, a blocking sleep
+for each Mongo call), so throughput should grow with the number of users
+until the blocking pool (BLOCKING_POOL_SIZE) saturates.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("LISTING_SEARCH_ENGINE", "mongo")
+
+import httpx  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402
+from agent.v2 import registry  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, InMemoryCollection, load_listing_catalog, search_then_answer  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+
+
+def _install_stubs(llm_latency: float, db_latency: float) -> None:
+    collection = InMemoryCollection(load_listing_catalog(), latency=db_latency)
+    property_listing_init._client = {"property": {"property_listing": collection}}
+
+    model = FakeChatModel(replies=[search_then_answer({"category": ["warehouse"]})], latency=llm_latency)
+    registry.load_llm = lambda model_name="gpt-4.1", **kwargs: model
+    registry.clear_agent_registry()
+
+    checkpointer = InMemorySaver()
+    index.get_checkpointer = lambda: checkpointer
+
+
+async def _user(client: httpx.AsyncClient, user: int, turns: int) -> None:
+    for turn in range(turns):
+        response = await client.post(
+            "/api/v2/invoke",
+            json={"message": f"warehouse please ({turn})", "thread_id": f"user-{user}"},
+        )
+        response.raise_for_status()
+
+
+async def _run(users: int, turns: int) -> float:
+    transport = httpx.ASGITransport(app=index.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(client, u, turns) for u in range(users)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--db-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    _install_stubs(args.llm_latency, args.db_latency)
+    print(f"llm={args.llm_latency * 1000:.0f} ms/call  db={args.db_latency * 1000:.0f} ms/call  turns/user={args.turns}")
+    print(f"{'users':>6}{'requests':>10}{'seconds':>9}{'req/s':>8}")
+    for users in args.users:
+        elapsed = asyncio.run(_run(users, args.turns))
+        requests = users * args.turns
+        print(f"{users:>6}{requests:>10}{elapsed:>9.2f}{requests / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Accuracy and latency of the rule-based ListingFilter fast path.
+
+Run with ``python -m benchmarks.bench_filter_extraction [--json]``.
+
+The evaluation set (``filter_extraction_cases.json``) pairs opening
+messages with the filter the search tool should receive, or ``null`` where
+the fast path must stand aside. Reported:
+
+* fast path taken on how many expected cases (coverage), how many of those
+  were exactly right (precision), and wrong triggers on ``null`` cases;
+* per-field accuracy over the expected cases;
+* extraction time per message;
+* a first turn through the search agent with the fast path off and on,
+  the model stubbed with ``--llm-latency`` seconds per call.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("LISTING_SEARCH_ENGINE", "mongo")
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402
+from agent.v2.batch import run_turn  # noqa: E402
+from agent.v2.filter_extraction import extract_listing_filter  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, InMemoryCollection, load_listing_catalog, search_then_answer  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+
+CASES_PATH = Path(__file__).resolve().parent / "filter_extraction_cases.json"
+
+
+def load_cases():
+    with open(CASES_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _normalise(filters):
+    if filters is None:
+        return None
+    return {
+        key: sorted(value) if isinstance(value, list) else float(value) if isinstance(value, (int, float)) else value
+        for key, value in filters.items()
+    }
+
+
+def evaluate(cases):
+    """Coverage, precision, wrong triggers and per-field accuracy of :func:`extract_listing_filter`."""
+
+    expected_cases = [c for c in cases if c["expected"] is not None]
+    taken = exact = wrong_triggers = 0
+    field_total = field_correct = 0
+    failures = []
+    for case in cases:
+        extraction = extract_listing_filter(case["message"])
+        got = _normalise(extraction.filters) if extraction.confident else None
+        expected = _normalise(case["expected"])
+        if expected is None:
+            if got is not None:
+                wrong_triggers += 1
+                failures.append({"message": case["message"], "expected": None, "got": got})
+            continue
+        for key, value in expected.items():
+            field_total += 1
+            field_correct += _normalise(extraction.filters).get(key) == value
+        if got is None:
+            continue
+        taken += 1
+        if got == expected:
+            exact += 1
+        else:
+            failures.append({"message": case["message"], "expected": expected, "got": got})
+    return {
+        "cases": len(cases),
+        "coverage": taken / max(1, len(expected_cases)),
+        "precision": exact / max(1, taken),
+        "wrong_triggers": wrong_triggers,
+        "field_accuracy": field_correct / max(1, field_total),
+        "failures": failures,
+    }
+
+
+def extraction_latency(cases, repeat):
+    samples = []
+    for _ in range(repeat):
+        for case in cases:
+            start = time.perf_counter()
+            extract_listing_filter(case["message"])
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "p50_us": round(statistics.median(samples), 1),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 1),
+    }
+
+
+async def _first_turns(cases, fast_path, llm_latency):
+    os.environ["FILTER_FAST_PATH"] = "true" if fast_path else "false"
+    registry.clear_agent_registry()
+    checkpointer = InMemorySaver()
+    samples, calls = [], 0
+    for number, case in enumerate(cases):
+        model = FakeChatModel(replies=[search_then_answer(case["expected"] or {})], latency=llm_latency)
+        registry.load_llm = lambda model_name="gpt-4.1", **kwargs: model
+        registry.clear_agent_registry()
+        agent = registry.get_search_agent(checkpointer)
+        start = time.perf_counter()
+        await run_turn(agent, case["message"], {"configurable": {"thread_id": f"eval-{fast_path}-{number}"}})
+        samples.append((time.perf_counter() - start) * 1000)
+        calls += len(model.calls)
+    return {"median_ms": round(statistics.median(samples), 1), "model_calls": calls}
+
+
+def end_to_end(cases, llm_latency):
+    property_listing_init._client = {"property": {"property_listing": InMemoryCollection(load_listing_catalog())}}
+    cases = [c for c in cases if c["expected"] is not None]
+    return {
+        "fast_path_off": asyncio.run(_first_turns(cases, False, llm_latency)),
+        "fast_path_on": asyncio.run(_first_turns(cases, True, llm_latency)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--skip-agent", action="store_true", help="only measure the extractor")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    cases = load_cases()
+    report = {"accuracy": evaluate(cases), "latency": extraction_latency(cases, args.repeat)}
+    if not args.skip_agent:
+        report["first_turn"] = end_to_end(cases, args.llm_latency)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    accuracy = report["accuracy"]
+    print(f"cases={accuracy['cases']}  coverage={accuracy['coverage']:.0%}  precision={accuracy['precision']:.0%}  "
+          f"wrong_triggers={accuracy['wrong_triggers']}  field_accuracy={accuracy['field_accuracy']:.0%}")
+    print(f"extraction p50={report['latency']['p50_us']} us  p99={report['latency']['p99_us']} us")
+    for failure in accuracy["failures"]:
+        print(f"  MISS {failure['message']!r}: expected {failure['expected']}, got {failure['got']}")
+    if "first_turn" in report:
+        print(f"first turn, llm={args.llm_latency * 1000:.0f} ms/call")
+        for mode, result in report["first_turn"].items():
+            print(f"  {mode:<14} median={result['median_ms']:>7} ms  model_calls={result['model_calls']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Location term resolution: trigram/token index vs. regex scan.
+
+Run with ``python -m benchmarks.bench_location_index [--size 100000]``.
+The regex path applies the tool's five case-insensitive regexes to every
+listing, which is what Mongo does for an unanchored ``$regex`` without a
+usable index.
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from agent.v2.tools.location_index import LocationIndex, location_fields
+from benchmarks.fixtures import load_listing_catalog
+
+TERMS = [
+    "Shah Alam",
+    "Port Klang",
+    "PJ",
+    "Balakong",
+    "Telok Panglima Garang",
+    "Sepang",
+    "Seri Kembangan",
+    "Bangi",
+    "Shah Alm",
+    "Nowhere Park",
+]
+
+
+def _regex_scan(documents, term):
+    pattern = re.compile(term, re.IGNORECASE)
+    hits = []
+    for doc in documents:
+        if any(value and pattern.search(value) for value in location_fields(doc).values()):
+            hits.append(doc["property_id"])
+    return hits
+
+
+def _time(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = load_listing_catalog(args.size)
+
+    start = time.perf_counter()
+    index = LocationIndex()
+    for doc in documents:
+        index.add(doc["property_id"], location_fields(doc))
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"catalog={len(documents)} vocabulary={index.vocabulary_size} build={build_ms:.0f} ms\n")
+
+    print(f"{'term':<24}{'regex ms':>10}{'hits':>8}{'top-10 ms':>11}{'all ms':>9}{'hits':>8}")
+    for term in TERMS:
+        regex_ms, regex_hits = _time(lambda: _regex_scan(documents, term), 1)
+        top_ms, _ = _time(lambda: index.resolve(term, limit=10), args.repeat)
+        all_ms, index_hits = _time(lambda: index.candidate_ids([term]), args.repeat)
+        print(f"{term:<24}{regex_ms:>10.1f}{len(regex_hits):>8}{top_ms:>11.3f}{all_ms:>9.3f}{len(index_hits):>8}")
+
+
+if __name__ == "__main__":
+    main()
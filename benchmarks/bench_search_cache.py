@@ -0,0 +1,129 @@
+"""Replay a multi-turn conversation mix with and without the search result cache.
+
+Run with ``python -m benchmarks.bench_search_cache [--conversations 200]``.
+Each conversation follows one of a few buyer journeys, narrowing its filter
+turn by turn; popular journeys recur across users, and lists arrive in a
+shuffled order with mixed casing as an LLM would emit them. Mongo calls are
+stubbed with a fixed blocking latency.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("LISTING_SEARCH_ENGINE", "mongo")
+
+from agent.v2 import search_cache  # noqa: E402
+from agent.v2.tools.search_listing_database import search_listing_property_from_database  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, load_listing_catalog  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+
+# Each journey is the filter after turn 1, 2, 3, ...
+JOURNEYS = [
+    [
+        {"category": ["warehouse"]},
+        {"category": ["warehouse"], "offer_type": "rent"},
+        {"category": ["warehouse"], "offer_type": "rent", "max_price": 50000},
+        {"category": ["warehouse"], "offer_type": "rent", "max_price": 50000, "location": ["Shah Alam"]},
+    ],
+    [
+        {"category": ["factory", "detached-factory", "semi-d-factory"]},
+        {"category": ["factory", "detached-factory", "semi-d-factory"], "offer_type": "sale"},
+        {"category": ["factory", "detached-factory", "semi-d-factory"], "offer_type": "sale", "min_power_supply": 500},
+    ],
+    [
+        {"category": ["industrial-land"]},
+        {"category": ["industrial-land"], "tenure": "freehold"},
+        {"category": ["industrial-land"], "tenure": "freehold", "min_land_size": 50000},
+        {"category": ["industrial-land"], "tenure": "freehold", "min_land_size": 50000, "location": ["Klang"]},
+    ],
+    [
+        {"offer_type": "sale"},
+        {"offer_type": "sale", "location": ["Selangor"]},
+        {"offer_type": "sale", "location": ["Selangor"], "min_built_up_size": 10000},
+    ],
+    [
+        {"category": ["showroom", "car-showroom"]},
+        {"category": ["showroom", "car-showroom"], "offer_type": "rent", "location": ["Balakong"]},
+    ],
+]
+
+# Popular journeys recur more often
+JOURNEY_WEIGHTS = [8, 5, 3, 2, 1]
+
+
+def _as_emitted(filters, rng):
+    """The same filter the way a model might emit it on another turn."""
+
+    emitted = {}
+    for key in rng.sample(list(filters), len(filters)):
+        value = filters[key]
+        if isinstance(value, list):
+            value = rng.sample(value, len(value))
+            if key == "location":
+                value = [v.lower() if rng.random() < 0.5 else v for v in value]
+        emitted[key] = value
+    return emitted
+
+
+def _conversation_mix(conversations, seed):
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(conversations):
+        journey = rng.choices(JOURNEYS, weights=JOURNEY_WEIGHTS)[0]
+        # Some users stop early; the agent re-runs the search on a clarifying turn
+        turns = journey[:rng.randint(1, len(journey))]
+        for filters in turns:
+            calls.append(_as_emitted(filters, rng))
+            if rng.random() < 0.3:
+                calls.append(_as_emitted(filters, rng))
+    return calls
+
+
+def _replay(calls, collection, cache_entries):
+    os.environ["SEARCH_CACHE_MAX_ENTRIES"] = str(cache_entries)
+    search_cache.reset_search_cache_for_tests()
+    collection.round_trips = 0
+
+    samples = []
+    for filters in calls:
+        start = time.perf_counter()
+        search_listing_property_from_database.invoke({"input": filters})
+        samples.append((time.perf_counter() - start) * 1000)
+
+    cache = search_cache.get_search_cache()
+    return {
+        "round_trips": collection.round_trips,
+        "median_ms": statistics.median(samples),
+        "p95_ms": statistics.quantiles(samples, n=20)[-1],
+        "total_s": sum(samples) / 1000,
+        "hit_ratio": cache.stats()["hit_ratio"] if cache else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--size", type=int, default=5_000)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    collection = InMemoryCollection(load_listing_catalog(args.size), latency=args.db_latency)
+    property_listing_init._client = {"property": {"property_listing": collection}}
+    calls = _conversation_mix(args.conversations, args.seed)
+    print(f"catalog={len(collection.documents)} searches={len(calls)} distinct journeys={len(JOURNEYS)}\n")
+
+    print(f"{'mode':<10}{'round trips':>12}{'median ms':>11}{'p95 ms':>9}{'total s':>9}{'hit ratio':>11}")
+    for mode, entries in (("no cache", 0), ("cache", 512)):
+        result = _replay(calls, collection, entries)
+        print(
+            f"{mode:<10}{result['round_trips']:>12}{result['median_ms']:>11.2f}{result['p95_ms']:>9.2f}"
+            f"{result['total_s']:>9.2f}{result['hit_ratio']:>11.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
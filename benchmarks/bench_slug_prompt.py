@@ -0,0 +1,77 @@
+"""Slug prompt size before and after the compact property rendering.
+
+Run with ``python -m benchmarks.bench_slug_prompt [--size 87] [--max-tokens 800]``.
+
+"Before" is the slug prompt with the raw ``find_one`` document interpolated
+into it, ``_id`` included. "After" is the prompt that :class:`SlugPropertyCache`
+builds now. The ``property_*`` rows count the property section alone.
+Token counts use tiktoken when its encoding can be loaded, otherwise the
+character estimate in ``utility.tokens``.
+"""
+
+import argparse
+import json
+import statistics
+
+from bson import ObjectId
+
+from agent.v2.prompt.landy_slug_prompt import get_slug_prompt
+from agent.v2.utility import render_listing_context
+from benchmarks.fixtures import load_listing_catalog
+from utility.tokens import count_tokens, get_encoding
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.mean(ordered), 1),
+        "p95": ordered[max(0, int(len(ordered) * 0.95) - 1)],
+        "max": ordered[-1],
+    }
+
+
+def measure(documents, max_tokens):
+    before, after, property_before, property_after = [], [], [], []
+    for document in documents:
+        # What find_one returns from Mongo
+        raw = {"_id": ObjectId(), **document}
+        rendered = render_listing_context(raw, max_tokens)
+        before.append(count_tokens(get_slug_prompt(raw)))
+        after.append(count_tokens(get_slug_prompt(rendered)))
+        property_before.append(count_tokens(str(raw)))
+        property_after.append(count_tokens(rendered))
+    report = {
+        "listings": len(documents),
+        "before": _summary(before),
+        "after": _summary(after),
+        "property_before": _summary(property_before),
+        "property_after": _summary(property_after),
+    }
+    report["saved_per_turn"] = round(report["before"]["mean"] - report["after"]["mean"], 1)
+    report["reduction"] = round(1 - report["after"]["mean"] / report["before"]["mean"], 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=None, help="catalog size (default: the fixture as is)")
+    parser.add_argument("--max-tokens", type=int, default=800)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = measure(load_listing_catalog(args.size), args.max_tokens)
+    report["tokenizer"] = "tiktoken" if get_encoding() is not None else "estimate"
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['listings']} listings, tokens counted with {report['tokenizer']}")
+    print(f"{'':<17}{'mean':>8}{'p95':>8}{'max':>8}")
+    for label in ("before", "after", "property_before", "property_after"):
+        row = report[label]
+        print(f"{label:<17}{row['mean']:>8}{row['p95']:>8}{row['max']:>8}")
+    print(f"saved {report['saved_per_turn']} tokens per slug turn ({report['reduction']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
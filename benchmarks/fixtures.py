@@ -0,0 +1,555 @@
+"""Offline stand-ins shared by the benchmarks and the test-suite."""
+
+import asyncio
+import copy
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+from pymongo.errors import DuplicateKeyError
+
+Reply = Union[str, AIMessage, Callable[[List[BaseMessage]], AIMessage]]
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that replays canned replies after a configurable latency.
+
+    ``replies`` are used in order and cycled; each entry may be a string, an
+    ``AIMessage`` (e.g. carrying ``tool_calls``) or a callable that builds the
+    reply from the incoming messages.
+    """
+
+    replies: List[Any] = Field(default_factory=lambda: ["ok"])
+    latency: float = 0.0
+    calls: List[List[BaseMessage]] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_reply(self, messages: List[BaseMessage]) -> AIMessage:
+        reply = self.replies[len(self.calls) % len(self.replies)]
+        self.calls.append(list(messages))
+        if callable(reply):
+            reply = reply(messages)
+        if isinstance(reply, str):
+            reply = AIMessage(content=reply)
+        return reply
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_reply(messages))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Stream text replies word by word; tool calls arrive in one chunk."""
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._next_reply(messages)
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=reply.content,
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                    for i, call in enumerate(reply.tool_calls)
+                ],
+            ))
+            return
+        words = reply.content.split(" ")
+        for i, word in enumerate(words):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def search_tool_call(filters: Dict[str, Any], call_id: str = "call_search") -> AIMessage:
+    """Model reply asking for one ``search_listing_property_from_database`` call."""
+
+    return AIMessage(
+        content="",
+        tool_calls=[{
+            "name": "search_listing_property_from_database",
+            "args": {"input": filters},
+            "id": call_id,
+            "type": "tool_call",
+        }],
+    )
+
+
+def search_then_answer(filters: Dict[str, Any], answer: str = "I'm seeing some properties."):
+    """Reply callable: search first, answer once the tool result is in the history.
+
+    Unlike a fixed reply list this stays correct when many threads share one model.
+    """
+
+    def reply(messages: List[BaseMessage]) -> AIMessage:
+        if messages and messages[-1].type == "tool":
+            return AIMessage(content=answer)
+        return search_tool_call(filters)
+
+    return reply
+
+
+def system_prompt_of(messages: List[BaseMessage]) -> Optional[str]:
+    for message in messages:
+        if message.type == "system":
+            return message.content
+    return None
+
+
+# ----------------------------
+# In-memory Mongo collection
+# ----------------------------
+
+_MISSING = object()
+
+
+def _resolve(doc: Any, path: str) -> List[Any]:
+    """Values reachable at a dotted path, flattening arrays like Mongo does."""
+
+    values = [doc]
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                value = [v.get(part, _MISSING) for v in value if isinstance(v, dict)]
+                next_values.extend(value)
+            elif isinstance(value, dict):
+                next_values.append(value.get(part, _MISSING))
+        values = next_values
+    flat = []
+    for value in values:
+        if isinstance(value, list):
+            flat.extend(value)
+        elif value is not _MISSING:
+            flat.append(value)
+    return flat
+
+
+def _comparable(a: Any, b: Any) -> bool:
+    number = (int, float)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool)
+    if isinstance(a, number) and isinstance(b, number):
+        return True
+    return type(a) is type(b)
+
+
+def _match_operators(values: List[Any], spec: Dict[str, Any]) -> bool:
+    for op, operand in spec.items():
+        if op == "$options":
+            continue
+        if op == "$in":
+            ok = any(v in operand for v in values)
+        elif op == "$nin":
+            ok = not any(v in operand for v in values)
+        elif op == "$exists":
+            ok = bool(values) == bool(operand)
+        elif op == "$ne":
+            ok = operand not in values
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in spec.get("$options", "") else 0
+            pattern = re.compile(operand, flags)
+            ok = any(isinstance(v, str) and pattern.search(v) for v in values)
+        elif op in _COMPARATORS:
+            compare = _COMPARATORS[op]
+            ok = any(_comparable(v, operand) and compare(v, operand) for v in values)
+        else:
+            raise NotImplementedError(f"Operator {op} is not supported by InMemoryCollection")
+        if not ok:
+            return False
+    return True
+
+
+_COMPARATORS = {
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        else:
+            values = _resolve(doc, key)
+            if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+                if not _match_operators(values, condition):
+                    return False
+            elif condition is None:
+                if values and any(v is not None for v in values):
+                    return False
+            elif condition not in values:
+                return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    exclude = {k for k, v in projection.items() if not v}
+    if include:
+        result: Dict[str, Any] = {}
+        for path in include:
+            top = path.split(".")[0]
+            if top in doc:
+                result[top] = copy.deepcopy(doc[top])
+        if "_id" in doc and "_id" not in exclude:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k not in exclude}
+
+
+def _field(doc: Dict[str, Any], expression: str) -> Any:
+    values = _resolve(doc, expression.lstrip("$"))
+    if not values:
+        return None
+    return values[0]
+
+
+def _run_pipeline(documents: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluate the aggregation stages the facet mode uses."""
+
+    docs = list(documents)
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$match":
+            docs = [d for d in docs if matches(d, spec)]
+        elif op == "$facet":
+            docs = [{name: _run_pipeline(docs, sub) for name, sub in spec.items()}]
+        elif op == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif op == "$unwind":
+            path = spec.lstrip("$")
+            unwound = []
+            for d in docs:
+                values = d.get(path)
+                for value in values if isinstance(values, list) else []:
+                    unwound.append({**d, path: value})
+            docs = unwound
+        elif op == "$sortByCount":
+            counts: Dict[Any, int] = {}
+            for d in docs:
+                key = _field(d, spec)
+                counts[key] = counts.get(key, 0) + 1
+            docs = [{"_id": k, "count": c} for k, c in sorted(counts.items(), key=lambda kv: -kv[1])]
+        elif op == "$bucket":
+            boundaries = spec["boundaries"]
+            buckets: Dict[Any, int] = {}
+            for d in docs:
+                value = _field(d, spec["groupBy"])
+                key = spec["default"]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    for lower, upper in zip(boundaries, boundaries[1:]):
+                        if lower <= value < upper:
+                            key = lower
+                            break
+                buckets[key] = buckets.get(key, 0) + 1
+            numeric = sorted(k for k in buckets if k != spec["default"])
+            docs = [{"_id": k, "count": buckets[k]} for k in numeric]
+            if spec["default"] in buckets:
+                docs.append({"_id": spec["default"], "count": buckets[spec["default"]]})
+        else:
+            raise NotImplementedError(f"Stage {op} is not supported by InMemoryCollection")
+    return docs
+
+
+class InMemoryCollection:
+    """Small pymongo ``Collection`` stand-in covering the queries this repo issues.
+
+    ``round_trips`` counts calls that would hit the server, so tests can
+    assert on database traffic.
+    """
+
+    def __init__(self, documents: Optional[List[Dict[str, Any]]] = None, latency: float = 0.0):
+        self.documents: List[Dict[str, Any]] = [copy.deepcopy(d) for d in documents or []]
+        self.latency = latency
+        self.round_trips = 0
+        self.queries: List[Dict[str, Any]] = []
+        self.indexes: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)]}}
+
+    def _record(self, query: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.latency:
+            # Blocking on purpose: pymongo calls block their thread too
+            time.sleep(self.latency)
+        self.round_trips += 1
+        query = query or {}
+        self.queries.append(query)
+        return query
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        query = self._record(query)
+        return InMemoryCursor(self, query, [_project(d, projection) for d in self.documents if matches(d, query)])
+
+    def find_one(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ):
+        query = self._record(query)
+        for doc in _sorted(self.documents, sort):
+            if matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        query = self._record(query)
+        return sum(1 for d in self.documents if matches(d, query))
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]):
+        self._record(pipeline[0].get("$match") if pipeline and "$match" in pipeline[0] else {})
+        return _run_pipeline(self.documents, pipeline)
+
+    def insert_one(self, document: Dict[str, Any]) -> None:
+        self.documents.append(copy.deepcopy(document))
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any]) -> None:
+        for doc in self.documents:
+            if matches(doc, query):
+                for path, value in update.get("$set", {}).items():
+                    target = doc
+                    parts = path.split(".")
+                    for part in parts[:-1]:
+                        target = target.setdefault(part, {})
+                    target[parts[-1]] = value
+                return
+
+    def delete_one(self, query: Dict[str, Any]) -> None:
+        for i, doc in enumerate(self.documents):
+            if matches(doc, query):
+                del self.documents[i]
+                return
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        return copy.deepcopy(self.indexes)
+
+    def create_index(self, keys: List[Tuple[str, int]], name: Optional[str] = None, unique: bool = False) -> str:
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        if unique:
+            seen = set()
+            for doc in self.documents:
+                value = repr([_field(doc, field) for field, _ in keys])
+                if value in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key error index: {name} dup key: {value}")
+                seen.add(value)
+        self.indexes[name] = {"key": list(keys), **({"unique": True} if unique else {})}
+        return name
+
+    def explain_plan(self, query: Dict[str, Any], sort: Optional[List[Tuple[str, int]]] = None) -> Dict[str, Any]:
+        """A winning plan shaped like ``explain()["queryPlanner"]["winningPlan"]``.
+
+        Rough planner: an index whose leading field has an equality or range
+        predicate (or leads the sort) is scanned; an ``$or`` is an OR of
+        index scans when every branch has one; otherwise the collection is
+        scanned.
+        """
+
+        scan = self._index_scan(query) or self._or_scan(query)
+        if scan is None and sort:
+            scan = self._index_scan({}, sort[0][0])
+        return {"stage": "FETCH", "inputStage": scan} if scan else {"stage": "COLLSCAN", "filter": query}
+
+    def _index_scan(self, query: Dict[str, Any], sort_field: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        fields = set(_predicate_fields(query))
+        if sort_field:
+            fields.add(sort_field)
+        for name, info in self.indexes.items():
+            leading = info["key"][0][0]
+            if leading in fields:
+                return {"stage": "IXSCAN", "indexName": name, "keyPattern": dict(info["key"])}
+        return None
+
+    def _or_scan(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        clauses = [query] + [c for c in query.get("$and", []) if isinstance(c, dict)]
+        for clause in clauses:
+            branches = clause.get("$or")
+            if not branches:
+                continue
+            scans = [self._index_scan(branch) for branch in branches]
+            if all(scans):
+                return {"stage": "OR", "inputStages": scans}
+        return None
+
+
+class InMemoryCursor(list):
+    """``find`` result: a list that also supports ``sort``, ``limit`` and ``explain``."""
+
+    def __init__(self, collection: InMemoryCollection, query: Dict[str, Any], documents: List[Dict[str, Any]]):
+        super().__init__(documents)
+        self._collection = collection
+        self._query = query
+        self._sort: List[Tuple[str, int]] = []
+
+    def sort(self, key: Union[str, List[Tuple[str, int]]], direction: int = 1) -> "InMemoryCursor":
+        self._sort = [(key, direction)] if isinstance(key, str) else list(key)
+        self[:] = _sorted(list(self), self._sort)
+        return self
+
+    def limit(self, count: int) -> "InMemoryCursor":
+        if count:
+            del self[count:]
+        return self
+
+    def explain(self) -> Dict[str, Any]:
+        return {"queryPlanner": {"winningPlan": self._collection.explain_plan(self._query, self._sort)}}
+
+
+def _predicate_fields(query: Dict[str, Any]) -> List[str]:
+    """Fields an index bound can be built from (``$regex`` needs a full index scan; treated as none)."""
+
+    fields = []
+    for key, condition in query.items():
+        if key == "$and":
+            for clause in condition:
+                fields.extend(_predicate_fields(clause))
+        elif not key.startswith("$") and not (isinstance(condition, dict) and "$regex" in condition):
+            fields.append(key)
+    return fields
+
+
+def _sorted(documents: List[Dict[str, Any]], sort: Optional[List[Tuple[str, int]]]) -> List[Dict[str, Any]]:
+    for field, direction in reversed(sort or []):
+        present = [d for d in documents if _field(d, field) is not None]
+        missing = [d for d in documents if _field(d, field) is None]
+        present.sort(key=lambda d: _field(d, field), reverse=direction < 0)
+        # Missing values sort lowest, as in Mongo
+        documents = missing + present if direction > 0 else present + missing
+    return documents
+
+
+def install_collection(monkeypatch, collection: InMemoryCollection) -> InMemoryCollection:
+    """Serve ``collection`` from every ``get_property_listing_collections`` caller."""
+
+    monkeypatch.setattr(
+        "utility.property_listing_init._client",
+        {"property": {"property_listing": collection}},
+    )
+    return collection
+
+
+# ----------------------------
+# Listing catalog
+# ----------------------------
+
+LISTING_FIXTURE = Path(__file__).resolve().parents[1] / "listing_v2.json"
+
+CATEGORIES = [
+    "factory",
+    "industrial-land",
+    "warehouse",
+    "cluster-factory",
+    "semi-d-factory",
+    "detached-factory",
+    "terrace-factory",
+    "agricultural-land",
+    "shoplot",
+    "showroom",
+    "car-showroom",
+]
+
+_REGIONS = ["Selangor", "Kuala Lumpur", "Negeri Sembilan"]
+
+
+def _measure_value(value: Any, unit: str) -> Optional[Dict[str, Any]]:
+    if value is None:
+        return None
+    return {"value": value, "unit": unit}
+
+
+def to_listing_document(record: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Shape a flat ``listing_v2.json`` record like a ``property_listing`` document.
+
+    Fields the fixture lacks (category, offer type, tenure...) are derived
+    deterministically from ``index`` so every filter has something to bite on.
+    """
+
+    locality = record.get("location") or ""
+    parts = [p.strip() for p in locality.split(",") if p.strip()]
+    offer_type = "rent" if index % 3 == 0 else "sale"
+    price = record.get("asking_price")
+    if price is not None and offer_type == "rent":
+        price = round(price / 250)
+    main_category = CATEGORIES[index % len(CATEGORIES)]
+    slug = f"{main_category}-{index}"
+
+    return {
+        "property_id": f"LP{index:06d}",
+        "slug": slug,
+        "title": f"{main_category.replace('-', ' ').title()} at {parts[0] if parts else 'Klang Valley'}",
+        "description": f"{main_category.replace('-', ' ')} for {offer_type} in {locality}. Zoning: {record.get('zoning_type')}",
+        "main_category": main_category,
+        "sub_categories": [CATEGORIES[(index * 7 + 3) % len(CATEGORIES)]] if index % 2 else [],
+        "tenure": "freehold" if index % 4 else "leasehold",
+        "market_status": "primary" if index % 5 == 0 else "subsales",
+        "offer": {"offer_type": offer_type, "price": price, "price_currency": "MYR"},
+        "land_size": _measure_value(record.get("land_area_sqft"), "sqft"),
+        "built_up_area": _measure_value(record.get("built_up_area_sqft"), "sqft"),
+        "office_area": _measure_value(
+            round(record["built_up_area_sqft"] * 0.1) if record.get("built_up_area_sqft") else None, "sqft"
+        ),
+        "ceiling_height": _measure_value(record.get("clear_height_m"), "m"),
+        "power_supply": _measure_value(record.get("power_capacity_kva"), "kVA"),
+        "floor_loading": _measure_value(record.get("floor_loading_ton_per_sqm"), "ton/sqm"),
+        "location": {
+            "industrial_park_name": parts[0] if parts else "",
+            "address": {
+                "street_address": locality,
+                "address_locality": parts[-1] if parts else "",
+                "address_region": _REGIONS[index % len(_REGIONS)],
+                "postal_code": "",
+            },
+            "geo": {"latitude": 3.0 + index / 1000, "longitude": 101.5 + index / 1000},
+        },
+        "images": [f"https://cdn.example.com/{slug}/{n}.jpg" for n in range(6)],
+        "thumbnail": f"https://cdn.example.com/{slug}/0.jpg",
+        "seo_title": f"{slug} | Landy",
+        "seo_description": f"{main_category} listing in {locality}",
+        "key_features": ["loading bay"] if index % 2 else [],
+        "is_featured": index % 10 == 0,
+        "listed_date": f"2025-01-{index % 28 + 1:02d}T00:00:00",
+        "last_updated": f"2025-06-{index % 28 + 1:02d}T00:00:00",
+        "source": record.get("source"),
+    }
+
+
+def load_listing_catalog(size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Documents built from ``listing_v2.json``, cycled synthetically up to ``size``."""
+
+    with open(LISTING_FIXTURE, encoding="utf-8") as fh:
+        records = json.load(fh)
+    size = len(records) if size is None else size
+    documents = []
+    for index in range(size):
+        record = dict(records[index % len(records)])
+        if index >= len(records):
+            # Perturb numbers so scaled catalogs are not exact copies
+            factor = 1 + ((index * 37) % 41 - 20) / 100
+            for key in ("built_up_area_sqft", "land_area_sqft", "asking_price", "power_capacity_kva"):
+                if record.get(key) is not None:
+                    record[key] = round(record[key] * factor)
+        documents.append(to_listing_document(record, index))
+    return documents
@@ -0,0 +1,333 @@
+"""Offline component benchmarks with results stored as JSON.
+
+Run with ``python -m benchmarks.suite [--sizes 1000 10000 100000] [--compare OLD.json]``.
+No network is used: the LLM is ``FakeChatModel`` with ``--llm-latency`` per
+call and MongoDB is an ``InMemoryCollection`` built from ``listing_v2.json``,
+scaled synthetically to each catalog size. Timing follows pytest-benchmark:
+fast calls are looped so each round lasts at least ``--min-round-ms``, and
+rounds repeat until ``--max-time`` seconds or ``--min-rounds`` have passed.
+
+Results are written to ``benchmarks/results/<timestamp>-<commit>.json``.
+``--compare`` prints the median change against an earlier result file.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402
+from agent.v2.search_cache import reset_search_cache_for_tests  # noqa: E402
+from agent.v2.tools.listing_index import reset_listing_index_for_tests  # noqa: E402
+from agent.v2.tools.location_index import reset_location_resolver_for_tests  # noqa: E402
+from agent.v2.tools.search_listing_database import search_listing_property_from_database  # noqa: E402
+from agent.v2.utility import _serialize_listing_detail, _serialize_public_listing, get_listing_by_ids  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, InMemoryCollection, load_listing_catalog, search_then_answer  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# One representative ListingFilter per shape the agent emits
+FILTER_SHAPES: Dict[str, Dict[str, Any]] = {
+    "empty": {},
+    "category": {"category": ["warehouse", "factory"]},
+    "offer_price": {"offer_type": "sale", "min_price": 1_000_000, "max_price": 10_000_000},
+    "location": {"location": ["Shah Alam", "Klang"]},
+    "sizes": {"min_built_up_size": 10_000, "max_built_up_size": 80_000, "min_land_size": 20_000},
+    "combined": {
+        "category": ["warehouse", "detached-factory"],
+        "offer_type": "rent",
+        "location": ["Selangor"],
+        "min_power_supply": 200,
+        "tenure": "freehold",
+    },
+}
+
+ENGINES = ("mongo", "memory")
+
+SERIALIZERS = {"public": _serialize_public_listing, "detail": _serialize_listing_detail}
+
+# Documents per serializer round and IDs per get_listing_by_ids call
+SERIALIZE_BATCH = 1_000
+LOOKUP_IDS = 20
+
+
+@dataclass
+class Case:
+    group: str
+    name: str
+    fn: Callable[[], Any]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(fn: Callable[[], Any], max_time: float, min_rounds: int, min_round_ms: float) -> Dict[str, Any]:
+    """Timing statistics for ``fn`` in seconds per call."""
+
+    start = time.perf_counter()
+    fn()
+    warmup = time.perf_counter() - start
+    iterations = max(1, math.ceil(min_round_ms / 1000 / warmup)) if warmup > 0 else 1000
+
+    samples: List[float] = []
+    deadline = time.perf_counter() + max_time
+    while len(samples) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - start) / iterations)
+
+    if len(samples) >= 4:
+        q1, _, q3 = statistics.quantiles(samples, n=4)
+    else:
+        q1, q3 = min(samples), max(samples)
+    mean = statistics.fmean(samples)
+    return {
+        "min": min(samples),
+        "max": max(samples),
+        "mean": mean,
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": statistics.median(samples),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "rounds": len(samples),
+        "iterations": iterations,
+        "ops": 1 / mean if mean else 0.0,
+    }
+
+
+def _install_catalog(documents: List[Dict[str, Any]]) -> None:
+    property_listing_init._client = {"property": {"property_listing": InMemoryCollection(documents)}}
+    reset_listing_index_for_tests()
+    reset_location_resolver_for_tests()
+    reset_search_cache_for_tests()
+
+
+def _search(engine: str, filters: Dict[str, Any]) -> Callable[[], Any]:
+    def run():
+        os.environ["LISTING_SEARCH_ENGINE"] = engine
+        return search_listing_property_from_database.invoke({"input": filters})
+
+    return run
+
+
+@contextmanager
+def _invoke_client(llm_latency: float) -> Iterator[Any]:
+    """FastAPI test client for ``/api/v2/invoke`` with the LLM and checkpointer stubbed.
+
+    The stubs and the quieter ``src.index`` logger only last for the block.
+    """
+
+    from fastapi.testclient import TestClient
+
+    import src.index as index
+
+    index_logger = logging.getLogger(index.__name__)
+    saved = (registry.load_llm, index.get_checkpointer, index_logger.level)
+    # src.index logs every request at INFO; those lines would swamp the timings
+    index_logger.setLevel(logging.WARNING)
+    model = FakeChatModel(replies=[search_then_answer({"category": ["warehouse"]})], latency=llm_latency)
+    registry.load_llm = lambda model_name="gpt-4.1", **kwargs: model
+    registry.clear_agent_registry()
+    checkpointer = InMemorySaver()
+    index.get_checkpointer = lambda: checkpointer
+    try:
+        yield TestClient(index.app)
+    finally:
+        registry.load_llm, index.get_checkpointer = saved[:2]
+        index_logger.setLevel(saved[2])
+        # Agents compiled around the fake model must not outlive it
+        registry.clear_agent_registry()
+
+
+def _invoke(client) -> Callable[[], Any]:
+    counter = {"n": 0}
+
+    def run():
+        # A fresh thread per call keeps history length constant across rounds
+        counter["n"] += 1
+        os.environ["LISTING_SEARCH_ENGINE"] = "mongo"
+        response = client.post(
+            "/api/v2/invoke",
+            json={"message": "any warehouse for rent?", "thread_id": f"bench-{counter['n']}"},
+        )
+        response.raise_for_status()
+        return response
+
+    return run
+
+
+def catalog_cases(size: int, documents: List[Dict[str, Any]], client) -> List[Case]:
+    cases = []
+    for engine in ENGINES:
+        for shape, filters in FILTER_SHAPES.items():
+            cases.append(Case("search", f"search[{engine}-{shape}-{size}]", _search(engine, filters),
+                              {"engine": engine, "shape": shape, "size": size}))
+
+    step = max(1, len(documents) // LOOKUP_IDS)
+    ids = [doc["property_id"] for doc in documents[::step]][:LOOKUP_IDS]
+    cases.append(Case("get_listing_by_ids", f"get_listing_by_ids[{size}]",
+                      lambda: get_listing_by_ids(documents, ids), {"size": size, "ids": len(ids)}))
+
+    if client is not None:
+        cases.append(Case("invoke", f"invoke[{size}]", _invoke(client), {"size": size}))
+    return cases
+
+
+def serializer_cases(documents: List[Dict[str, Any]]) -> List[Case]:
+    batch = documents[:SERIALIZE_BATCH]
+    return [
+        Case("serialize", f"serialize[{name}]", lambda fn=fn: [fn(doc) for doc in batch], {"serializer": name, "docs": len(batch)})
+        for name, fn in SERIALIZERS.items()
+    ]
+
+
+def _commit_info() -> Dict[str, Any]:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"id": git("rev-parse", "HEAD"), "branch": git("rev-parse", "--abbrev-ref", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+
+
+def run_suite(
+    sizes: List[int],
+    max_time: float = 1.0,
+    min_rounds: int = 5,
+    min_round_ms: float = 5.0,
+    llm_latency: float = 0.0,
+    include_invoke: bool = True,
+    select: Optional[str] = None,
+    report: Callable[[Dict[str, Any]], None] = lambda _: None,
+) -> Dict[str, Any]:
+    # Measure the work itself, not the search result cache
+    previous_env = {name: os.environ.get(name) for name in ("LISTING_SEARCH_ENGINE", "SEARCH_CACHE_MAX_ENTRIES")}
+    previous_client = property_listing_init._client
+    os.environ["SEARCH_CACHE_MAX_ENTRIES"] = "0"
+    results = []
+
+    def run(cases):
+        for case in cases:
+            if select and select not in case.name:
+                continue
+            entry = {"group": case.group, "name": case.name, "params": case.params,
+                     "stats": measure(case.fn, max_time, min_rounds, min_round_ms)}
+            results.append(entry)
+            report(entry)
+
+    try:
+        with ExitStack() as stack:
+            client = stack.enter_context(_invoke_client(llm_latency)) if include_invoke else None
+            for size in sizes:
+                documents = load_listing_catalog(size)
+                _install_catalog(documents)
+                if size == sizes[0]:
+                    run(serializer_cases(documents))
+                run(catalog_cases(size, documents, client))
+    finally:
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        property_listing_init._client = previous_client
+        reset_listing_index_for_tests()
+        reset_location_resolver_for_tests()
+        reset_search_cache_for_tests()
+
+    return {
+        "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "machine_info": {
+            "python_version": platform.python_version(),
+            "python_implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpu_count": os.cpu_count(),
+        },
+        "commit_info": _commit_info(),
+        "options": {"sizes": sizes, "max_time": max_time, "min_rounds": min_rounds, "llm_latency": llm_latency},
+        "benchmarks": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Median change per benchmark present in both result sets."""
+
+    before = {b["name"]: b["stats"]["median"] for b in baseline["benchmarks"]}
+    rows = []
+    for bench in current["benchmarks"]:
+        old = before.get(bench["name"])
+        if old:
+            new = bench["stats"]["median"]
+            rows.append({"name": bench["name"], "before": old, "after": new, "change": (new - old) / old})
+    return rows
+
+
+def _print_entry(entry: Dict[str, Any]) -> None:
+    stats = entry["stats"]
+    print(f"{entry['name']:<42}{stats['median'] * 1000:>11.3f}{stats['iqr'] * 1000:>10.3f}"
+          f"{stats['ops']:>12.1f}{stats['rounds']:>8}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--max-time", type=float, default=1.0, help="seconds spent per benchmark")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--min-round-ms", type=float, default=5.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake model call")
+    parser.add_argument("--no-invoke", action="store_true", help="skip the /api/v2/invoke benchmarks")
+    parser.add_argument("-k", dest="select", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="earlier result file to compare medians with")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<42}{'median ms':>11}{'iqr ms':>10}{'ops/s':>12}{'rounds':>8}")
+    result = run_suite(
+        args.sizes,
+        max_time=args.max_time,
+        min_rounds=args.min_rounds,
+        min_round_ms=args.min_round_ms,
+        llm_latency=args.llm_latency,
+        include_invoke=not args.no_invoke,
+        select=args.select,
+        report=_print_entry,
+    )
+
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = (result["commit_info"]["id"] or "nogit")[:8]
+        output = RESULTS_DIR / f"{stamp}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nSaved {len(result['benchmarks'])} results to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\n{'benchmark':<42}{'before ms':>11}{'after ms':>10}{'change':>9}")
+        for row in compare(result, baseline):
+            print(f"{row['name']:<42}{row['before'] * 1000:>11.3f}{row['after'] * 1000:>10.3f}{row['change']:>+9.1%}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,7 +28,8 @@ def get_property_search_prompt():
     prompt = '''
 Match the most relevant top 5 (adaptive depends on the relevancy) listing from user request.
 User Preferences: {user_preferences}
-Listing: {listing}
+Listing (pre-ranked candidates, best first; one per line, columns named in the first line, empty cell = not stated):
+{listing}
 
 Output recommended_listing in a List
 and messages only some concise and short message.
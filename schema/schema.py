@@ -7,6 +7,7 @@ class OverallState(TypedDict):
     recommended_listing: Optional[List["Listing"]]
     graph_output: str
     messages: List[Any]
+    retrieval: Optional[Dict[str, Any]]
 
 class Preference(TypedDict):
     buy_rent: Optional[Literal['Buy', 'Rent']]
@@ -4,41 +4,157 @@ import uuid
 from pydantic import BaseModel
 from fastapi import FastAPI
 
-from agent.v1.orchestrator import graph
-from langgraph.checkpoint.postgres import PostgresSaver
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional, List, Dict, Any, TypedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional, List, Dict, Any, TypedDict, Literal
 import json
 import logging
+import time
 import traceback
 import os
 from dotenv import load_dotenv
+from utility.checkpointer_init import (
+    open_checkpointer,
+    close_checkpointer,
+    close_sync_checkpointer,
+    start_checkpoint_pruning,
+    get_checkpointer,
+    get_pool_stats,
+)
+from agent.v2.slug_cache import get_slug_cache
+from agent.v2.search_cache import get_search_cache
+from utility.executor import run_sync, shutdown_blocking_executor
+from utility.llm_init import close_llm_clients
+from utility.logging_config import Payload, configure_logging
+from utility.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from utility.admission import get_admission
+from utility.env import env_bool, env_int
+from utility.timing import TimingMiddleware, attach_timings, record_stage, stage_span, with_stage_timing
+from utility.warmup import warm_up
+from agent.v2.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    STREAM_HEADERS,
+    encode_events,
+    stream_turn_events,
+)
+from agent.v2.batch import run_batch, run_turn
+from agent.v2.registry import (
+    get_search_agent,
+    get_slug_agent,
+    slug_agent_config,
+)
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# JSON logs written from a background thread; levels from LOG_LEVEL / LOG_LEVELS
+configure_logging()
 logger = logging.getLogger(__name__)
 
 class InvokeRequest(BaseModel):
     user_input: str
     state_id: Optional[str] = None
 
+DB_URI = os.environ.get("DB_URI")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled checkpointer for the whole process; schema setup runs here once
+    checkpointer = None
+    if DB_URI:
+        try:
+            checkpointer = await open_checkpointer(DB_URI)
+        except Exception as db_error:
+            logger.exception("Checkpointer startup failed: %s", db_error)
+        else:
+            start_checkpoint_pruning()
+    else:
+        logger.warning("DB_URI not set; v2 endpoints will be unavailable")
+    # Imports, LLM client, Mongo connection and agents, so the first request doesn't pay
+    if env_bool("WARMUP_ON_STARTUP", True):
+        await run_sync(warm_up, checkpointer)
+    try:
+        yield
+    finally:
+        await close_checkpointer()
+        await run_sync(close_sync_checkpointer)
+        await close_llm_clients()
+        shutdown_blocking_executor()
+
 app = FastAPI(
     title="Property Search Agent API",
     description="Property Search Agent API",
     version="2.0.0",
     docs_url="/api/docs",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan,
     )
-
-DB_URI = os.environ.get("DB_URI")
+app.add_middleware(TimingMiddleware)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (request and per-stage latency histograms)."""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/v2/checkpointer/stats")
+def checkpointer_stats():
+    return get_pool_stats()
+
+def _v1_orchestrator():
+    # The v1 graph compiles on import; deferred until first use (or warm-up)
+    from agent.v1 import orchestrator
+    return orchestrator
+
+@app.get("/api/v1/checkpointer/stats")
+def v1_checkpointer_stats():
+    return _v1_orchestrator().memory.stats()
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def _require_admin(token: Optional[str]):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+class SlugCacheInvalidateRequest(BaseModel):
+    slug: Optional[str] = None
+
+@app.get("/api/v2/admin/slug-cache")
+def slug_cache_stats(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    return get_slug_cache().stats()
+
+@app.post("/api/v2/admin/slug-cache/invalidate")
+def slug_cache_invalidate(
+    request: SlugCacheInvalidateRequest,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """Drop one slug (or the whole cache when no slug is given)."""
+    _require_admin(x_admin_token)
+    invalidated = get_slug_cache().invalidate(request.slug)
+    logger.info("Invalidated %s slug cache entries (slug=%s)", invalidated, request.slug)
+    return {"invalidated": invalidated}
+
+@app.get("/api/v2/admin/search-cache")
+def search_cache_stats(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    cache = get_search_cache()
+    return cache.stats() if cache else {"status": "disabled"}
+
+@app.post("/api/v2/admin/search-cache/invalidate")
+def search_cache_invalidate(x_admin_token: Optional[str] = Header(default=None)):
+    """Drop every cached search result, e.g. after a bulk catalog import."""
+    _require_admin(x_admin_token)
+    cache = get_search_cache()
+    invalidated = cache.invalidate() if cache else 0
+    logger.info("Invalidated %s search cache entries", invalidated)
+    return {"invalidated": invalidated}
+
 @app.post("/invoke")
 async def invoke(req: InvokeRequest):
     state_id = req.state_id or str(uuid4())
@@ -48,13 +164,15 @@ async def invoke(req: InvokeRequest):
         "user_input": req.user_input,
     }
 
-    result = await graph.ainvoke(
-        initial_state,
-        config={"configurable": {"thread_id": state_id}},
-    )
+    async with get_admission().admit(f"v1:{state_id}"):
+        with stage_span("agent"):
+            result = await _v1_orchestrator().graph.ainvoke(
+                initial_state,
+                config=with_stage_timing({"configurable": {"thread_id": state_id}}),
+            )
 
     result["state_id"] = state_id
-    return result
+    return attach_timings(result)
 
 # FIXED: ChatRequestDict should be BaseModel, not using .get()
 class ChatRequestDict(BaseModel):
@@ -67,6 +185,10 @@ class ChatSlugRequestDict(BaseModel):
     slug: str
     thread_id: Optional[str] = None
 
+class ChatBatchRequest(BaseModel):
+    items: List[ChatRequestDict]
+    concurrency: Optional[int] = None
+
 class FilterPreferencesDict(TypedDict, total=False):
     location: Optional[str]
     price_min: Optional[float]
@@ -114,7 +236,7 @@ async def chat_endpoint(request: ChatSlugRequestDict):
     Returns:
         JSON string with thread_id, AI response, preferences, and listings
     """
-    logger.info(f"Received request: {request}")
+    logger.info("Received request: %s", Payload(request.model_dump()))
     try:
         # FIXED: Use Pydantic model attributes instead of .get()
         message = request.message
@@ -124,92 +246,54 @@ async def chat_endpoint(request: ChatSlugRequestDict):
         
         # Generate or use existing thread_id
         thread_id = request.thread_id or str(uuid.uuid4())
-        logger.info(f"Processing message for thread_id: {thread_id}")
+        logger.info("Processing message for thread_id: %s", thread_id)
         
         slug = request.slug
         if not slug:
             logger.error("Empty slug received")
             raise HTTPException(status_code=400, detail="Slug is required")
         
-        # Initialize variables
-        graph_output = ""
-        
-        # STEP 1: Test database connection first
-        logger.info("Testing database connection...")
+        # STEP 1: Get the shared pooled checkpointer
         try:
-            with PostgresSaver.from_conn_string(DB_URI) as checkpointer:
-                checkpointer.setup()
-                logger.info("Database connection successful")
+            with stage_span("checkpointer"):
+                checkpointer = get_checkpointer()
         except Exception as db_error:
-            logger.error(f"Database connection failed: {str(db_error)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Database connection failed: %s", db_error)
             raise HTTPException(status_code=500, detail=f"Database connection error: {str(db_error)}")
         
-        # STEP 2: Try imports
-        logger.info("Importing required modules...")
-        try:
-            from langchain.agents import create_agent
-            from agent.v2.prompt.landy_slug_prompt import get_slug_prompt
-            from utility.property_listing_init import get_property_listing_collections
-            from utility.llm_init import load_llm
-            logger.info("All imports successful")
-        except ImportError as import_error:
-            logger.error(f"Import failed: {str(import_error)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Import error: {str(import_error)}")
-        
-        # STEP 3: Setup agent
+        # STEP 2: Get the compiled slug agent
         logger.info("Setting up slug agent...")
         try:
-            with PostgresSaver.from_conn_string(DB_URI) as checkpointer:
-                checkpointer.setup()
-                get_property_by_slug = get_property_listing_collections().find_one({"slug": slug})
-                slug_agent = create_agent(
-                    system_prompt=get_slug_prompt(get_property_by_slug),
-                    model=load_llm(model='gpt-4.1'),
-                    checkpointer=checkpointer,
-                )
-                logger.info("Agent created successfully")
-                
-                initial_input = {
-                    "messages": [
-                        {"role": "user", "content": message}
-                    ]
-                }
-                
-                # Stream agent responses
-                logger.info("Starting agent stream...")
-                chunk_count = 0
-                for chunk in slug_agent.stream(
-                    initial_input,
-                    {"configurable": {"thread_id": thread_id}},
-                ):
-                    chunk_count += 1
-                    logger.debug(f"Processing chunk {chunk_count}: {chunk.keys()}")
-                    
-                    # Model (LLM) output
-                    if "model" in chunk:
-                        messages = chunk["model"].get("messages", [])
-                        if messages:
-                            graph_output = messages[0].content
-                            logger.info(f"Model output received: {graph_output[:100]}...")
-                    
-                logger.info(f"Agent stream completed. Processed {chunk_count} chunks")
+            with stage_span("slug_load"):
+                cached_property = await run_sync(get_slug_cache().get, slug)
+            with stage_span("agent_build"):
+                slug_agent = get_slug_agent(checkpointer)
+            config = with_stage_timing(slug_agent_config(thread_id, cached_property.prompt))
+            logger.info("Agent ready")
+            
+            # Stream agent responses; turns on one thread run in order
+            logger.info("Starting agent stream...")
+            async with get_admission().admit(thread_id):
+                agent_started = time.perf_counter()
+                turn = await run_turn(slug_agent, message, config)
+                record_stage("agent", time.perf_counter() - agent_started)
+        
+        except HTTPException:
+            raise
         
         except Exception as agent_error:
-            logger.error(f"Agent execution error: {str(agent_error)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Agent execution error: %s", agent_error)
             raise HTTPException(status_code=500, detail=f"Agent execution error: {str(agent_error)}")
         
         # Return response
         response_data = {
             "thread_id": thread_id,
-            "graph_output": graph_output,
+            "graph_output": turn["graph_output"],
             "status": "success"
         }
         
-        logger.info(f"Returning successful response for slug agent thread {thread_id}")
-        return JSONResponse(content=response_data, status_code=200)
+        logger.info("Returning successful response for slug agent thread %s", thread_id)
+        return JSONResponse(content=attach_timings(response_data), status_code=200)
     
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -217,8 +301,7 @@ async def chat_endpoint(request: ChatSlugRequestDict):
     
     except Exception as e:
         # Log the full error
-        logger.error(f"Unexpected error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Unexpected error: %s", e)
         
         error_response = {
             "thread_id": request.thread_id if hasattr(request, 'thread_id') and request.thread_id else "unknown",
@@ -242,7 +325,7 @@ async def chat_endpoint(request: ChatRequestDict):
     Returns:
         JSON string with thread_id, AI response, preferences, and listings
     """
-    logger.info(f"Received request: {request}")
+    logger.info("Received request: %s", Payload(request.model_dump()))
     
     try:
         # FIXED: Use Pydantic model attributes instead of .get()
@@ -253,124 +336,50 @@ async def chat_endpoint(request: ChatRequestDict):
         
         # Generate or use existing thread_id
         thread_id = request.thread_id or str(uuid.uuid4())
-        logger.info(f"Processing message for thread_id: {thread_id}")
-        
-        # Initialize variables
-        graph_output = ""
-        preferences = None
-        recommended_listings = None
+        logger.info("Processing message for thread_id: %s", thread_id)
         
-        # STEP 1: Test database connection first
-        logger.info("Testing database connection...")
+        # STEP 1: Get the shared pooled checkpointer
         try:
-            with PostgresSaver.from_conn_string(DB_URI) as checkpointer:
-                checkpointer.setup()
-                logger.info("Database connection successful")
+            with stage_span("checkpointer"):
+                checkpointer = get_checkpointer()
         except Exception as db_error:
-            logger.error(f"Database connection failed: {str(db_error)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Database connection failed: %s", db_error)
             raise HTTPException(status_code=500, detail=f"Database connection error: {str(db_error)}")
         
-        # STEP 2: Try imports
-        logger.info("Importing required modules...")
-        try:
-            from langchain.agents import create_agent
-            from agent.v2.tools.search_listing_database import search_listing_property_from_database
-            from agent.v2.utility import _serialize_public_listing
-            from agent.v2.prompt.landy_system_prompt import prompt
-            from utility.property_listing_init import get_property_listing_collections
-            from utility.llm_init import load_llm
-            logger.info("All imports successful")
-        except ImportError as import_error:
-            logger.error(f"Import failed: {str(import_error)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Import error: {str(import_error)}")
-        
-        # STEP 3: Setup agent
+        # STEP 2: Get the compiled search agent
         logger.info("Setting up agent...")
         try:
-            with PostgresSaver.from_conn_string(DB_URI) as checkpointer:
-                checkpointer.setup()
-                
-                tools = [search_listing_property_from_database]
-                agent = create_agent(
-                    system_prompt=prompt,
-                    model=load_llm(model='gpt-4.1').bind_tools(tools),
-                    tools=tools,
-                    checkpointer=checkpointer,
+            with stage_span("agent_build"):
+                agent = get_search_agent(checkpointer)
+            logger.info("Agent ready")
+            
+            # Stream agent responses; turns on one thread run in order
+            logger.info("Starting agent stream...")
+            async with get_admission().admit(thread_id):
+                agent_started = time.perf_counter()
+                turn = await run_turn(
+                    agent,
+                    message,
+                    with_stage_timing({"configurable": {"thread_id": thread_id}}),
                 )
-                logger.info("Agent created successfully")
-                
-                initial_input = {
-                    "messages": [
-                        {"role": "user", "content": message}
-                    ]
-                }
-                
-                # Stream agent responses
-                logger.info("Starting agent stream...")
-                chunk_count = 0
-                for chunk in agent.stream(
-                    initial_input,
-                    {"configurable": {"thread_id": thread_id}},
-                ):
-                    chunk_count += 1
-                    logger.debug(f"Processing chunk {chunk_count}: {chunk.keys()}")
-                    
-                    # Model (LLM) output
-                    if "model" in chunk:
-                        messages = chunk["model"].get("messages", [])
-                        if messages:
-                            graph_output = messages[0].content
-                            logger.info(f"Model output received: {graph_output[:100]}...")
-                    
-                    # Tool output
-                    elif "tools" in chunk:
-                        messages = chunk["tools"].get("messages", [])
-                        if messages:
-                            try:
-                                tool_payload = json.loads(messages[0].content)
-                                logger.info(f"Tool payload: {tool_payload}")
-                                
-                                if "filters_applied" in tool_payload:
-                                    preferences = tool_payload["filters_applied"]
-                                    logger.info(f"Preferences extracted: {preferences}")
-                                
-                                if "property_ids" in tool_payload:
-                                    property_ids = tool_payload["property_ids"]
-                                    logger.info(f"Fetching properties for IDs: {property_ids}")
-                                    
-                                    documents = list(
-                                        get_property_listing_collections().find(
-                                            {"property_id": {'$in': property_ids}}
-                                        )
-                                    )
-                                    recommended_listings = [
-                                        _serialize_public_listing(doc) for doc in documents
-                                    ]
-                                    logger.info(f"Found {len(recommended_listings)} listings")
-                            except json.JSONDecodeError as json_error:
-                                logger.error(f"JSON decode error: {str(json_error)}")
-                                logger.error(f"Content: {messages[0].content}")
-                
-                logger.info(f"Agent stream completed. Processed {chunk_count} chunks")
+                record_stage("agent", time.perf_counter() - agent_started)
+        
+        except HTTPException:
+            raise
         
         except Exception as agent_error:
-            logger.error(f"Agent execution error: {str(agent_error)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Agent execution error: %s", agent_error)
             raise HTTPException(status_code=500, detail=f"Agent execution error: {str(agent_error)}")
         
         # Return response
         response_data = {
             "thread_id": thread_id,
-            "graph_output": graph_output,
-            "preferences": preferences,
-            "recommended_listings": recommended_listings,
+            **turn,
             "status": "success"
         }
         
-        logger.info(f"Returning successful response for thread {thread_id}")
-        return JSONResponse(content=response_data, status_code=200)
+        logger.info("Returning successful response for thread %s", thread_id)
+        return JSONResponse(content=attach_timings(response_data), status_code=200)
     
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -378,8 +387,7 @@ async def chat_endpoint(request: ChatRequestDict):
     
     except Exception as e:
         # Log the full error
-        logger.error(f"Unexpected error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Unexpected error: %s", e)
         
         error_response = {
             "thread_id": request.thread_id if hasattr(request, 'thread_id') and request.thread_id else "unknown",
@@ -390,4 +398,145 @@ async def chat_endpoint(request: ChatRequestDict):
         }
         
         return JSONResponse(content=error_response, status_code=500)
-    
\ No newline at end of file
+
+@app.post("/api/v2/invoke/batch")
+async def chat_batch_endpoint(request: ChatBatchRequest):
+    """
+    Run many independent /api/v2/invoke turns in one call
+
+    Items run concurrently (at most BATCH_MAX_CONCURRENCY, or the request's
+    lower ``concurrency``) on the shared checkpointer pool and compiled agent.
+    Concurrent searches with the same filters share one database lookup.
+    Results keep the request order; a failed item doesn't fail the batch.
+    """
+    max_items = env_int("BATCH_MAX_ITEMS", 50)
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch is limited to {max_items} items")
+    if any(not item.message for item in request.items):
+        raise HTTPException(status_code=400, detail="Message is required for every item")
+
+    items = [
+        {"message": item.message, "thread_id": item.thread_id or str(uuid.uuid4())}
+        for item in request.items
+    ]
+    thread_ids = [item["thread_id"] for item in items]
+    # Two turns on one thread would race on its checkpoint
+    if len(set(thread_ids)) != len(thread_ids):
+        raise HTTPException(status_code=400, detail="thread_id values must be unique within a batch")
+
+    try:
+        with stage_span("checkpointer"):
+            checkpointer = get_checkpointer()
+    except Exception as db_error:
+        logger.exception("Database connection failed: %s", db_error)
+        raise HTTPException(status_code=500, detail=f"Database connection error: {str(db_error)}")
+
+    with stage_span("agent_build"):
+        agent = get_search_agent(checkpointer)
+
+    async def run_item(item):
+        async with get_admission().admit(item["thread_id"]):
+            started = time.perf_counter()
+            try:
+                return await run_turn(
+                    agent,
+                    item["message"],
+                    with_stage_timing({"configurable": {"thread_id": item["thread_id"]}}),
+                )
+            finally:
+                record_stage("agent", time.perf_counter() - started)
+
+    concurrency = env_int("BATCH_MAX_CONCURRENCY", 8)
+    if request.concurrency:
+        concurrency = min(concurrency, request.concurrency)
+    logger.info("Running batch of %d items (concurrency %d)", len(items), concurrency)
+    results = await run_batch(items, run_item, concurrency)
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    response_data = {
+        "status": "success" if not failed else ("error" if failed == len(results) else "partial"),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+    return JSONResponse(content=attach_timings(response_data), status_code=200)
+
+
+async def _release_after(events, ticket):
+    try:
+        async for event in events:
+            yield event
+    finally:
+        ticket.release()
+
+def _streaming_response(events, fmt: str, ticket=None) -> StreamingResponse:
+    media_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else SSE_MEDIA_TYPE
+    if ticket is None:
+        return StreamingResponse(encode_events(events, fmt), media_type=media_type, headers=STREAM_HEADERS)
+    # The admission slot is held until the stream ends; the background task covers
+    # a client that disconnects before the body is iterated
+    return StreamingResponse(
+        encode_events(_release_after(events, ticket), fmt),
+        media_type=media_type,
+        headers=STREAM_HEADERS,
+        background=BackgroundTask(ticket.release),
+    )
+
+@app.post("/api/v2/invoke/stream")
+async def chat_stream_endpoint(request: ChatRequestDict, format: Literal["sse", "ndjson"] = "sse"):
+    """
+    Streaming variant of /api/v2/invoke
+
+    Emits token, tool_start, tool_result, listings and done events as
+    Server-Sent Events (default) or NDJSON (?format=ndjson).
+    """
+    if not request.message:
+        raise HTTPException(status_code=400, detail="Message is required")
+
+    thread_id = request.thread_id or str(uuid.uuid4())
+    try:
+        checkpointer = get_checkpointer()
+    except Exception as db_error:
+        raise HTTPException(status_code=500, detail=f"Database connection error: {str(db_error)}")
+
+    try:
+        with stage_span("agent_build"):
+            agent = get_search_agent(checkpointer)
+    except Exception as agent_error:
+        logger.exception("Agent setup error: %s", agent_error)
+        raise HTTPException(status_code=500, detail=f"Agent execution error: {str(agent_error)}")
+    config = with_stage_timing({"configurable": {"thread_id": thread_id}})
+    ticket = await get_admission().acquire(thread_id)
+    return _streaming_response(stream_turn_events(agent, request.message, config, thread_id), format, ticket)
+
+@app.post("/api/v2/invoke/slug/stream")
+async def chat_slug_stream_endpoint(request: ChatSlugRequestDict, format: Literal["sse", "ndjson"] = "sse"):
+    """
+    Streaming variant of /api/v2/invoke/slug
+    """
+    if not request.message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    if not request.slug:
+        raise HTTPException(status_code=400, detail="Slug is required")
+
+    thread_id = request.thread_id or str(uuid.uuid4())
+    try:
+        checkpointer = get_checkpointer()
+    except Exception as db_error:
+        raise HTTPException(status_code=500, detail=f"Database connection error: {str(db_error)}")
+
+    try:
+        with stage_span("slug_load"):
+            cached_property = await run_sync(get_slug_cache().get, request.slug)
+        with stage_span("agent_build"):
+            agent = get_slug_agent(checkpointer)
+    except HTTPException:
+        raise
+    except Exception as agent_error:
+        logger.exception("Agent setup error: %s", agent_error)
+        raise HTTPException(status_code=500, detail=f"Agent execution error: {str(agent_error)}")
+    config = with_stage_timing(slug_agent_config(thread_id, cached_property.prompt))
+    ticket = await get_admission().acquire(thread_id)
+    return _streaming_response(stream_turn_events(agent, request.message, config, thread_id), format, ticket)
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.search_cache import reset_search_cache_for_tests  # noqa: E402  # pylint: disable=C0413
+from agent.v2.tools import listing_index  # noqa: E402
+from agent.v2.tools.location_index import reset_location_resolver_for_tests  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, install_collection, load_listing_catalog  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_search_cache():
+    # Tests swap catalogs freely; a result cached by one must not leak into the next
+    reset_search_cache_for_tests()
+    reset_location_resolver_for_tests()
+    yield
+    reset_search_cache_for_tests()
+    reset_location_resolver_for_tests()
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """(collection, ListingIndex) over the fixture catalog, installed for both engines."""
+
+    collection = install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    index = listing_index.ListingIndex(lambda: collection)
+    monkeypatch.setattr(listing_index, "_listing_index", index)
+    return collection, index
+
+
+class FakeClock:
+    """Monotonic clock stand-in; tests move ``now`` by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,35 @@
+"""Shared inputs for the tests comparing the Mongo and memory listing engines."""
+
+import json
+from typing import Any, Dict
+
+# One ListingFilter per shape the tools see, including empty and no-match cases
+FILTER_SHAPES = [
+    {},
+    {"offer_type": "sale"},
+    {"offer_type": "rent", "max_price": 50000},
+    {"category": ["warehouse"]},
+    {"category": ["factory", "detached-factory", "terrace-factory"]},
+    {"category": ["showroom"], "location": ["Balakong"]},
+    {"tenure": "leasehold", "market_status": "subsales"},
+    {"market_status": "primary", "currency": "MYR"},
+    {"min_price": 1000000, "max_price": 20000000},
+    {"min_land_size": 20000},
+    {"min_built_up_size": 10000, "max_built_up_size": 60000},
+    {"min_office_area": 1000},
+    {"min_ceiling_height": 10, "max_ceiling_height": 14},
+    {"min_power_supply": 500},
+    {"location": ["Shah Alam"]},
+    {"location": ["klang", "sepang"]},
+    {"location": ["Selangor"], "offer_type": "sale", "min_built_up_size": 5000},
+    {"offer_type": "sale", "category": ["warehouse", "factory"], "min_power_supply": 200, "location": ["Telok"]},
+    {"currency": "USD"},
+    {"location": ["Nowhere Industrial Park"]},
+]
+
+
+def run_on_engine(monkeypatch, tool, engine: str, filters: Dict[str, Any]) -> Any:
+    """Invoke a listing tool on ``engine`` (``mongo`` or ``memory``) and decode its JSON."""
+
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", engine)
+    return json.loads(tool.invoke({"input": filters}))
@@ -0,0 +1,115 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, InMemoryCollection, install_collection, load_listing_catalog  # noqa: E402
+from utility.admission import AdmissionController, AdmissionRejected, get_admission, reset_admission_for_tests  # noqa: E402
+from utility.metrics import REGISTRY  # noqa: E402
+
+
+def test_turns_on_one_thread_run_in_order():
+    controller = AdmissionController(max_concurrent=4)
+    order = []
+
+    async def turn(name, delay):
+        await asyncio.sleep(delay)
+        async with controller.admit("thread-1"):
+            order.append(f"{name}-start")
+            await asyncio.sleep(0.02)
+            order.append(f"{name}-end")
+
+    async def run():
+        await asyncio.gather(turn("a", 0), turn("b", 0.001), turn("c", 0.002))
+
+    asyncio.run(run())
+
+    assert order == ["a-start", "a-end", "b-start", "b-end", "c-start", "c-end"]
+    assert controller.stats() == {"in_flight": 0, "queued": 0, "thread_queued": 0, "threads_active": 0}
+
+
+def test_full_queue_and_queue_timeout_return_503_with_retry_after():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05, retry_after=3)
+
+    async def run():
+        holder = await controller.acquire()
+        queued = asyncio.ensure_future(controller.acquire("t-queued"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("t-extra")
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await queued
+        holder.release()
+        return full.value, timed_out.value
+
+    full, timed_out = asyncio.run(run())
+
+    assert (full.status_code, full.reason, full.headers["Retry-After"]) == (503, "queue_full", "3")
+    assert (timed_out.status_code, timed_out.reason) == (503, "queue_timeout")
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["threads_active"] == 0
+
+
+def test_too_many_turns_on_one_thread_return_429():
+    controller = AdmissionController(thread_max_queue=1)
+
+    async def run():
+        first = await controller.acquire("busy")
+        second = asyncio.ensure_future(controller.acquire("busy"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("busy")
+        first.release()
+        (await second).release()
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert (rejected.status_code, rejected.reason) == (429, "thread_queue_full")
+    assert "Retry-After" in rejected.headers
+
+
+@pytest.fixture
+def client(monkeypatch):
+    install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("AGENT_MAX_CONCURRENT_RUNS", "1")
+    monkeypatch.setenv("ADMISSION_MAX_QUEUE", "0")
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: FakeChatModel(replies=["Hello."]))
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    registry.clear_agent_registry()
+    reset_admission_for_tests()
+    REGISTRY.clear()
+    yield TestClient(index.app)
+    registry.clear_agent_registry()
+    reset_admission_for_tests()
+
+
+def test_endpoints_reject_when_at_capacity_and_report_metrics(client):
+    holder = asyncio.run(get_admission().acquire())
+
+    invoke = client.post("/api/v2/invoke", json={"message": "hi", "thread_id": "cap-1"})
+    stream = client.post("/api/v2/invoke/stream", json={"message": "hi", "thread_id": "cap-2"})
+    assert invoke.status_code == 503 and stream.status_code == 503
+    assert invoke.headers["retry-after"] == "2"
+
+    body = client.get("/metrics").text
+    assert 'landy_admission_rejections_total{reason="queue_full"} 2' in body
+    assert "landy_agent_runs_in_flight 1" in body
+
+    holder.release()
+    assert client.post("/api/v2/invoke", json={"message": "hi", "thread_id": "cap-1"}).status_code == 200
+    assert client.post("/api/v2/invoke/stream", json={"message": "hi", "thread_id": "cap-2"}).status_code == 200
+    assert get_admission().stats()["in_flight"] == 0
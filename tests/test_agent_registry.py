@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402  # pylint: disable=C0413
+from agent.v2.prompt.landy_slug_prompt import SLUG_PREFIX, get_slug_prompt  # noqa: E402
+from agent.v2.prompt.landy_system_prompt import prompt  # noqa: E402
+from agent.v2.prompt.layout import PromptPrefix, prompt_version  # noqa: E402
+from benchmarks.fixtures import FakeChatModel, system_prompt_of  # noqa: E402
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    fake = FakeChatModel(replies=["hello"])
+    built = []
+
+    def fake_load_llm(model="gpt-4.1", **overrides):
+        built.append((model, overrides))
+        return fake
+
+    monkeypatch.setattr(registry, "load_llm", fake_load_llm)
+    registry.clear_agent_registry()
+    yield fake, built
+    registry.clear_agent_registry()
+
+
+def test_agents_are_compiled_once_per_key(fake_model):
+    _, built = fake_model
+    checkpointer = InMemorySaver()
+
+    search = registry.get_search_agent(checkpointer)
+    slug = registry.get_slug_agent(checkpointer)
+
+    assert registry.get_search_agent(checkpointer) is search
+    assert registry.get_slug_agent(checkpointer) is slug
+    assert len(built) == 2
+
+    registry.get_search_agent(checkpointer, model="gpt-4.1-mini")
+    assert len(built) == 3
+    assert len(registry.registered_agents()) == 3
+
+
+def test_slug_agent_reads_property_prompt_from_configurable(fake_model):
+    model, _ = fake_model
+    agent = registry.get_slug_agent(InMemorySaver())
+
+    for thread_id, slug_prompt in (("t-1", "PROPERTY ONE"), ("t-2", "PROPERTY TWO")):
+        agent.invoke(
+            {"messages": [{"role": "user", "content": "hi"}]},
+            registry.slug_agent_config(thread_id, slug_prompt),
+        )
+
+    assert [system_prompt_of(call) for call in model.calls] == ["PROPERTY ONE", "PROPERTY TWO"]
+
+
+def test_prompts_start_with_a_versioned_static_prefix(fake_model):
+    _, built = fake_model
+    registry.get_search_agent(InMemorySaver())
+    registry.get_slug_agent(InMemorySaver())
+
+    assert [overrides for _, overrides in built] == [
+        {"model_kwargs": {"prompt_cache_key": registry.SEARCH_PREFIX.cache_key}},
+        {"model_kwargs": {"prompt_cache_key": SLUG_PREFIX.cache_key}},
+    ]
+    first, second = get_slug_prompt("title: A"), get_slug_prompt("title: B")
+    assert first.startswith(SLUG_PREFIX.instructions) and second.startswith(SLUG_PREFIX.instructions)
+    assert SLUG_PREFIX.version == PromptPrefix("slug", SLUG_PREFIX.instructions).version
+    # Tool schemas are part of the prefix
+    assert registry.SEARCH_PREFIX.version != PromptPrefix.build("search", prompt).version
+
+
+def test_prompt_version_tracks_content():
+    assert prompt_version("a") == prompt_version("a")
+    assert prompt_version("a") != prompt_version("b")
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from agent.v2.batch import run_batch  # noqa: E402
+from agent.v2.search_cache import reset_search_cache_for_tests  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_then_answer,
+)
+
+
+def _reply(messages):
+    if messages[-1].type == "human" and messages[-1].content == "boom":
+        raise RuntimeError("model unavailable")
+    return search_then_answer({"category": ["warehouse"], "offer_type": "rent"})(messages)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    # Slow enough that concurrent turns overlap inside the lookup
+    collection = install_collection(monkeypatch, InMemoryCollection(load_listing_catalog(), latency=0.05))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("SEARCH_CACHE_MAX_ENTRIES", "0")
+    reset_search_cache_for_tests()
+    model = FakeChatModel(replies=[_reply])
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: model)
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    registry.clear_agent_registry()
+    yield collection
+    registry.clear_agent_registry()
+    reset_search_cache_for_tests()
+
+
+def _batch(messages, **extra):
+    return {"items": [{"message": m, "thread_id": f"b-{i}"} for i, m in enumerate(messages)], **extra}
+
+
+def test_batch_returns_results_in_order_and_shares_identical_lookups(collection):
+    client = TestClient(index.app)
+
+    response = client.post("/api/v2/invoke/batch", json=_batch(["warehouse"] * 4))
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["status"], body["succeeded"], body["failed"]) == ("success", 4, 0)
+    assert [r["thread_id"] for r in body["results"]] == ["b-0", "b-1", "b-2", "b-3"]
+    assert all(r["recommended_listings"] and r["graph_output"] for r in body["results"])
+    shared_trips = collection.round_trips
+
+    collection.round_trips = 0
+    sequential = client.post("/api/v2/invoke/batch", json={**_batch(["warehouse"] * 4), "concurrency": 1})
+    assert sequential.json()["succeeded"] == 4
+    assert collection.round_trips == 4 * shared_trips
+
+
+def test_failed_items_do_not_fail_the_batch(collection):
+    body = TestClient(index.app).post("/api/v2/invoke/batch", json=_batch(["warehouse", "boom"])).json()
+
+    assert body["status"] == "partial"
+    assert body["results"][0]["status"] == "success"
+    assert body["results"][1]["status"] == "error"
+    assert body["results"][1]["error"] == "model unavailable"
+
+
+def test_batch_validation(collection, monkeypatch):
+    client = TestClient(index.app)
+    monkeypatch.setenv("BATCH_MAX_ITEMS", "2")
+
+    assert client.post("/api/v2/invoke/batch", json=_batch(["a", "b", "c"])).status_code == 413
+    assert client.post("/api/v2/invoke/batch", json={"items": []}).status_code == 400
+    duplicate = {"items": [{"message": "a", "thread_id": "same"}, {"message": "b", "thread_id": "same"}]}
+    assert client.post("/api/v2/invoke/batch", json=duplicate).status_code == 400
+
+
+def test_run_batch_respects_the_concurrency_cap():
+    state = {"running": 0, "peak": 0}
+
+    async def run_item(item):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return {"value": item["thread_id"]}
+
+    items = [{"thread_id": str(i)} for i in range(10)]
+    results = asyncio.run(run_batch(items, run_item, concurrency=3))
+
+    assert state["peak"] == 3
+    assert [r["value"] for r in results] == [str(i) for i in range(10)]
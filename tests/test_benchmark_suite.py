@@ -0,0 +1,48 @@
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from benchmarks import suite  # noqa: E402
+from utility import property_listing_init  # noqa: E402
+
+
+def test_measure_loops_fast_calls_and_reports_stats():
+    calls = []
+    stats = suite.measure(lambda: calls.append(1), max_time=0.0, min_rounds=3, min_round_ms=1.0)
+
+    assert stats["rounds"] == 3
+    assert stats["iterations"] > 1
+    assert len(calls) == 1 + 3 * stats["iterations"]
+    assert stats["min"] <= stats["median"] <= stats["max"]
+
+
+def test_suite_runs_offline_and_results_compare(monkeypatch):
+    monkeypatch.setattr(suite, "FILTER_SHAPES", {"category": suite.FILTER_SHAPES["category"]})
+    before = (registry.load_llm, index.get_checkpointer, property_listing_init._client, logging.getLogger().level)
+    result = suite.run_suite([200], max_time=0.0, min_rounds=1, min_round_ms=0.0)
+
+    # Stubs and log levels are put back once the suite returns
+    assert (registry.load_llm, index.get_checkpointer, property_listing_init._client, logging.getLogger().level) == before
+
+    names = [bench["name"] for bench in result["benchmarks"]]
+    assert names == [
+        "serialize[public]",
+        "serialize[detail]",
+        "search[mongo-category-200]",
+        "search[memory-category-200]",
+        "get_listing_by_ids[200]",
+        "invoke[200]",
+    ]
+    assert result["options"]["sizes"] == [200]
+
+    rows = suite.compare(result, result)
+    assert len(rows) == len(names)
+    assert all(row["change"] == 0 for row in rows)
+    registry.clear_agent_registry()
@@ -0,0 +1,162 @@
+import asyncio
+import gc
+import operator
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Annotated, List
+
+import pytest
+from typing_extensions import TypedDict
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from langgraph.checkpoint.base import empty_checkpoint  # noqa: E402  # pylint: disable=C0413
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from utility.bounded_checkpointer import BoundedMemorySaver  # noqa: E402
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def _put(saver, thread_id, payload="hello"):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": payload}
+    checkpoint["channel_versions"] = {"messages": saver.get_next_version(None, None)}
+    stored = saver.put(_config(thread_id), checkpoint, {"source": "input", "step": 0}, checkpoint["channel_versions"])
+    saver.put_writes(stored, [("messages", payload)], task_id="task-1")
+    return stored
+
+
+def _payload(saver, thread_id):
+    saved = saver.get_tuple(_config(thread_id))
+    return saved.checkpoint["channel_values"]["messages"] if saved else None
+
+
+def test_least_recently_used_threads_are_evicted(clock):
+    saver = BoundedMemorySaver(max_threads=3, clock=clock)
+    for thread_id in ["a", "b", "c"]:
+        _put(saver, thread_id)
+        clock.now += 1
+    assert _payload(saver, "a") == "hello"  # touch: "b" is now the oldest
+
+    _put(saver, "d")
+
+    assert "b" not in saver and "a" in saver
+    assert _payload(saver, "b") is None
+    assert saver.stats()["evictions"] == 1
+    assert not any(key[0] == "b" for key in saver.blobs)
+    assert not any(key[0] == "b" for key in saver.writes)
+
+
+def test_byte_budget_bounds_retained_checkpoints(clock):
+    saver = BoundedMemorySaver(max_threads=1000, max_bytes=20_000, clock=clock)
+    for i in range(50):
+        _put(saver, f"t-{i}", payload="x" * 1000)
+
+    stats = saver.stats()
+    assert stats["bytes"] <= 20_000
+    assert 5 <= stats["threads"] < 20
+    assert stats["bytes"] == sum(len(v[1]) for v in saver.blobs.values()) + sum(
+        len(ckpt[1]) + len(meta[1]) for ns in saver.storage.values() for c in ns.values() for ckpt, meta, _ in c.values()
+    ) + sum(len(w[2][1]) for writes in saver.writes.values() for w in writes.values())
+
+
+def test_idle_threads_expire(clock):
+    saver = BoundedMemorySaver(ttl=60, clock=clock)
+    _put(saver, "old")
+    clock.now = 30
+    _put(saver, "recent")
+    clock.now = 61
+
+    assert _payload(saver, "old") is None
+    assert _payload(saver, "recent") == "hello"
+    assert saver.stats()["expirations"] == 1
+
+
+def test_active_threads_spill_and_come_back(clock):
+    spill = InMemorySaver()
+    saver = BoundedMemorySaver(max_threads=1, spill_factory=lambda: spill, active_window=300, clock=clock)
+
+    _put(saver, "first", payload="first turn")
+    clock.now = 10
+    _put(saver, "second")
+
+    assert "first" not in saver
+    assert spill.get_tuple(_config("first")).pending_writes == [("task-1", "messages", "first turn")]
+
+    clock.now = 20
+    restored = saver.get_tuple(_config("first"))
+    assert restored.checkpoint["channel_values"]["messages"] == "first turn"
+    assert "first" in saver and "second" not in saver
+    stats = saver.stats()
+    assert (stats["spilled"], stats["restored"]) == (2, 1)
+
+
+def test_idle_evictions_are_not_spilled(clock):
+    spill = InMemorySaver()
+    saver = BoundedMemorySaver(max_threads=1, spill_factory=lambda: spill, active_window=60, clock=clock)
+    _put(saver, "idle")
+    clock.now = 120
+    _put(saver, "busy")
+
+    assert spill.get_tuple(_config("idle")) is None
+    assert _payload(saver, "idle") is None
+
+
+def test_graph_conversations_survive_in_bounded_saver(clock):
+    class State(TypedDict):
+        turns: Annotated[List[str], operator.add]
+
+    builder = StateGraph(State)
+    builder.add_node("echo", lambda state: {"turns": ["reply"]})
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    spill = InMemorySaver()
+    saver = BoundedMemorySaver(max_threads=2, spill_factory=lambda: spill, clock=clock)
+    graph = builder.compile(checkpointer=saver)
+
+    async def run():
+        for turn in range(2):
+            for user in range(4):
+                await graph.ainvoke({"turns": [f"hi {turn}"]}, {"configurable": {"thread_id": f"user-{user}"}})
+
+    asyncio.run(run())
+
+    assert saver.stats()["threads"] == 2
+    state = graph.get_state({"configurable": {"thread_id": "user-0"}})
+    assert state.values["turns"] == ["hi 0", "reply", "hi 1", "reply"]
+
+
+def test_memory_stays_flat_across_100k_threads():
+    saver = BoundedMemorySaver(max_threads=1000, ttl=None)
+
+    def churn(start, stop):
+        for i in range(start, stop):
+            _put(saver, f"thread-{i}", payload="message body " * 8)
+
+    churn(0, 90_000)
+    tracemalloc.start()
+    try:
+        # The retained set is fully replaced once tracing has started
+        churn(90_000, 92_000)
+        gc.collect()
+        baseline, _ = tracemalloc.get_traced_memory()
+        churn(92_000, 100_000)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert saver.stats()["threads"] == 1000
+    assert len(saver.storage) == 1000
+    assert len(saver.blobs) == 1000
+    assert len(saver.writes) == 1000
+    # 8k more threads under tracing, yet retained memory does not grow
+    assert current - baseline < 512 * 1024
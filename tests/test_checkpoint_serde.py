@@ -0,0 +1,129 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+from utility import checkpoint_pruning  # noqa: E402  # pylint: disable=C0413
+from utility.checkpoint_serde import ZSTD_SUFFIX, CompressedSerializer, build_serde  # noqa: E402
+
+
+def _messages():
+    payload = '{"listing_count": 400, "property_ids": [%s]}' % ", ".join(str(i) for i in range(400))
+    return [
+        HumanMessage(content="warehouse in Shah Alam", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[{"name": "search", "args": {"input": {}}, "id": "c1"}]),
+        ToolMessage(content=payload, tool_call_id="c1", id="t1"),
+    ]
+
+
+def test_large_values_are_compressed_and_round_trip():
+    serde = CompressedSerializer()
+    plain_type, plain = JsonPlusSerializer().dumps_typed(_messages())
+
+    type_, data = serde.dumps_typed(_messages())
+    assert type_ == plain_type + ZSTD_SUFFIX
+    assert len(data) < len(plain) / 2
+    assert serde.loads_typed((type_, data)) == _messages()
+
+
+def test_small_values_and_existing_rows_load_unchanged():
+    serde = CompressedSerializer()
+    assert serde.dumps_typed({"step": 1})[0] == "msgpack"
+    assert serde.dumps_typed(None) == ("null", b"")
+
+    legacy = JsonPlusSerializer().dumps_typed(_messages())
+    assert serde.loads_typed(legacy) == _messages()
+
+
+def test_disabled_compression_still_reads_compressed_rows(monkeypatch):
+    compressed = CompressedSerializer().dumps_typed(_messages())
+    monkeypatch.setenv("CHECKPOINT_COMPRESSION", "false")
+
+    serde = build_serde()
+    assert not serde.dumps_typed(_messages())[0].endswith(ZSTD_SUFFIX)
+    assert serde.loads_typed(compressed) == _messages()
+
+
+def test_saver_round_trips_checkpoints():
+    saver = InMemorySaver(serde=CompressedSerializer(min_size=64))
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+    checkpoint = {
+        "v": 4,
+        "id": "1",
+        "ts": "2026-01-01T00:00:00+00:00",
+        "channel_values": {"messages": _messages()},
+        "channel_versions": {"messages": "1"},
+        "versions_seen": {},
+    }
+    saver.put(config, checkpoint, {"step": 1}, {"messages": "1"})
+
+    assert any(type_.endswith(ZSTD_SUFFIX) for type_, _ in saver.blobs.values())
+    assert saver.get_tuple(config).checkpoint["channel_values"]["messages"] == _messages()
+
+
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rowcount = 0
+        self._rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params):
+        self.pool.statements.append(sql)
+        if sql is checkpoint_pruning.SELECT_PRUNABLE_THREADS_SQL:
+            batch = self.pool.batches.pop(0) if self.pool.batches else []
+            self._rows = [{"thread_id": t} for t in batch]
+        elif sql is checkpoint_pruning.DELETE_OLD_CHECKPOINTS_SQL:
+            self._rows = [{"checkpoints": 3 * len(params["threads"]), "writes": len(params["threads"])}]
+        else:
+            self.rowcount = 2
+
+    async def fetchall(self):
+        return self._rows
+
+    async def fetchone(self):
+        return self._rows[0]
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return FakeCursor(self.pool)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, batches):
+        self.batches = batches
+        self.statements = []
+
+    @asynccontextmanager
+    async def connection(self):
+        yield FakeConnection(self)
+
+
+def test_pruning_runs_batches_until_no_thread_is_over_the_limit():
+    pool = FakePool([["a", "b"], ["c"]])
+    totals = asyncio.run(checkpoint_pruning.prune_checkpoints(pool, keep_last=5, batch_size=2))
+
+    assert totals == {"threads": 3, "checkpoints": 9, "writes": 3, "blobs": 4}
+    assert asyncio.run(checkpoint_pruning.prune_checkpoints(FakePool([["a"]]), keep_last=0))["threads"] == 0
@@ -0,0 +1,172 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from utility import checkpointer_init  # noqa: E402  # pylint: disable=C0413
+
+
+class DummyPool:
+    def __init__(self, stats=None):
+        self.stats = stats or {}
+        self.opened = 0
+        self.closed = 0
+
+    async def open(self, wait=False, timeout=None):
+        self.opened += 1
+
+    async def close(self):
+        self.closed += 1
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+class DummySaver:
+    setup_calls = 0
+
+    def __init__(self, conn, serde=None):
+        self.conn = conn
+        self.serde = serde
+
+    async def setup(self):
+        DummySaver.setup_calls += 1
+
+
+@pytest.fixture(autouse=True)
+def _reset_checkpointer():
+    checkpointer_init.reset_checkpointer_for_tests()
+    DummySaver.setup_calls = 0
+    yield
+    checkpointer_init.reset_checkpointer_for_tests()
+
+
+def test_get_checkpointer_requires_lifespan():
+    with pytest.raises(RuntimeError):
+        checkpointer_init.get_checkpointer()
+
+
+def test_open_checkpointer_requires_db_uri(monkeypatch):
+    monkeypatch.delenv("DB_URI", raising=False)
+    with pytest.raises(RuntimeError):
+        asyncio.run(checkpointer_init.open_checkpointer())
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("CHECKPOINT_POOL_MAX_SIZE", "25")
+    monkeypatch.setenv("CHECKPOINT_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("CHECKPOINT_POOL_HEALTH_CHECK", "false")
+
+    settings = checkpointer_init.get_pool_settings()
+    assert settings["max_size"] == 25
+    assert settings["timeout"] == 2.5
+    assert settings["health_check"] is False
+
+
+def test_open_checkpointer_reuses_pool_and_runs_setup_once(monkeypatch):
+    pool = DummyPool()
+    monkeypatch.setattr(checkpointer_init, "_build_pool", lambda uri, settings: pool)
+    monkeypatch.setattr(checkpointer_init, "AsyncPostgresSaver", DummySaver)
+
+    async def scenario():
+        first = await checkpointer_init.open_checkpointer("postgresql://example")
+        second = await checkpointer_init.open_checkpointer("postgresql://example")
+        assert first is second
+        assert checkpointer_init.get_checkpointer() is first
+        await checkpointer_init.close_checkpointer()
+
+    asyncio.run(scenario())
+    assert pool.opened == 1
+    assert pool.closed == 1
+    assert DummySaver.setup_calls == 1
+
+
+def test_failed_open_or_setup_closes_the_pool(monkeypatch):
+    class FailingSaver(DummySaver):
+        async def setup(self):
+            raise RuntimeError("migration failed")
+
+    class TimeoutPool(DummyPool):
+        async def open(self, wait=False, timeout=None):
+            raise TimeoutError("pool initialization incomplete")
+
+    for pool, saver in ((TimeoutPool(), DummySaver), (DummyPool(), FailingSaver)):
+        monkeypatch.setattr(checkpointer_init, "_build_pool", lambda uri, settings: pool)
+        monkeypatch.setattr(checkpointer_init, "AsyncPostgresSaver", saver)
+
+        with pytest.raises((TimeoutError, RuntimeError)):
+            asyncio.run(checkpointer_init.open_checkpointer("postgresql://example", run_setup=True))
+
+        assert pool.closed == 1
+        with pytest.raises(RuntimeError):
+            checkpointer_init.get_checkpointer()
+
+
+class SyncPool:
+    built = []
+    check_connection = None
+    fail = False
+
+    def __init__(self, **kwargs):
+        self.closed = 0
+        SyncPool.built.append(self)
+
+    def open(self, wait=False, timeout=None):
+        time.sleep(0.02)
+        if SyncPool.fail:
+            raise TimeoutError("pool initialization incomplete")
+
+    def close(self):
+        self.closed += 1
+
+
+def test_sync_checkpointer_opens_one_pool_and_closes_failed_ones(monkeypatch):
+    SyncPool.built, SyncPool.fail = [], True
+    monkeypatch.setattr(checkpointer_init, "ConnectionPool", SyncPool)
+    monkeypatch.setattr(checkpointer_init, "PostgresSaver", lambda pool, serde=None: object())
+    monkeypatch.setenv("CHECKPOINT_SETUP_ON_STARTUP", "false")
+
+    with pytest.raises(TimeoutError):
+        checkpointer_init.get_sync_checkpointer("postgresql://example")
+    assert [pool.closed for pool in SyncPool.built] == [1]
+
+    SyncPool.built, SyncPool.fail = [], False
+    with ThreadPoolExecutor(4) as executor:
+        savers = list(executor.map(lambda _: checkpointer_init.get_sync_checkpointer("postgresql://example"), range(4)))
+    assert len(SyncPool.built) == 1
+    assert all(saver is savers[0] for saver in savers)
+
+
+def test_pool_stats_report_usage_and_latency(monkeypatch):
+    monkeypatch.setattr(
+        checkpointer_init,
+        "_pool",
+        DummyPool({
+            "pool_min": 1,
+            "pool_max": 10,
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 10,
+            "requests_queued": 4,
+            "requests_wait_ms": 40,
+        }),
+    )
+
+    stats = checkpointer_init.get_pool_stats()
+    assert stats["in_use"] == 3
+    assert stats["waiting"] == 2
+    assert stats["avg_acquire_ms"] == 4.0
+    assert stats["avg_queued_wait_ms"] == 10.0
+
+
+def test_pool_stats_when_closed():
+    assert checkpointer_init.get_pool_stats() == {"status": "closed"}
@@ -0,0 +1,139 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402  # pylint: disable=C0413
+from agent.v2.compaction import SUMMARY_MESSAGE_ID, compact_tool_messages, trim_history  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_tool_call,
+)
+
+JOURNEY = [
+    {"category": ["warehouse"]},
+    {"category": ["warehouse"], "offer_type": "rent"},
+    {"category": ["warehouse"], "offer_type": "rent", "max_price": 50000},
+    {"category": ["factory", "warehouse"], "offer_type": "sale"},
+    {"offer_type": "sale", "location": ["Selangor"]},
+]
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("LOCATION_MATCH", "regex")
+    return install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+
+
+@pytest.fixture
+def agent(monkeypatch, collection):
+    monkeypatch.setenv("COMPACTION_TRIGGER_TOKENS", "2500")
+    monkeypatch.setenv("COMPACTION_TARGET_TOKENS", "1200")
+    turn = {"n": 0}
+
+    def reply(messages):
+        if messages[-1].type == "tool":
+            return AIMessage(content="I'm seeing some properties that match. Shall I narrow it down further?")
+        turn["n"] += 1
+        return search_tool_call(JOURNEY[turn["n"] % len(JOURNEY)], call_id=f"call_{turn['n']}")
+
+    fake = FakeChatModel(replies=[reply])
+    monkeypatch.setattr(registry, "load_llm", lambda model="gpt-4.1", **overrides: fake)
+    registry.clear_agent_registry()
+    yield registry.get_search_agent(InMemorySaver()), turn
+    registry.clear_agent_registry()
+
+
+def _chat(agent, turns):
+    config = {"configurable": {"thread_id": "long-thread"}}
+    state = None
+    for i in range(turns):
+        state = agent.invoke(
+            {"messages": [{"role": "user", "content": f"Turn {i}: still looking for a place for my business"}]},
+            config,
+        )
+    return state
+
+
+def test_context_size_levels_off_in_long_conversations(agent):
+    agent, _ = agent
+    state = _chat(agent, 30)
+
+    tokens = state["context_tokens"]
+    assert len(tokens) == 50
+    # Two model calls per turn; the later half is no larger than the limit allows
+    assert max(tokens[-20:]) <= 2500
+    assert any(m.id == SUMMARY_MESSAGE_ID for m in state["messages"])
+    assert sum(isinstance(m, HumanMessage) for m in state["messages"]) < 30
+
+
+def test_stale_tool_results_are_compacted_and_pairs_kept(agent):
+    agent, _ = agent
+    state = _chat(agent, 4)
+    messages = state["messages"]
+
+    tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
+    assert all(m.additional_kwargs.get("compacted") for m in tool_messages[:-1])
+    stale = json.loads(tool_messages[0].content)
+    assert set(stale) == {"filters_applied", "listing_count", "stale"}
+    assert "property_ids" in json.loads(tool_messages[-1].content)
+
+    call_ids = {c["id"] for m in messages if isinstance(m, AIMessage) for c in m.tool_calls}
+    assert {m.tool_call_id for m in tool_messages} == call_ids
+
+
+def test_latest_preferences_are_kept_as_state(agent):
+    agent, turn = agent
+    state = _chat(agent, 12)
+
+    preferences = state["preferences"]
+    assert preferences["filters"] == JOURNEY[turn["n"] % len(JOURNEY)]
+    last_result = json.loads([m for m in state["messages"] if isinstance(m, ToolMessage)][-1].content)
+    assert preferences["listing_count"] == last_result["listing_count"]
+
+
+def test_trim_cuts_at_turn_boundaries_and_folds_previous_summary():
+    messages = [SystemMessage(content="Earlier turns...\n- very first ask", id=SUMMARY_MESSAGE_ID)]
+    for i in range(6):
+        messages += [
+            HumanMessage(content=f"question {i} " + "x" * 400, id=f"h{i}"),
+            AIMessage(content="", id=f"a{i}", tool_calls=[{"name": "count_listing_facets", "args": {"input": {}}, "id": f"c{i}"}]),
+            ToolMessage(content="y" * 400, tool_call_id=f"c{i}", id=f"t{i}"),
+            AIMessage(content="answer", id=f"r{i}"),
+        ]
+
+    trimmed = trim_history(messages, trigger_tokens=500, target_tokens=300, keep_turns=2, preferences={"filters": {"offer_type": "rent"}, "listing_count": 7})
+
+    assert trimmed[0].id == SUMMARY_MESSAGE_ID
+    assert "- very first ask" in trimmed[0].content
+    assert "- question 0" in trimmed[0].content
+    assert '{"offer_type": "rent"} (7 listings)' in trimmed[0].content
+    assert [m.id for m in trimmed[1:]] == ["h4", "a4", "t4", "r4", "h5", "a5", "t5", "r5"]
+    assert trim_history(trimmed, trigger_tokens=10_000, target_tokens=300, keep_turns=2, preferences=None) is None
+
+
+def test_current_turn_tool_results_are_left_alone():
+    messages = [
+        HumanMessage(content="hi", id="h0"),
+        ToolMessage(content=json.dumps({"listing_count": 3, "filters_applied": {}, "property_ids": [1, 2, 3]}), tool_call_id="c0", id="t0"),
+        HumanMessage(content="more", id="h1"),
+        ToolMessage(content="{}", tool_call_id="c1", id="t1"),
+    ]
+
+    [replacement] = compact_tool_messages(messages)
+    assert replacement.id == "t0"
+    assert json.loads(replacement.content) == {"filters_applied": {}, "listing_count": 3, "stale": True}
+    assert compact_tool_messages(messages[:1] + [replacement] + messages[2:]) == []
@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v1.listing_retrieval import parse_preferences  # noqa: E402
+from agent.v2 import registry  # noqa: E402
+from agent.v2.compaction import SUMMARY_MESSAGE_ID  # noqa: E402
+from agent.v2.filter_extraction import extract_listing_filter  # noqa: E402
+from agent.v2.search_cache import reset_search_cache_for_tests  # noqa: E402
+from benchmarks.bench_filter_extraction import evaluate, load_cases  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_then_answer,
+)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    reset_search_cache_for_tests()
+    model = FakeChatModel(replies=[search_then_answer({"category": ["factory"]}, "Here is what I found.")])
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: model)
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    registry.clear_agent_registry()
+    yield model
+    registry.clear_agent_registry()
+    reset_search_cache_for_tests()
+
+
+def test_evaluation_set_is_fully_covered_without_wrong_triggers():
+    report = evaluate(load_cases())
+
+    assert report["failures"] == []
+    assert report["coverage"] == report["precision"] == report["field_accuracy"] == 1.0
+    assert report["wrong_triggers"] == 0
+
+
+def test_unplaced_quantities_and_negations_are_reported():
+    assert extract_listing_filter("detached factory with 2 loading bays").unresolved == ["2"]
+    assert extract_listing_filter("warehouse not in Klang").unresolved == ["not"]
+    assert extract_listing_filter("warehouse at no less than 10,000 sqft").confident
+
+
+@pytest.mark.parametrize("budget", ["under RM2m", "under RM 2 mio", "below RM500 thousand", "max RM1.5 mln", "under RM 800k"])
+def test_prices_read_the_same_as_the_v1_parser(budget):
+    v2 = extract_listing_filter(f"warehouse {budget}").filters
+    v1 = parse_preferences({"budget": budget})["filters"]
+
+    assert v2["max_price"] == v1["max_price"]
+
+
+def test_first_turn_answers_from_the_prefetched_search_in_one_model_call(model):
+    client = TestClient(index.app)
+
+    body = client.post("/api/v2/invoke", json={"message": "warehouse for rent in Shah Alam", "thread_id": "f-1"}).json()
+
+    assert len(model.calls) == 1
+    prompt = model.calls[0]
+    assert [m.type for m in prompt[-3:]] == ["human", "ai", "tool"]
+    assert prompt[-2].tool_calls[0]["args"] == {
+        "input": {"offer_type": "rent", "category": ["warehouse"], "location": ["Shah Alam"]}
+    }
+    assert body["graph_output"] == "Here is what I found."
+    assert body["preferences"] == prompt[-1].artifact["filters_applied"]
+    assert body["recommended_listings"] == prompt[-1].artifact["listings"]
+
+    # Follow-ups go to the model, which decides whether to search again
+    client.post("/api/v2/invoke", json={"message": "any in Klang?", "thread_id": "f-1"})
+    assert len(model.calls) == 3
+
+
+def test_fast_path_can_be_disabled(model, monkeypatch):
+    monkeypatch.setenv("FILTER_FAST_PATH", "false")
+
+    TestClient(index.app).post("/api/v2/invoke", json={"message": "warehouse for rent", "thread_id": "f-2"})
+
+    assert len(model.calls) == 2
+
+
+def test_turn_left_alone_by_compaction_is_not_prefetched(model, monkeypatch):
+    monkeypatch.setenv("COMPACTION_TRIGGER_TOKENS", "1")
+    monkeypatch.setenv("COMPACTION_TARGET_TOKENS", "1")
+    monkeypatch.setenv("COMPACTION_KEEP_TURNS", "1")
+    client = TestClient(index.app)
+
+    client.post("/api/v2/invoke", json={"message": "warehouse for rent in Shah Alam", "thread_id": "f-3"})
+    assert len(model.calls) == 1
+
+    # Compaction leaves [summary, human]; the follow-up must still go to the model
+    client.post("/api/v2/invoke", json={"message": "warehouse for sale in Klang", "thread_id": "f-3"})
+    assert len(model.calls) == 3
+    # System prompt, then what compaction kept
+    follow_up = model.calls[1][1:]
+    assert follow_up[0].id == SUMMARY_MESSAGE_ID
+    assert [m.type for m in follow_up[1:]] == ["human"]
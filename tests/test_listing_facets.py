@@ -0,0 +1,52 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.tools import listing_facets  # noqa: E402  # pylint: disable=C0413
+from tests.helpers import FILTER_SHAPES, run_on_engine  # noqa: E402
+
+
+@pytest.mark.parametrize("filters", FILTER_SHAPES)
+def test_memory_facets_match_mongo_aggregation(monkeypatch, catalog, filters):
+    mongo = run_on_engine(monkeypatch, listing_facets.count_listing_facets, "mongo", filters)
+    memory = run_on_engine(monkeypatch, listing_facets.count_listing_facets, "memory", filters)
+    assert memory == mongo
+
+
+def test_facets_count_without_transferring_documents(monkeypatch, catalog):
+    collection, _ = catalog
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("LOCATION_MATCH", "regex")
+
+    payload = json.loads(listing_facets.count_listing_facets.invoke({"input": {"offer_type": "sale"}}))
+
+    assert collection.round_trips == 1
+    assert set(payload) == {"filters_applied", "listing_count", "facets"}
+    expected = sum(1 for d in collection.documents if d["offer"]["offer_type"] == "sale")
+    assert payload["listing_count"] == expected
+    assert payload["facets"]["offer_type"] == {"sale": expected}
+    for name in listing_facets.BUCKET_FACETS:
+        assert sum(payload["facets"][name].values()) == expected
+
+
+def test_bucket_labels():
+    boundaries = listing_facets.PRICE_BOUNDARIES
+    assert listing_facets.bucket_label(boundaries, 500_000) == "500k-2M"
+    assert listing_facets.bucket_label(boundaries, 30_000_000) == "30M+"
+    assert listing_facets.bucket_label(boundaries, "unknown") == "unknown"
+
+
+def test_async_facets_match_sync(monkeypatch, catalog):
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    filters = {"category": ["warehouse"], "location": ["Shah Alam"]}
+    sync_payload = listing_facets.count_listing_facets.invoke({"input": filters})
+    async_payload = asyncio.run(listing_facets.count_listing_facets.ainvoke({"input": filters}))
+    assert async_payload == sync_payload
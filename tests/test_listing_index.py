@@ -0,0 +1,121 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.tools import listing_index, search_listing_database  # noqa: E402  # pylint: disable=C0413
+from agent.v2.tools.listing_index import ListingIndex  # noqa: E402
+from tests.helpers import FILTER_SHAPES, run_on_engine  # noqa: E402
+
+
+@pytest.mark.parametrize("location_match", ["index", "regex"])
+@pytest.mark.parametrize("filters", FILTER_SHAPES)
+def test_memory_engine_matches_mongo_payload(monkeypatch, catalog, filters, location_match):
+    monkeypatch.setenv("LOCATION_MATCH", location_match)
+    tool = search_listing_database.search_listing_property_from_database
+    mongo = run_on_engine(monkeypatch, tool, "mongo", filters)
+    memory = run_on_engine(monkeypatch, tool, "memory", filters)
+    assert memory == mongo
+
+
+def test_category_and_location_filters_are_combined(catalog):
+    query = search_listing_database.build_listing_query({"category": ["warehouse"], "location": ["Balakong"]})
+    assert "$or" not in query
+    assert len(query["$and"]) == 2
+
+
+def test_incremental_refresh_tracks_updates_and_deletes(catalog):
+    collection, index = catalog
+    index.load()
+    full_loads = collection.round_trips
+
+    target = collection.documents[0]["property_id"]
+    collection.update_one(
+        {"property_id": target},
+        {"$set": {"offer.price": 1, "last_updated": "2099-01-01T00:00:00"}},
+    )
+    removed = collection.documents[1]["property_id"]
+    collection.delete_one({"property_id": removed})
+
+    assert index.refresh() == {"updated": 1, "removed": 1}
+    # changed-since query and the id reconciliation scan
+    assert collection.round_trips - full_loads == 2
+
+    ids = [d["property_id"] for d in index.search_documents({"max_price": 1})]
+    assert ids == [target]
+    assert removed not in [d["property_id"] for d in index.search_documents({})]
+    assert len(index) == len(collection.documents)
+
+
+def test_refresh_catches_same_timestamp_writes_and_delete_plus_insert(catalog):
+    collection, index = catalog
+    index.load()
+    watermark = max(d["last_updated"] for d in collection.documents)
+
+    # Same last_updated as the newest row seen, and a delete balanced by an insert
+    target = collection.documents[0]["property_id"]
+    collection.update_one({"property_id": target}, {"$set": {"offer.price": 1, "last_updated": watermark}})
+    removed = collection.documents[1]["property_id"]
+    collection.delete_one({"property_id": removed})
+    collection.insert_one({**collection.documents[2], "property_id": "LP999999", "slug": "new", "last_updated": "2099-01-01"})
+
+    assert index.refresh() == {"updated": 2, "removed": 1}
+    assert [d["property_id"] for d in index.search_documents({"max_price": 1})] == [target]
+    ids = {d["property_id"] for d in index.search_documents({})}
+    assert removed not in ids and "LP999999" in ids
+    # Rows re-read at the watermark are not counted again
+    assert index.refresh() == {"updated": 0, "removed": 0}
+
+
+def test_id_scan_is_skipped_until_count_watermark_or_resync_interval_change(catalog, clock):
+    collection, _ = catalog
+    index = ListingIndex(lambda: collection, refresh_interval=10, clock=clock)
+    index.load()
+
+    trips = collection.round_trips
+    assert index.refresh() == {"updated": 0, "removed": 0}
+    # changed-since query and count only
+    assert collection.round_trips - trips == 2
+
+    # Nothing newer and the count is unchanged: only the periodic resync notices
+    removed = collection.documents[1]["property_id"]
+    collection.delete_one({"property_id": removed})
+    collection.insert_one({**collection.documents[2], "property_id": "LP999999", "slug": "old", "last_updated": "2000-01-01"})
+    assert index.refresh() == {"updated": 0, "removed": 0}
+
+    clock.now = index.resync_interval
+    assert index.refresh() == {"updated": 1, "removed": 1}
+    assert "LP999999" in {d["property_id"] for d in index.search_documents({})}
+
+
+def test_ensure_fresh_refreshes_once_under_concurrency(catalog, clock):
+    collection, _ = catalog
+    index = ListingIndex(lambda: collection, refresh_interval=10, clock=clock)
+    calls = []
+    refresh = index.refresh
+
+    def slow_refresh():
+        calls.append(1)
+        time.sleep(0.05)
+        return refresh()
+
+    index.refresh = slow_refresh
+    index.ensure_fresh()
+    clock.now = 60.0
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: index.ensure_fresh(), range(8)))
+
+    assert len(calls) == 2
+
+
+def test_unknown_engine_is_rejected(monkeypatch):
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "sqlite")
+    with pytest.raises(RuntimeError):
+        listing_index.get_search_engine()
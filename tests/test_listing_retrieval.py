@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v1 import listing_retrieval  # noqa: E402  # pylint: disable=C0413
+from agent.v1.listing_retrieval import parse_preferences, range_credit, retrieve_candidates, shortlist  # noqa: E402
+from agent.v2.tools.listing_index import ListingIndex  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, load_listing_catalog  # noqa: E402
+from utility.tokens import count_tokens  # noqa: E402
+
+
+@pytest.fixture
+def index():
+    collection = InMemoryCollection(load_listing_catalog(500))
+    return ListingIndex(lambda: collection)
+
+
+def test_parse_planner_preferences():
+    parsed = parse_preferences({
+        "buy_rent": "Rent",
+        "location": "Shah Alam or Klang",
+        "size": "at least 10,000 sqft",
+        "business_nature": "e-commerce fulfilment",
+        "power_requirement": "minimum 1 MVA",
+        "ceiling_height": "40 ft",
+        "budget": "below RM 50k per month",
+        "floor_loading_capacity": "3 ton/sqm",
+    })
+    filters = parsed["filters"]
+    assert filters["offer_type"] == "rent"
+    assert filters["location"] == ["Shah Alam", "Klang"]
+    assert filters["category"] == ["warehouse"]
+    assert filters["min_built_up_size"] == 10000
+    assert filters["max_price"] == 50000
+    assert filters["min_power_supply"] == 1000
+    assert filters["min_ceiling_height"] == pytest.approx(12.19, abs=0.01)
+    assert parsed["floor_loading"] == (3.0, None)
+
+
+def test_unparseable_preferences_are_dropped():
+    parsed = parse_preferences({"buy_rent": None, "budget": "flexible", "size": "large", "location": " "})
+    assert parsed == {"filters": {}, "floor_loading": None}
+
+
+def test_land_size_in_acres():
+    filters = parse_preferences({"size": "2-3 acres of land"})["filters"]
+    assert filters == {"min_land_size": 2 * 43560, "max_land_size": 3 * 43560}
+
+
+def test_range_credit_decays_outside_bounds():
+    assert range_credit(10, (5, 20)) == 1.0
+    assert range_credit(15, (None, 10)) == 0.5
+    assert range_credit(None, (5, None)) == listing_retrieval.UNKNOWN_CREDIT
+
+
+def test_shortlist_ranks_full_matches_first(index):
+    parsed = parse_preferences({"buy_rent": "Buy", "business_nature": "warehouse", "location": "Shah Alam"})
+    ranked, catalog_size = shortlist(parsed, 5, index)
+
+    assert catalog_size == sum(1 for d in index.search_documents({}) if d["offer"]["offer_type"] == "sale")
+    assert len(ranked) == 5
+    best = ranked[0][1]
+    assert best["offer"]["offer_type"] == "sale"
+    assert best["main_category"] == "warehouse"
+    assert "Shah Alam" in str(best["location"])
+    assert [score for score, _ in ranked] == sorted((score for score, _ in ranked), reverse=True)
+
+
+def test_candidates_respect_token_budget(monkeypatch, index):
+    monkeypatch.setenv("LOOKUP_TOP_K", "50")
+    monkeypatch.setenv("LOOKUP_TOKEN_BUDGET", "300")
+
+    text, stats = retrieve_candidates({"business_nature": "factory"}, index, baseline=True)
+
+    assert count_tokens(text) <= 300
+    assert stats["prompt_tokens"] <= stats["token_budget"] == 300
+    assert 0 < stats["candidates"] < 50
+    assert len(text.splitlines()) == stats["candidates"] + 1
+    assert stats["tokens_saved"] == stats["baseline_tokens"] - stats["prompt_tokens"] > 0
+
+
+def test_catalog_baseline_is_skipped_by_default(monkeypatch, index):
+    queries = []
+    search_documents = index.search_documents
+    monkeypatch.setattr(index, "search_documents", lambda input: queries.append(input) or search_documents(input))
+
+    _, stats = retrieve_candidates({"buy_rent": "rent", "business_nature": "factory"}, index)
+
+    # Only the shortlist's offer-type query; no full-catalog read
+    assert queries == [{"offer_type": "rent"}]
+
+    assert "baseline_tokens" not in stats and "tokens_saved" not in stats
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from utility import llm_init  # noqa: E402  # pylint: disable=C0413
+from utility.llm_init import aload_llm, close_llm_clients, load_llm  # noqa: E402
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI chat-completions endpoint that records the client port per request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append({"port": self.client_address[1], "body": body})
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1,localhost")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(llm_init, "openai_api_key", "sk-test")
+    asyncio.run(close_llm_clients())
+    yield server
+    asyncio.run(close_llm_clients())
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_are_shared_per_model_and_settings(stub_server):
+    assert load_llm() is load_llm(model="gpt-4.1")
+    assert load_llm(max_tokens=64) is not load_llm()
+    assert load_llm(model="gpt-4.1-mini") is not load_llm()
+    assert load_llm(max_tokens=64).max_tokens == 64
+
+
+def test_sync_calls_reuse_one_connection(stub_server):
+    load_llm().invoke("hi")
+    load_llm().invoke("again")
+    # Different settings, same HTTP pool
+    load_llm(max_tokens=16).invoke("short")
+
+    assert len(stub_server.requests) == 3
+    assert len({request["port"] for request in stub_server.requests}) == 1
+    body = stub_server.requests[2]["body"]
+    assert body.get("max_completion_tokens", body.get("max_tokens")) == 16
+
+
+def test_async_calls_reuse_one_connection(stub_server):
+    async def run():
+        llm = await aload_llm()
+        assert llm is await aload_llm()
+        for _ in range(3):
+            await llm.ainvoke("hi")
+        # Pooled connections belong to this loop; close them before it ends
+        await close_llm_clients()
+
+    asyncio.run(run())
+
+    assert len(stub_server.requests) == 3
+    assert len({request["port"] for request in stub_server.requests}) == 1
+
+
+def test_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "12")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "5")
+    monkeypatch.setenv("LLM_MAX_TOKENS", "256")
+    monkeypatch.setenv("LLM_STREAM_USAGE", "false")
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+
+    assert llm_init.llm_settings(max_retries=1) == {
+        "timeout": 12.0,
+        "max_retries": 1,
+        "max_tokens": 256,
+        "stream_usage": False,
+    }
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.tools import listing_index, location_index, search_listing_database  # noqa: E402  # pylint: disable=C0413
+from agent.v2.tools.location_index import LocationIndex, LocationResolver, expand_aliases  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, install_collection, load_listing_catalog  # noqa: E402
+
+
+def _index():
+    index = LocationIndex()
+    index.add("hicom", {
+        "industrial_park_name": "Hicom Industrial Park",
+        "street_address": "Seksyen 26, Shah Alam",
+        "address_region": "Selangor",
+    })
+    index.add("pj", {"address_locality": "Petaling Jaya", "address_region": "Selangor"})
+    index.add("port", {"street_address": "Jalan Pelabuhan Utara, Pelabuhan Klang"})
+    index.add("mention", {"address_locality": "Klang", "description": "15 minutes from Shah Alam"})
+    return index
+
+
+def test_exact_phrase_ranks_by_field_weight():
+    ranked = _index().resolve("Shah Alam")
+    assert [key for key, _ in ranked] == ["hicom", "mention"]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_aliases_expand_to_canonical_place_names():
+    index = _index()
+    assert [key for key, _ in index.resolve("PJ")] == ["pj"]
+    assert "port" in index.candidates(["Port Klang"])
+    assert ["shah", "alam"] in expand_aliases("bandar shah alam")
+
+
+def test_typos_match_through_trigrams():
+    assert [key for key, _ in _index().resolve("Shah Alm")][0] == "hicom"
+    assert _index().resolve("Petalling Jaya")[0][0] == "pj"
+
+
+def test_remove_drops_postings():
+    index = _index()
+    index.remove("pj")
+    assert index.resolve("Petaling Jaya") == []
+    assert len(index) == 3
+
+
+def test_mongo_engine_resolves_locations_from_a_projected_index(monkeypatch, clock):
+    collection = install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    projections = []
+    find = collection.find
+
+    def recording_find(query=None, projection=None):
+        projections.append(projection)
+        return find(query, projection)
+
+    monkeypatch.setattr(collection, "find", recording_find)
+    resolver = LocationResolver(lambda: collection, refresh_interval=5, clock=clock)
+    monkeypatch.setattr(location_index, "_location_resolver", resolver)
+    monkeypatch.setattr(listing_index, "_listing_index", None)
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("LOCATION_MATCH", "index")
+
+    query = search_listing_database.build_listing_query({"location": ["Shah Alam"]})
+    before = search_listing_database.find_matching_listings({"location": ["Shah Alam"]}, query)
+
+    assert before and listing_index._listing_index is None
+    assert projections[0] == LocationResolver.projection
+    assert "images" not in next(iter(resolver._fields.values()))
+
+    collection.insert_one({
+        "property_id": "LP999999", "slug": "new-listing", "last_updated": "2099-01-01T00:00:00",
+        "location": {"industrial_park_name": "Shah Alam Premier Industrial Park"},
+    })
+    clock.now = 5.0
+    after = search_listing_database.find_matching_listings({"location": ["Shah Alam"]}, query)
+    assert "LP999999" in {d["property_id"] for d in after}
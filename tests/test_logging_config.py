@@ -0,0 +1,110 @@
+import io
+import json
+import logging
+import queue
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from utility import logging_config  # noqa: E402  # pylint: disable=C0413
+from utility.logging_config import (  # noqa: E402
+    DeferredQueueHandler,
+    Payload,
+    SamplingFilter,
+    configure_logging,
+    stop_logging,
+    truncate_payload,
+)
+
+
+@pytest.fixture
+def json_logs(monkeypatch):
+    """Reconfigure the pipeline onto a StringIO and restore the previous one afterwards."""
+
+    was_configured = logging_config._listener is not None
+    root = logging.getLogger()
+    previous_level = root.level
+    stop_logging()
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("LOG_LEVELS", "test.noisy=WARNING,test.verbose=DEBUG")
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0.25")
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+
+    def read():
+        stop_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield read
+    stop_logging()
+    for name in ("test.noisy", "test.verbose"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    root.setLevel(previous_level)
+    if was_configured:
+        configure_logging()
+
+
+def test_truncate_payload_bounds_large_values():
+    ids = [f"PL-{i}" for i in range(5000)]
+    bounded = truncate_payload({"ids": ids, "note": "x" * 2000}, max_chars=50, max_items=3)
+
+    assert bounded["ids"] == ["PL-0", "PL-1", "PL-2", "...(+4997 items)"]
+    assert bounded["note"].startswith("x" * 50) and bounded["note"].endswith("(+1950 chars)")
+    assert len(str(Payload(ids, max_chars=50, max_items=3))) < 80
+
+
+def test_sampling_filter_keeps_one_in_n_per_key():
+    sampler = SamplingFilter(0.1)
+    chunk = logging.makeLogRecord({"msg": "chunk", "sample": "stream_chunk"})
+    plain = logging.makeLogRecord({"msg": "request"})
+
+    kept = sum(sampler.filter(chunk) for _ in range(100))
+    assert kept == 10
+    assert all(sampler.filter(plain) for _ in range(5))
+    assert not SamplingFilter(0).filter(chunk)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(3):
+            logger.warning("event %d", i)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
+
+
+def test_json_pipeline_applies_levels_sampling_and_truncation(json_logs):
+    logging.getLogger("test.app").info("Preferences: %s", Payload({"ids": list(range(50))}), extra={"thread_id": "t-1"})
+    logging.getLogger("test.noisy").info("hidden")
+    logging.getLogger("test.noisy").warning("shown")
+    for i in range(8):
+        logging.getLogger("test.verbose").debug("chunk %d", i, extra={"sample": "chunk"})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test.app").exception("failed")
+
+    entries = json_logs()
+    messages = [entry["message"] for entry in entries]
+
+    assert messages[0].startswith('Preferences: {"ids": [0, 1, 2')
+    assert "(+40 items)" in messages[0]
+    assert entries[0]["thread_id"] == "t-1"
+    assert "hidden" not in messages and "shown" in messages
+    assert [m for m in messages if m.startswith("chunk")] == ["chunk 0", "chunk 4"]
+    assert entries[-1]["level"] == "ERROR"
+    assert entries[-1]["exception"].rstrip().endswith("ValueError: boom")
@@ -0,0 +1,106 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_then_answer,
+)
+from utility.metrics import OVERFLOW_LABEL, REGISTRY, Histogram  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    model = FakeChatModel(replies=[search_then_answer({"category": ["warehouse"]})])
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: model)
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    registry.clear_agent_registry()
+    REGISTRY.clear()
+    yield TestClient(index.app)
+    registry.clear_agent_registry()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="llm")
+
+    text = histogram.render()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{stage="llm",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{stage="llm",le="1"} 3' in text
+    assert 'test_seconds_bucket{stage="llm",le="+Inf"} 4' in text
+    assert 'test_seconds_count{stage="llm"} 4' in text
+
+
+def test_label_values_are_capped():
+    histogram = Histogram("capped_seconds", "Test.", ("tool",), max_label_values=2)
+    for tool in ("a", "b", "c", "d", "a"):
+        histogram.observe(0.01, tool=tool)
+
+    tools = {labels["tool"] for name, labels, _ in histogram.samples() if name.endswith("_count")}
+    assert tools == {"a", "b", OVERFLOW_LABEL}
+
+
+def test_invoke_reports_stages_in_header_metrics_and_debug_body(client):
+    plain = client.post("/api/v2/invoke", json={"message": "warehouse", "thread_id": "m-1"})
+    assert plain.status_code == 200
+    assert "timings" not in plain.json()
+
+    stages = {part.split(";")[0] for part in plain.headers["server-timing"].split(", ")}
+    assert {"checkpointer", "agent_build", "agent", "llm", "tool", "db_query", "serialize", "total"} <= stages
+
+    debug = client.post("/api/v2/invoke?debug_timings=1", json={"message": "more", "thread_id": "m-1"})
+    timings = debug.json()["timings"]
+    assert timings["stages"]["llm"]["count"] == 2
+    assert timings["stages"]["agent"]["ms"] <= timings["total_ms"]
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+    assert 'landy_request_duration_seconds_count{endpoint="/api/v2/invoke",method="POST",status="2xx"} 2' in body
+    assert 'stage="tool",model="",tool="search_listing_property_from_database"' in body
+    assert 'stage="db_query",model="",tool="search_listing_property_from_database"' in body
+    assert 'endpoint="/api/v2/invoke",stage="llm"' in body
+
+
+def test_unmatched_paths_share_one_label(client):
+    for path in ("/nope-1", "/nope-2"):
+        assert client.get(path).status_code == 404
+
+    assert 'endpoint="unmatched",method="GET",status="4xx"} 2' in client.get("/metrics").text
+
+
+def test_prompt_and_cached_tokens_are_counted_per_endpoint(client, monkeypatch):
+    usage = {"input_tokens": 1500, "output_tokens": 3, "total_tokens": 1503, "input_token_details": {"cache_read": 1280}}
+    model = FakeChatModel(replies=[AIMessage(content="Hello there.", usage_metadata=usage)])
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: model)
+    registry.clear_agent_registry()
+
+    body = client.post("/api/v2/invoke?debug_timings=1", json={"message": "hello", "thread_id": "c-1"}).json()
+    assert body["timings"]["prompt_tokens"] == {"input": 1500, "cached": 1280}
+
+    client.post("/api/v2/invoke/stream", json={"message": "hello", "thread_id": "c-2"})
+
+    text = client.get("/metrics").text
+    assert 'landy_llm_prompt_tokens_total{endpoint="/api/v2/invoke",prefix="none",kind="input"} 1500' in text
+    assert 'landy_llm_prompt_tokens_total{endpoint="/api/v2/invoke",prefix="none",kind="cached"} 1280' in text
+    assert 'endpoint="/api/v2/invoke/stream",stage="llm_first_token"' in text
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.tools.mongo_indexes import (  # noqa: E402
+    CONFLICT,
+    CREATED,
+    ERROR,
+    EXISTS,
+    LISTING_INDEXES,
+    IndexSpec,
+    check_query_plans,
+    ensure_indexes,
+    representative_queries,
+)
+from agent.v2.tools.search_listing_database import build_listing_query  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, load_listing_catalog  # noqa: E402
+
+
+@pytest.fixture
+def collection():
+    return InMemoryCollection(load_listing_catalog())
+
+
+def test_ensure_indexes_is_idempotent(collection):
+    first = ensure_indexes(collection)
+    second = ensure_indexes(collection)
+
+    assert set(first.values()) == {CREATED}
+    assert set(second.values()) == {EXISTS}
+    assert set(collection.index_information()) == {"_id_"} | {spec.name for spec in LISTING_INDEXES}
+
+
+def test_ensure_indexes_reports_conflicts_and_failures(collection):
+    collection.create_index([("tenure", -1)], name="tenure")
+    collection.insert_one({"property_id": "LP999999", "slug": collection.documents[0]["slug"]})
+
+    report = ensure_indexes(collection)
+
+    assert report["tenure"] == CONFLICT
+    assert report["slug_unique"] == ERROR
+    assert report["property_id_unique"] == CREATED
+
+
+def test_representative_queries_scan_the_collection_until_indexes_exist(collection):
+    before = check_query_plans(collection)
+    assert all(result["collscan"] for result in before)
+
+    ensure_indexes(collection)
+    after = check_query_plans(collection)
+
+    assert [r["name"] for r in after if r["collscan"]] == []
+    by_name = {r["name"]: r for r in after}
+    assert by_name["slug"]["indexes"] == ["slug_unique"]
+    assert by_name["search:category=warehouse"]["stages"][:2] == ["FETCH", "OR"]
+
+
+def test_regex_location_queries_are_flagged(collection):
+    ensure_indexes(collection, [IndexSpec("tenure", (("tenure", 1),))])
+    query = {"name": "regex", "filter": build_listing_query({"location": ["Klang"]})}
+
+    assert check_query_plans(collection, [query])[0]["collscan"]
+
+
+@pytest.mark.skipif(not os.getenv("MONGODB_TEST_URI"), reason="needs a disposable mongod in MONGODB_TEST_URI")
+def test_no_collscan_against_a_real_mongod():
+    from pymongo import MongoClient
+
+    client = MongoClient(os.environ["MONGODB_TEST_URI"], serverSelectionTimeoutMS=2000)
+    collection = client["landy_index_test"]["property_listing"]
+    collection.drop()
+    try:
+        collection.insert_many(load_listing_catalog())
+        ensure_indexes(collection)
+        assert set(ensure_indexes(collection).values()) == {EXISTS}
+
+        scans = [r["name"] for r in check_query_plans(collection, representative_queries()) if r["collscan"]]
+        assert scans == []
+    finally:
+        collection.drop()
+        client.close()
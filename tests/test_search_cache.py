@@ -0,0 +1,92 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2 import search_cache  # noqa: E402  # pylint: disable=C0413
+from agent.v2.search_cache import SearchResultCache, canonical_filter, catalog_version, filter_key  # noqa: E402
+from agent.v2.tools import search_listing_database  # noqa: E402
+from benchmarks.fixtures import InMemoryCollection, install_collection, load_listing_catalog  # noqa: E402
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    monkeypatch.setenv("LOCATION_MATCH", "regex")
+    return install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+
+
+@pytest.fixture
+def cache(monkeypatch, collection, clock):
+    cache = SearchResultCache(
+        version_getter=lambda: catalog_version(lambda: collection),
+        ttl=None,
+        revalidate_after=30.0,
+        clock=clock,
+    )
+    monkeypatch.setattr(search_cache, "_search_cache", cache)
+    return cache
+
+
+def _search(filters):
+    return json.loads(search_listing_database.search_listing_property_from_database.invoke({"input": filters}))
+
+
+def test_equivalent_filters_share_a_key(collection):
+    first = canonical_filter({"category": ["warehouse", "factory", "warehouse"], "location": ["Shah  Alam"]})
+    second = canonical_filter({"location": ["shah alam "], "category": ["factory", "warehouse"]})
+    assert first["category"] == ["factory", "warehouse"]
+    assert filter_key("search", first) == filter_key("search", second)
+    assert filter_key("search", {"max_price": 50000}) == filter_key("search", {"max_price": 50000.0})
+    assert filter_key("search", first) != filter_key("facets", first)
+
+
+def test_currency_is_upper_cased(collection):
+    assert canonical_filter({"currency": " myr"}) == {"currency": "MYR"}
+    assert _search({"currency": "myr"})["listing_count"] == _search({"currency": "MYR"})["listing_count"] > 0
+
+
+def test_repeated_search_is_served_from_cache(collection, cache):
+    first = _search({"category": ["warehouse", "factory"], "offer_type": "sale"})
+    second = _search({"offer_type": "sale", "category": ["factory", "warehouse"]})
+
+    assert first == second
+    assert collection.round_trips == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+def test_catalog_change_invalidates(collection, cache, clock):
+    _search({"offer_type": "rent"})
+    clock.now = 31.0
+    _search({"offer_type": "rent"})  # first version read clears anything cached before it
+    before = collection.round_trips
+
+    clock.now = 40.0
+    baseline = _search({"offer_type": "rent"})
+    assert collection.round_trips == before
+
+    target = next(d for d in collection.documents if d["offer"]["offer_type"] == "sale")
+    collection.update_one(
+        {"property_id": target["property_id"]},
+        {"$set": {"offer.offer_type": "rent", "last_updated": "2099-01-01T00:00:00"}},
+    )
+    clock.now = 62.0
+    refreshed = _search({"offer_type": "rent"})
+
+    assert refreshed["listing_count"] == baseline["listing_count"] + 1
+    assert cache.stats()["catalog_changes"] == 1
+
+
+def test_cache_can_be_disabled(monkeypatch, collection):
+    monkeypatch.setenv("SEARCH_CACHE_MAX_ENTRIES", "0")
+    _search({"offer_type": "rent"})
+    _search({"offer_type": "rent"})
+    assert search_cache.get_search_cache() is None
+    assert collection.round_trips == 2
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from agent.v2.tools import search_listing_database  # noqa: E402
+from agent.v2.utility import LISTING_PROJECTION  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_tool_call,
+)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    return collection
+
+
+def _client(monkeypatch, replies):
+    model = FakeChatModel(replies=replies)
+    monkeypatch.setattr(registry, "load_llm", lambda model_name="gpt-4.1", **kwargs: model)
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    registry.clear_agent_registry()
+    return TestClient(index.app)
+
+
+@pytest.mark.parametrize("filters, inline", [
+    ({"category": ["warehouse"]}, False),
+    ({"offer_type": "sale", "min_power_supply": 500}, True),
+])
+def test_search_turn_fetches_listings_once(monkeypatch, collection, filters, inline):
+    client = _client(monkeypatch, [search_tool_call(filters), "I'm seeing some properties."])
+
+    response = client.post("/api/v2/invoke", json={"message": "find me something", "thread_id": "t-1"})
+    body = response.json()
+
+    assert response.status_code == 200
+    assert collection.round_trips == 1
+    expected_ids = [d["property_id"] for d in collection.find(search_listing_database.build_listing_query(filters))]
+    assert [listing["id"] for listing in body["recommended_listings"]] == expected_ids
+    assert body["preferences"] == search_listing_database.build_listing_query(filters)
+    assert (len(expected_ids) <= 10) is inline
+
+
+def test_search_query_uses_listing_projection(collection):
+    search_listing_database.find_matching_listings({"offer_type": "rent"}, {"offer.offer_type": "rent"})
+    assert collection.round_trips == 1
+    documents = search_listing_database.find_matching_listings({}, {})
+    assert "source" not in documents[0] and "_id" not in documents[0]
+    assert set(documents[0]) <= set(LISTING_PROJECTION)
+
+
+@pytest.mark.parametrize("engine", ["mongo", "memory"])
+def test_async_tool_matches_sync(monkeypatch, collection, engine):
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", engine)
+    monkeypatch.setattr("agent.v2.tools.listing_index._listing_index", None)
+    tool = search_listing_database.search_listing_property_from_database
+    filters = {"offer_type": "sale", "location": ["Shah Alam"]}
+
+    assert asyncio.run(tool.ainvoke({"input": filters})) == tool.invoke({"input": filters})
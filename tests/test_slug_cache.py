@@ -0,0 +1,132 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from agent.v2.slug_cache import SlugPropertyCache  # noqa: E402  # pylint: disable=C0413
+from agent.v2.utility import render_listing_context  # noqa: E402
+from utility.cache import LRUTTLCache  # noqa: E402
+from utility.tokens import count_tokens  # noqa: E402
+
+
+class SlugCollection:
+    def __init__(self, documents):
+        self.documents = {doc["slug"]: doc for doc in documents}
+        self.full_fetches = 0
+        self.projected_fetches = 0
+
+    def find_one(self, query, projection=None):
+        doc = self.documents.get(query["slug"])
+        if projection is None:
+            self.full_fetches += 1
+            return dict(doc) if doc else None
+        self.projected_fetches += 1
+        return {"last_updated": doc["last_updated"]} if doc else None
+
+
+def test_lru_evicts_by_count_and_bytes(clock):
+    cache = LRUTTLCache(max_entries=2, max_bytes=10, clock=clock)
+    cache.set("a", 1, size=4)
+    cache.set("b", 2, size=4)
+    assert cache.get("a") == 1  # "b" is now least recently used
+
+    cache.set("c", 3, size=4)
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("d", 4, size=9)
+    assert len(cache) == 1
+    assert cache.get("d") == 4
+
+
+def test_lru_expires_entries_after_ttl(clock):
+    cache = LRUTTLCache(max_entries=4, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 6
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+
+
+def test_follow_up_turns_hit_the_cache(clock):
+    collection = SlugCollection([{"slug": "warehouse-a", "title": "A", "last_updated": "2025-01-01"}])
+    cache = SlugPropertyCache(lambda: collection, revalidate_after=30, clock=clock)
+
+    first = cache.get("warehouse-a")
+    second = cache.get("warehouse-a")
+
+    assert first is second
+    assert "title: A" in first.prompt
+    assert collection.full_fetches == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_last_updated_reloads_prompt(clock):
+    collection = SlugCollection([{"slug": "warehouse-a", "title": "Old", "last_updated": "2025-01-01"}])
+    cache = SlugPropertyCache(lambda: collection, revalidate_after=30, clock=clock)
+    cache.get("warehouse-a")
+
+    clock.now = 10
+    cache.get("warehouse-a")
+    assert collection.projected_fetches == 0
+
+    collection.documents["warehouse-a"].update(title="New", last_updated="2025-02-01")
+    clock.now = 40
+    entry = cache.get("warehouse-a")
+
+    assert "New" in entry.prompt
+    assert collection.projected_fetches == 1
+    assert collection.full_fetches == 2
+    assert cache.stats()["stale_reloads"] == 1
+
+
+def test_unknown_slug_is_not_cached_and_invalidate_all(clock):
+    collection = SlugCollection([{"slug": "a", "last_updated": 1}, {"slug": "b", "last_updated": 1}])
+    cache = SlugPropertyCache(lambda: collection, clock=clock)
+
+    assert cache.get("missing").document is None
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats()["entries"] == 2
+
+    assert cache.invalidate("a") == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_listing_context_drops_unused_fields_and_nulls():
+    document = {
+        "_id": "65f0c0ffee",
+        "slug": "warehouse-a",
+        "title": "Warehouse A",
+        "offer": {"offer_type": "sale", "price": 2500000.0, "price_currency": "MYR"},
+        "main_category": "warehouse",
+        "built_up_area": {"value": 20000, "unit": "sqft"},
+        "ceiling_height": None,
+        "images": ["https://cdn.example.com/a/0.jpg"],
+        "seo_title": "warehouse-a | Landy",
+        "location": {"address": {"street_address": "Jalan 1, Shah Alam", "address_locality": "Shah Alam"}},
+    }
+
+    context = render_listing_context(document)
+
+    assert context.splitlines()[:3] == ["title: Warehouse A", "offer: sale", "price: MYR 2,500,000"]
+    assert "built_size: 20,000 sqft" in context
+    assert "location: Jalan 1, Shah Alam" in context
+    for dropped in ("65f0c0ffee", "cdn.example.com", "Landy", "ceiling_height", "coordinates"):
+        assert dropped not in context
+
+
+def test_listing_context_fits_the_token_budget():
+    document = {"title": "Factory B", "main_category": "factory", "description": "Spacious. " * 500}
+
+    context = render_listing_context(document, max_tokens=60)
+
+    assert count_tokens(context) <= 60
+    assert context.startswith("title: Factory B\ncategory: factory\ndescription: Spacious.")
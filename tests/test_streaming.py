@@ -0,0 +1,97 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+import src.index as index  # noqa: E402  # pylint: disable=C0413
+from agent.v2 import registry  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    FakeChatModel,
+    InMemoryCollection,
+    install_collection,
+    load_listing_catalog,
+    search_then_answer,
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    install_collection(monkeypatch, InMemoryCollection(load_listing_catalog()))
+    monkeypatch.setenv("LISTING_SEARCH_ENGINE", "mongo")
+    model = FakeChatModel(replies=[search_then_answer({"offer_type": "sale", "min_power_supply": 500},
+                                                      "I'm seeing a few properties.")])
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: model)
+    checkpointer = InMemorySaver()
+    monkeypatch.setattr(index, "get_checkpointer", lambda: checkpointer)
+    monkeypatch.setattr("agent.v2.slug_cache._slug_cache", None)
+    registry.clear_agent_registry()
+    yield TestClient(index.app)
+    registry.clear_agent_registry()
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_search_stream_emits_events_in_order(client):
+    response = client.post("/api/v2/invoke/stream", json={"message": "factory to buy", "thread_id": "s-1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    kinds = [kind for kind, _ in events]
+
+    assert kinds[0] == "tool_start"
+    assert kinds.index("tool_result") < kinds.index("listings") < kinds.index("token")
+    assert kinds[-1] == "done"
+    assert "".join(data["delta"] for kind, data in events if kind == "token") == "I'm seeing a few properties."
+
+    tool_result = dict(events)["tool_result"]
+    done = events[-1][1]
+    assert done["graph_output"] == "I'm seeing a few properties."
+    assert done["listing_count"] == tool_result["listing_count"] == len(dict(events)["listings"]["recommended_listings"])
+    assert done["preferences"] == tool_result["preferences"]
+
+
+def test_slug_stream_supports_ndjson(client):
+    response = client.post(
+        "/api/v2/invoke/slug/stream?format=ndjson",
+        json={"message": "what is the ceiling height?", "slug": "warehouse-2", "thread_id": "s-2"},
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert lines[-1]["event"] == "done"
+    assert lines[-1]["thread_id"] == "s-2"
+
+
+def test_stream_rejects_empty_message(client):
+    assert client.post("/api/v2/invoke/stream", json={"message": ""}).status_code == 400
+
+
+def test_setup_failures_return_json_errors_before_the_stream_opens(client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("mongo unreachable")
+
+    monkeypatch.setattr(index, "get_search_agent", broken)
+    monkeypatch.setattr(index, "get_slug_cache", lambda: type("Cache", (), {"get": staticmethod(broken)})())
+
+    search = client.post("/api/v2/invoke/stream", json={"message": "warehouse", "thread_id": "e-1"})
+    slug = client.post("/api/v2/invoke/slug/stream", json={"message": "hi", "slug": "warehouse-2", "thread_id": "e-2"})
+
+    for response in (search, slug):
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Agent execution error: mongo unreachable"}
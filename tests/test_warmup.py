@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # pragma: no cover - defensive path injection
+    sys.path.insert(0, str(ROOT))
+
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from agent.v2 import registry  # noqa: E402  # pylint: disable=C0413
+from benchmarks.fixtures import FakeChatModel  # noqa: E402
+from utility import warmup  # noqa: E402
+from utility.warmup import FAILED, SKIPPED, warm_up  # noqa: E402
+
+
+def test_importing_the_app_defers_heavy_modules():
+    code = "import sys, src.index; print(sorted(m for m in ('langchain_openai', 'openai', 'agent.v1.orchestrator') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
+
+
+def test_warm_up_compiles_agents_and_skips_unconfigured_steps(monkeypatch):
+    monkeypatch.delenv("MONGODB_PW", raising=False)
+    monkeypatch.setattr("utility.llm_init.openai_api_key", "sk-test")
+    monkeypatch.setattr(registry, "load_llm", lambda **kwargs: FakeChatModel(replies=[]))
+    registry.clear_agent_registry()
+
+    report = warm_up(InMemorySaver())
+
+    assert isinstance(report["imports"], float) and isinstance(report["llm_client"], float)
+    assert report["mongo_connect"] == report["listing_indexes"] == report["listing_index"] == SKIPPED
+    assert report["location_index"] == SKIPPED
+    assert isinstance(report["agents"], float)
+    assert len(registry.registered_agents()) == 2
+    registry.clear_agent_registry()
+
+
+def test_failing_step_does_not_stop_the_rest(monkeypatch):
+    def broken():
+        raise RuntimeError("no network")
+
+    monkeypatch.setattr(warmup, "_llm_client", broken)
+    monkeypatch.setattr(warmup, "_import_deferred", lambda: None)
+
+    report = warm_up(None)
+
+    assert report["llm_client"] == FAILED
+    assert report["agents"] == SKIPPED
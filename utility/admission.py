@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from utility.env import env_float, env_int
+from utility.metrics import REGISTRY, Counter, Gauge, Histogram
+from utility.timing import record_stage
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "landy_admission_wait_seconds",
+    "Time a chat turn waited for its thread and for a global agent slot.",
+    ("queue", "outcome"),
+))
+
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "landy_admission_rejections_total",
+    "Chat turns turned away by admission control.",
+    ("reason",),
+))
+
+
+class AdmissionRejected(HTTPException):
+    """429 (thread busy) or 503 (server full) with a ``Retry-After`` header."""
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: float):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        self.reason = reason
+
+
+class _Gate:
+    """FIFO slots without a bound event loop; a release hands the slot to the oldest waiter."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def idle(self) -> bool:
+        return self.active == 0 and not self.waiters
+
+    def try_acquire(self) -> bool:
+        if self.active < self.capacity and not self.waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self, timeout: float) -> None:
+        if self.try_acquire():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the wait ended; pass it on
+                self.release()
+            else:
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class Ticket:
+    """Held while a turn runs; :meth:`release` is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", thread_key: Optional[str]):
+        self._controller = controller
+        self._thread_key = thread_key
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self._thread_key)
+
+
+class AdmissionController:
+    """Orders turns per thread and caps concurrent agent runs process-wide.
+
+    A turn first waits for earlier turns on its thread (at most
+    ``thread_max_queue`` may wait; more get 429), then for one of
+    ``max_concurrent`` global slots (at most ``max_queue`` may wait; more, or
+    a wait past ``queue_timeout``, get 503). Rejections carry Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        thread_max_queue: int = 2,
+        thread_timeout: float = 60.0,
+        retry_after: float = 2.0,
+    ):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.thread_max_queue = thread_max_queue
+        self.thread_timeout = thread_timeout
+        self.retry_after = retry_after
+        self._global = _Gate(max_concurrent)
+        self._threads: Dict[str, _Gate] = {}
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        logger.warning("Admission rejected (%s): %s", reason, detail)
+        return AdmissionRejected(status_code, reason, detail, self.retry_after)
+
+    async def _wait(self, gate: _Gate, queue: str, timeout: float) -> bool:
+        started = time.perf_counter()
+        outcome = "admitted"
+        try:
+            await gate.acquire(timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        waited = time.perf_counter() - started
+        ADMISSION_WAIT_SECONDS.observe(waited, queue=queue, outcome=outcome)
+        record_stage("admission", waited)
+        return outcome == "admitted"
+
+    async def acquire(self, thread_key: Optional[str] = None) -> Ticket:
+        """Wait for the thread and a global slot, or raise :class:`AdmissionRejected`."""
+
+        if thread_key is not None:
+            gate = self._threads.get(thread_key)
+            if gate is None:
+                gate = self._threads[thread_key] = _Gate(1)
+            if not gate.try_acquire():
+                if len(gate.waiters) >= self.thread_max_queue:
+                    raise self._reject(429, "thread_queue_full", f"Too many turns queued on thread {thread_key}")
+                if not await self._wait(gate, "thread", self.thread_timeout):
+                    self._forget_if_idle(thread_key)
+                    raise self._reject(429, "thread_timeout", f"Earlier turn on thread {thread_key} is still running")
+
+        try:
+            if not self._global.try_acquire():
+                if len(self._global.waiters) >= self.max_queue:
+                    raise self._reject(503, "queue_full", "Server is at capacity")
+                if not await self._wait(self._global, "global", self.queue_timeout):
+                    raise self._reject(503, "queue_timeout", "Server is at capacity")
+        except BaseException:
+            self._release_thread(thread_key)
+            raise
+        return Ticket(self, thread_key)
+
+    @asynccontextmanager
+    async def admit(self, thread_key: Optional[str] = None) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(thread_key)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _forget_if_idle(self, thread_key: str) -> None:
+        gate = self._threads.get(thread_key)
+        if gate is not None and gate.idle:
+            del self._threads[thread_key]
+
+    def _release_thread(self, thread_key: Optional[str]) -> None:
+        if thread_key is None:
+            return
+        gate = self._threads.get(thread_key)
+        if gate is not None:
+            gate.release()
+            self._forget_if_idle(thread_key)
+
+    def _release(self, thread_key: Optional[str]) -> None:
+        self._global.release()
+        self._release_thread(thread_key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self._global.active,
+            "queued": len(self._global.waiters),
+            "thread_queued": sum(len(gate.waiters) for gate in self._threads.values()),
+            "threads_active": len(self._threads),
+        }
+
+
+_admission: Optional[AdmissionController] = None
+
+
+def get_admission() -> AdmissionController:
+    """Process-wide controller from AGENT_MAX_CONCURRENT_RUNS / ADMISSION_* variables."""
+
+    global _admission
+
+    if _admission is None:
+        _admission = AdmissionController(
+            max_concurrent=env_int("AGENT_MAX_CONCURRENT_RUNS", 16),
+            max_queue=env_int("ADMISSION_MAX_QUEUE", 32),
+            queue_timeout=env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10.0),
+            thread_max_queue=env_int("ADMISSION_THREAD_MAX_QUEUE", 2),
+            thread_timeout=env_float("ADMISSION_THREAD_TIMEOUT_SECONDS", 60.0),
+            retry_after=env_float("ADMISSION_RETRY_AFTER_SECONDS", 2.0),
+        )
+    return _admission
+
+
+def reset_admission_for_tests() -> None:
+    global _admission
+    _admission = None
+
+
+def _queue_depths() -> Dict[Tuple[str, ...], float]:
+    stats = get_admission().stats()
+    return {("global",): stats["queued"], ("thread",): stats["thread_queued"]}
+
+
+REGISTRY.register(Gauge(
+    "landy_admission_queue_depth",
+    "Chat turns waiting, for a global agent slot or behind a turn on the same thread.",
+    ("queue",),
+    _queue_depths,
+))
+
+REGISTRY.register(Gauge(
+    "landy_agent_runs_in_flight",
+    "Agent runs holding a global slot.",
+    (),
+    lambda: {(): get_admission().stats()["in_flight"]},
+))
@@ -0,0 +1,343 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from utility.executor import run_sync
+
+logger = logging.getLogger(__name__)
+
+# Latest checkpoint of each namespace of an evicted thread
+Snapshot = Tuple[str, List[CheckpointTuple]]
+
+
+@dataclass
+class _ThreadUsage:
+    touched_at: float
+    bytes: int = 0
+    # ("blob", key) / ("checkpoint", ns, id) / ("write", outer, inner) -> serialized bytes
+    sizes: Dict[Tuple[Any, ...], int] = field(default_factory=dict)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """``InMemorySaver`` with a per-thread TTL and LRU eviction.
+
+    Threads are evicted least recently used first once there are more than
+    ``max_threads`` of them or their serialized checkpoints exceed
+    ``max_bytes``; threads idle for ``ttl`` seconds are dropped outright.
+    When ``spill_factory`` is given, a thread evicted for capacity while it
+    was touched within ``active_window`` seconds has its latest checkpoint
+    copied to that saver (e.g. Postgres) and is read back on its next turn.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 10_000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        spill_factory: Optional[Callable[[], BaseCheckpointSaver]] = None,
+        active_window: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        serde=None,
+    ):
+        if max_threads <= 0:
+            raise ValueError("max_threads must be positive")
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.active_window = active_window
+        self._spill_factory = spill_factory
+        self._spill: Optional[BaseCheckpointSaver] = None
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._threads: "OrderedDict[str, _ThreadUsage]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.spilled = 0
+        self.restored = 0
+        self.spill_errors = 0
+
+    # ----------------------------
+    # Bookkeeping
+    # ----------------------------
+
+    def _touch(self, thread_id: str) -> _ThreadUsage:
+        usage = self._threads.get(thread_id)
+        if usage is None:
+            usage = self._threads[thread_id] = _ThreadUsage(touched_at=self._clock())
+        else:
+            usage.touched_at = self._clock()
+            self._threads.move_to_end(thread_id)
+        return usage
+
+    def _account(self, usage: _ThreadUsage, key: Tuple[Any, ...], size: int) -> None:
+        delta = size - usage.sizes.get(key, 0)
+        usage.sizes[key] = size
+        usage.bytes += delta
+        self._bytes += delta
+
+    def _drop(self, thread_id: str) -> None:
+        usage = self._threads.pop(thread_id, None)
+        if usage is None:
+            return
+        # Exact keys instead of InMemorySaver.delete_thread, which scans every thread's entries
+        for key in usage.sizes:
+            if key[0] == "blob":
+                self.blobs.pop(key[1], None)
+            elif key[0] == "write":
+                self.writes.get(key[1], {}).pop(key[2], None)
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        self._bytes -= usage.bytes
+
+    def _snapshot(self, thread_id: str) -> List[CheckpointTuple]:
+        snapshot = []
+        for checkpoint_ns in list(self.storage.get(thread_id, {})):
+            saved = super().get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}})
+            if saved is not None:
+                snapshot.append(saved)
+        return snapshot
+
+    def _over_capacity(self) -> bool:
+        return len(self._threads) > self.max_threads or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        )
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        now = self._clock()
+        # Touch order is LRU order, so expired threads are always at the front
+        while self._threads:
+            thread_id, usage = next(iter(self._threads.items()))
+            if now - usage.touched_at <= self.ttl:
+                break
+            self._drop(thread_id)
+            self.expirations += 1
+
+    def _evict(self, keep: str) -> List[Snapshot]:
+        self._expire()
+        snapshots: List[Snapshot] = []
+        now = self._clock()
+        while self._over_capacity():
+            thread_id, usage = next(iter(self._threads.items()))
+            if thread_id == keep:
+                # The thread being written is the only one left; never evict it mid-turn
+                break
+            if self._spill_factory is not None and now - usage.touched_at <= self.active_window:
+                snapshots.append((thread_id, self._snapshot(thread_id)))
+            self._drop(thread_id)
+            self.evictions += 1
+        return snapshots
+
+    # ----------------------------
+    # Spill
+    # ----------------------------
+
+    def _spill_saver(self) -> BaseCheckpointSaver:
+        if self._spill is None:
+            self._spill = self._spill_factory()
+        return self._spill
+
+    def _spill_threads(self, snapshots: List[Snapshot]) -> None:
+        for thread_id, saved in snapshots:
+            try:
+                spill = self._spill_saver()
+                for item in saved:
+                    _copy_tuple(spill, item)
+                self.spilled += 1
+            except Exception:
+                self.spill_errors += 1
+                logger.exception(f"Failed to spill evicted checkpoint thread {thread_id}")
+
+    def _load_spilled(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        try:
+            return self._spill_saver().get_tuple(config)
+        except Exception:
+            self.spill_errors += 1
+            logger.exception("Failed to read spilled checkpoint thread")
+            return None
+
+    def _restore(self, saved: Optional[CheckpointTuple]) -> Tuple[Optional[CheckpointTuple], List[Snapshot]]:
+        if saved is None:
+            return None, []
+        thread_id = saved.config["configurable"]["thread_id"]
+        with self._lock:
+            if thread_id in self._threads:
+                return saved, []
+            put_config, writes_by_task = _unpack_tuple(saved)
+            checkpoint = saved.checkpoint
+            stored_config, snapshots = self._put(put_config, checkpoint, saved.metadata, checkpoint["channel_versions"])
+            for task_id, writes in writes_by_task.items():
+                snapshots += self._put_writes(stored_config, writes, task_id, "")
+            self.restored += 1
+            return saved, snapshots
+
+    # ----------------------------
+    # BaseCheckpointSaver
+    # ----------------------------
+
+    def _get_local(self, config: RunnableConfig) -> Tuple[bool, Optional[CheckpointTuple]]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+            if thread_id in self._threads:
+                self._touch(thread_id)
+                return True, super().get_tuple(config)
+        return False, None
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        found, saved = self._get_local(config)
+        if found or self._spill_factory is None:
+            return saved
+        saved, snapshots = self._restore(self._load_spilled(config))
+        self._spill_threads(snapshots)
+        return saved
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        found, saved = self._get_local(config)
+        if found or self._spill_factory is None:
+            return saved
+        saved, snapshots = self._restore(await run_sync(self._load_spilled, config))
+        if snapshots:
+            await run_sync(self._spill_threads, snapshots)
+        return saved
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any):
+        with self._lock:
+            thread_id = (config or {}).get("configurable", {}).get("thread_id")
+            if thread_id is not None and thread_id not in self._threads:
+                return iter(())
+            items = list(super().list(config, **kwargs))
+        return iter(items)
+
+    def _put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> Tuple[RunnableConfig, List[Snapshot]]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            usage = self._touch(thread_id)
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                self._account(usage, ("blob", key), len(self.blobs[key][1]))
+            stored, stored_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            self._account(usage, ("checkpoint", checkpoint_ns, checkpoint["id"]), len(stored[1]) + len(stored_metadata[1]))
+            return next_config, self._evict(keep=thread_id)
+
+    def put(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        next_config, snapshots = self._put(config, checkpoint, metadata, new_versions)
+        self._spill_threads(snapshots)
+        return next_config
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        next_config, snapshots = self._put(config, checkpoint, metadata, new_versions)
+        if snapshots:
+            await run_sync(self._spill_threads, snapshots)
+        return next_config
+
+    def _put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str,
+    ) -> List[Snapshot]:
+        thread_id = config["configurable"]["thread_id"]
+        outer = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            usage = self._touch(thread_id)
+            for inner, (_, _, value, _) in self.writes.get(outer, {}).items():
+                if inner[0] == task_id:
+                    self._account(usage, ("write", outer, inner), len(value[1]))
+            return self._evict(keep=thread_id)
+
+    def put_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self._spill_threads(self._put_writes(config, writes, task_id, task_path))
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        snapshots = self._put_writes(config, writes, task_id, task_path)
+        if snapshots:
+            await run_sync(self._spill_threads, snapshots)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(thread_id)
+        if self._spill_factory is not None:
+            self._spill_saver().delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await run_sync(self.delete_thread, thread_id)
+
+    # ----------------------------
+    # Introspection
+    # ----------------------------
+
+    # No __len__: LangGraph tests the checkpointer for truthiness
+    def __contains__(self, thread_id: Hashable) -> bool:
+        return thread_id in self._threads
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "bytes": self._bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spill_enabled": self._spill_factory is not None,
+                "spilled": self.spilled,
+                "restored": self.restored,
+                "spill_errors": self.spill_errors,
+            }
+
+
+def _unpack_tuple(saved: CheckpointTuple) -> Tuple[RunnableConfig, Dict[str, List[Tuple[str, Any]]]]:
+    configurable = saved.config["configurable"]
+    parent = (saved.parent_config or {}).get("configurable", {})
+    put_config: RunnableConfig = {"configurable": {
+        "thread_id": configurable["thread_id"],
+        "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+    }}
+    if parent.get("checkpoint_id"):
+        put_config["configurable"]["checkpoint_id"] = parent["checkpoint_id"]
+
+    writes_by_task: Dict[str, List[Tuple[str, Any]]] = {}
+    for task_id, channel, value in saved.pending_writes or []:
+        writes_by_task.setdefault(task_id, []).append((channel, value))
+    return put_config, writes_by_task
+
+
+def _copy_tuple(target: BaseCheckpointSaver, saved: CheckpointTuple) -> None:
+    """Write one checkpoint tuple and its pending writes into ``target``."""
+
+    put_config, writes_by_task = _unpack_tuple(saved)
+    checkpoint = saved.checkpoint
+    # Every channel is new to the target store
+    stored_config = target.put(put_config, checkpoint, saved.metadata, checkpoint["channel_versions"])
+    for task_id, writes in writes_by_task.items():
+        target.put_writes(stored_config, writes, task_id)
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from utility.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+# Threads holding more checkpoints than the retention limit
+SELECT_PRUNABLE_THREADS_SQL = """
+    SELECT thread_id
+    FROM checkpoints
+    GROUP BY thread_id, checkpoint_ns
+    HAVING count(*) > %(keep)s
+    LIMIT %(batch)s
+"""
+
+# Checkpoint ids are time-ordered (uuid6), so "newest" is the largest id.
+# Pending writes go with the checkpoints they belong to.
+DELETE_OLD_CHECKPOINTS_SQL = """
+    WITH old AS (
+        SELECT thread_id, checkpoint_ns, checkpoint_id
+        FROM (
+            SELECT thread_id, checkpoint_ns, checkpoint_id,
+                   row_number() OVER (
+                       PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                   ) AS rn
+            FROM checkpoints
+            WHERE thread_id = ANY(%(threads)s)
+        ) ranked
+        WHERE rn > %(keep)s
+    ), doomed AS (
+        DELETE FROM checkpoints c
+        USING old
+        WHERE c.thread_id = old.thread_id
+            AND c.checkpoint_ns = old.checkpoint_ns
+            AND c.checkpoint_id = old.checkpoint_id
+        RETURNING c.thread_id, c.checkpoint_ns, c.checkpoint_id
+    ), writes AS (
+        DELETE FROM checkpoint_writes w
+        USING doomed d
+        WHERE w.thread_id = d.thread_id
+            AND w.checkpoint_ns = d.checkpoint_ns
+            AND w.checkpoint_id = d.checkpoint_id
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM doomed) AS checkpoints, (SELECT count(*) FROM writes) AS writes
+"""
+
+# Channel values no remaining checkpoint points at. Only versions older than
+# the newest referenced one are touched: a turn in flight writes its blobs
+# before the checkpoint that references them.
+DELETE_ORPHAN_BLOBS_SQL = """
+    WITH live AS (
+        SELECT c.thread_id, c.checkpoint_ns, v.key AS channel, v.value AS version
+        FROM checkpoints c, jsonb_each_text(c.checkpoint -> 'channel_versions') v
+        WHERE c.thread_id = ANY(%(threads)s)
+    ), newest AS (
+        SELECT thread_id, checkpoint_ns, channel, max(version) AS version
+        FROM live
+        GROUP BY thread_id, checkpoint_ns, channel
+    )
+    DELETE FROM checkpoint_blobs b
+    USING newest n
+    WHERE b.thread_id = n.thread_id
+        AND b.checkpoint_ns = n.checkpoint_ns
+        AND b.channel = n.channel
+        AND b.version < n.version
+        AND NOT EXISTS (
+            SELECT 1 FROM live l
+            WHERE l.thread_id = b.thread_id
+                AND l.checkpoint_ns = b.checkpoint_ns
+                AND l.channel = b.channel
+                AND l.version = b.version
+        )
+"""
+
+# Stored bytes per thread across the three checkpoint tables
+THREAD_SIZES_SQL = """
+    WITH sizes AS (
+        SELECT thread_id, count(*) AS checkpoints,
+               sum(pg_column_size(checkpoint) + pg_column_size(metadata)) AS bytes
+        FROM checkpoints GROUP BY thread_id
+        UNION ALL
+        SELECT thread_id, 0, sum(coalesce(pg_column_size(blob), 0)) FROM checkpoint_blobs GROUP BY thread_id
+        UNION ALL
+        SELECT thread_id, 0, sum(pg_column_size(blob)) FROM checkpoint_writes GROUP BY thread_id
+    )
+    SELECT thread_id, sum(checkpoints)::int AS checkpoints, sum(bytes)::bigint AS bytes
+    FROM sizes
+    GROUP BY thread_id
+    ORDER BY bytes DESC
+    LIMIT %(limit)s
+"""
+
+
+async def prune_checkpoints(pool, keep_last: int, batch_size: int = 200) -> Dict[str, int]:
+    """Keep the newest ``keep_last`` checkpoints of every thread and drop the rest.
+
+    Runs batch by batch until no thread is over the limit; each batch is its
+    own transaction so concurrent turns are blocked only briefly.
+    """
+
+    totals = {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0}
+    if keep_last <= 0:
+        return totals
+
+    while True:
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(SELECT_PRUNABLE_THREADS_SQL, {"keep": keep_last, "batch": batch_size})
+                threads: List[str] = sorted({row["thread_id"] for row in await cur.fetchall()})
+            if not threads:
+                break
+
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    params = {"threads": threads, "keep": keep_last}
+                    await cur.execute(DELETE_OLD_CHECKPOINTS_SQL, params)
+                    deleted = await cur.fetchone()
+                    await cur.execute(DELETE_ORPHAN_BLOBS_SQL, params)
+                    blobs = cur.rowcount
+
+        totals["threads"] += len(threads)
+        totals["checkpoints"] += deleted["checkpoints"]
+        totals["writes"] += deleted["writes"]
+        totals["blobs"] += max(blobs, 0)
+        if len(threads) < batch_size:
+            break
+
+    return totals
+
+
+async def thread_sizes(pool, limit: int = 20) -> List[Dict[str, Any]]:
+    """Largest threads by stored bytes (checkpoints, blobs and writes)."""
+
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(THREAD_SIZES_SQL, {"limit": limit})
+            return [dict(row) for row in await cur.fetchall()]
+
+
+async def time_thread_loads(checkpointer, thread_ids: List[str]) -> List[float]:
+    """Milliseconds to load the latest checkpoint of each thread."""
+
+    samples = []
+    for thread_id in thread_ids:
+        start = time.perf_counter()
+        await checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def prune_forever(pool, keep_last: Optional[int] = None, interval: Optional[float] = None) -> None:
+    """Background job started by the app lifespan; cancel it to stop."""
+
+    keep_last = keep_last if keep_last is not None else env_int("CHECKPOINT_KEEP_LAST", 20)
+    interval = interval if interval is not None else env_float("CHECKPOINT_PRUNE_INTERVAL_SECONDS", 600.0)
+    batch_size = env_int("CHECKPOINT_PRUNE_BATCH", 200)
+
+    while True:
+        try:
+            totals = await prune_checkpoints(pool, keep_last, batch_size)
+            if totals["checkpoints"]:
+                logger.info(f"Pruned checkpoints (keep_last={keep_last}): {totals}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"Checkpoint pruning failed: {exc}")
+        await asyncio.sleep(interval)
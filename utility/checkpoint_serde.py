@@ -0,0 +1,68 @@
+import sys
+import threading
+from typing import Any, Optional, Tuple
+
+import zstandard
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from utility.env import env_bool, env_int
+
+# Appended to the inner type tag ("msgpack" -> "msgpack+zstd") so rows written
+# before compression was enabled still load through the plain serializer
+ZSTD_SUFFIX = "+zstd"
+
+
+class CompressedSerializer(SerializerProtocol):
+    """LangGraph serializer that zstd-compresses large msgpack payloads.
+
+    Values are encoded by ``JsonPlusSerializer`` (ormsgpack) as before; any
+    payload of at least ``min_size`` bytes is compressed and tagged with
+    ``+zstd``. Untagged types are passed to the inner serializer unchanged,
+    so existing checkpoints remain readable.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[SerializerProtocol] = None,
+        level: int = 3,
+        min_size: int = 256,
+    ):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self.min_size = min_size
+        # zstd contexts must not be shared between threads
+        self._local = threading.local()
+
+    def _contexts(self) -> Tuple[zstandard.ZstdCompressor, zstandard.ZstdDecompressor]:
+        contexts = getattr(self._local, "contexts", None)
+        if contexts is None:
+            contexts = (zstandard.ZstdCompressor(level=self.level), zstandard.ZstdDecompressor())
+            self._local.contexts = contexts
+        return contexts
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        return f"{type_}{ZSTD_SUFFIX}", self._contexts()[0].compress(data)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(ZSTD_SUFFIX):
+            type_ = type_[:-len(ZSTD_SUFFIX)]
+            payload = self._contexts()[1].decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+def build_serde() -> CompressedSerializer:
+    """Serializer for the Postgres checkpointers.
+
+    With CHECKPOINT_COMPRESSION off nothing new is compressed, but rows an
+    earlier deployment compressed still load.
+    """
+
+    min_size = env_int("CHECKPOINT_COMPRESSION_MIN_BYTES", 256)
+    if not env_bool("CHECKPOINT_COMPRESSION", True):
+        min_size = sys.maxsize
+    return CompressedSerializer(level=env_int("CHECKPOINT_COMPRESSION_LEVEL", 3), min_size=min_size)
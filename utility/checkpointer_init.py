@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import threading
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from utility.checkpoint_pruning import prune_checkpoints, prune_forever, thread_sizes, time_thread_loads
+from utility.checkpoint_serde import build_serde
+from utility.env import env_bool, env_float, env_int, env_str
+from utility.timing import stage_span
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[AsyncConnectionPool] = None
+_checkpointer: Optional[AsyncPostgresSaver] = None
+_sync_pool: Optional[ConnectionPool] = None
+_sync_checkpointer: Optional[PostgresSaver] = None
+_prune_task: Optional[asyncio.Task] = None
+_sync_lock = threading.Lock()
+
+# Connection settings required by the LangGraph Postgres checkpointer.
+_CONNECTION_KWARGS = {
+    "autocommit": True,
+    "prepare_threshold": 0,
+    "row_factory": dict_row,
+}
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Pool sizing read from the environment (CHECKPOINT_POOL_*)."""
+
+    return {
+        "min_size": env_int("CHECKPOINT_POOL_MIN_SIZE", 1),
+        "max_size": env_int("CHECKPOINT_POOL_MAX_SIZE", 10),
+        "timeout": env_float("CHECKPOINT_POOL_TIMEOUT", 10.0),
+        "max_idle": env_float("CHECKPOINT_POOL_MAX_IDLE", 300.0),
+        "max_lifetime": env_float("CHECKPOINT_POOL_MAX_LIFETIME", 1800.0),
+        "health_check": env_bool("CHECKPOINT_POOL_HEALTH_CHECK", True),
+    }
+
+
+def _build_pool(db_uri: str, settings: Dict[str, Any]) -> AsyncConnectionPool:
+    return AsyncConnectionPool(
+        conninfo=db_uri,
+        min_size=settings["min_size"],
+        max_size=settings["max_size"],
+        timeout=settings["timeout"],
+        max_idle=settings["max_idle"],
+        max_lifetime=settings["max_lifetime"],
+        check=AsyncConnectionPool.check_connection if settings["health_check"] else None,
+        kwargs=dict(_CONNECTION_KWARGS),
+        name="landy-checkpointer",
+        open=False,
+    )
+
+
+async def open_checkpointer(
+    db_uri: Optional[str] = None,
+    run_setup: Optional[bool] = None,
+) -> AsyncPostgresSaver:
+    """Open the process-wide connection pool and checkpointer (idempotent)."""
+
+    global _pool, _checkpointer
+
+    if _checkpointer is not None:
+        return _checkpointer
+
+    db_uri = db_uri or env_str("DB_URI")
+    if not db_uri:
+        raise RuntimeError("DB_URI environment variable not set. Cannot open checkpointer.")
+
+    if run_setup is None:
+        run_setup = env_bool("CHECKPOINT_SETUP_ON_STARTUP", True)
+
+    settings = get_pool_settings()
+    pool = _build_pool(db_uri, settings)
+    try:
+        with stage_span("checkpointer_connect"):
+            await pool.open(wait=True, timeout=settings["timeout"])
+
+        checkpointer = AsyncPostgresSaver(pool, serde=build_serde())
+        if run_setup:
+            with stage_span("checkpointer_setup"):
+                await checkpointer.setup()
+            logger.info("Checkpointer schema migration completed.")
+    except BaseException:
+        # Otherwise the pool's workers keep reconnecting for the life of the process
+        await pool.close()
+        raise
+
+    logger.info(
+        "Checkpointer pool opened (min_size=%s, max_size=%s).",
+        settings["min_size"],
+        settings["max_size"],
+    )
+    _pool = pool
+    _checkpointer = checkpointer
+    return _checkpointer
+
+
+def start_checkpoint_pruning() -> Optional[asyncio.Task]:
+    """Start the background job keeping CHECKPOINT_KEEP_LAST checkpoints per thread.
+
+    Must run on the event loop after :func:`open_checkpointer`; a limit of
+    0 keeps every checkpoint.
+    """
+
+    global _prune_task
+
+    if _pool is None or _prune_task is not None or env_int("CHECKPOINT_KEEP_LAST", 20) <= 0:
+        return _prune_task
+    _prune_task = asyncio.get_running_loop().create_task(prune_forever(_pool), name="checkpoint-pruning")
+    return _prune_task
+
+
+async def close_checkpointer() -> None:
+    """Close the pool opened by :func:`open_checkpointer`."""
+
+    global _pool, _checkpointer, _prune_task
+
+    task = _prune_task
+    _prune_task = None
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    pool = _pool
+    _pool = None
+    _checkpointer = None
+    if pool is not None:
+        await pool.close()
+        logger.info("Checkpointer pool closed.")
+
+
+def get_checkpointer() -> AsyncPostgresSaver:
+    if _checkpointer is None:
+        raise RuntimeError("Checkpointer is not initialised. Was the app lifespan started?")
+    return _checkpointer
+
+
+def get_sync_checkpointer(db_uri: Optional[str] = None) -> PostgresSaver:
+    """Blocking Postgres saver for code that cannot await (v1 checkpoint spill).
+
+    Opened lazily on first use with the same CHECKPOINT_POOL_* sizing; callers
+    on the event loop should reach it through the blocking pool.
+    """
+
+    if _sync_checkpointer is not None:
+        return _sync_checkpointer
+
+    with _sync_lock:
+        if _sync_checkpointer is None:
+            _open_sync_checkpointer(db_uri)
+    return _sync_checkpointer
+
+
+def _open_sync_checkpointer(db_uri: Optional[str]) -> None:
+    global _sync_pool, _sync_checkpointer
+
+    db_uri = db_uri or env_str("DB_URI")
+    if not db_uri:
+        raise RuntimeError("DB_URI environment variable not set. Cannot open checkpointer.")
+
+    settings = get_pool_settings()
+    pool = ConnectionPool(
+        conninfo=db_uri,
+        min_size=settings["min_size"],
+        max_size=settings["max_size"],
+        timeout=settings["timeout"],
+        max_idle=settings["max_idle"],
+        max_lifetime=settings["max_lifetime"],
+        check=ConnectionPool.check_connection if settings["health_check"] else None,
+        kwargs=dict(_CONNECTION_KWARGS),
+        name="landy-checkpointer-sync",
+        open=False,
+    )
+    try:
+        with stage_span("checkpointer_connect"):
+            pool.open(wait=True, timeout=settings["timeout"])
+
+        checkpointer = PostgresSaver(pool, serde=build_serde())
+        if env_bool("CHECKPOINT_SETUP_ON_STARTUP", True):
+            with stage_span("checkpointer_setup"):
+                checkpointer.setup()
+    except BaseException:
+        # Otherwise the pool's workers keep reconnecting, one more pool per call
+        pool.close()
+        raise
+
+    _sync_pool = pool
+    _sync_checkpointer = checkpointer
+
+
+def close_sync_checkpointer() -> None:
+    global _sync_pool, _sync_checkpointer
+
+    with _sync_lock:
+        pool = _sync_pool
+        _sync_pool = None
+        _sync_checkpointer = None
+    if pool is not None:
+        pool.close()
+        logger.info("Sync checkpointer pool closed.")
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Summarise pool usage so it can be sized under load."""
+
+    if _pool is None:
+        return {"status": "closed"}
+
+    raw = _pool.get_stats()
+    pool_size = raw.get("pool_size", 0)
+    available = raw.get("pool_available", 0)
+    requests_num = raw.get("requests_num", 0)
+    requests_queued = raw.get("requests_queued", 0)
+    requests_wait_ms = raw.get("requests_wait_ms", 0)
+
+    return {
+        "status": "open",
+        "min_size": raw.get("pool_min", 0),
+        "max_size": raw.get("pool_max", 0),
+        "size": pool_size,
+        "available": available,
+        "in_use": max(pool_size - available, 0),
+        "waiting": raw.get("requests_waiting", 0),
+        "requests": requests_num,
+        "requests_queued": requests_queued,
+        "requests_errors": raw.get("requests_errors", 0),
+        "avg_acquire_ms": round(requests_wait_ms / requests_num, 3) if requests_num else 0.0,
+        "avg_queued_wait_ms": round(requests_wait_ms / requests_queued, 3) if requests_queued else 0.0,
+        "connection_errors": raw.get("connections_errors", 0),
+    }
+
+
+def reset_checkpointer_for_tests() -> None:
+    """Drop cached pool/checkpointer references (testing helper)."""
+
+    global _pool, _checkpointer, _sync_pool, _sync_checkpointer, _prune_task
+    _pool = None
+    _prune_task = None
+    _checkpointer = None
+    _sync_pool = None
+    _sync_checkpointer = None
+
+
+async def _run_setup(db_uri: Optional[str]) -> None:
+    await open_checkpointer(db_uri=db_uri, run_setup=True)
+    await close_checkpointer()
+
+
+async def _run_prune(db_uri: Optional[str], keep_last: int) -> None:
+    await open_checkpointer(db_uri=db_uri, run_setup=False)
+    try:
+        totals = await prune_checkpoints(_pool, keep_last, env_int("CHECKPOINT_PRUNE_BATCH", 200))
+        print(json.dumps(totals))
+    finally:
+        await close_checkpointer()
+
+
+async def _run_measure(db_uri: Optional[str], limit: int) -> None:
+    """Bytes per thread and latest-checkpoint load latency for the largest threads."""
+
+    checkpointer = await open_checkpointer(db_uri=db_uri, run_setup=False)
+    try:
+        sizes = await thread_sizes(_pool, limit)
+        samples = await time_thread_loads(checkpointer, [row["thread_id"] for row in sizes])
+        for row, ms in zip(sizes, samples):
+            row["load_ms"] = round(ms, 2)
+        summary = {
+            "threads": len(sizes),
+            "mean_bytes": round(statistics.mean(r["bytes"] for r in sizes)) if sizes else 0,
+            "median_load_ms": round(statistics.median(samples), 2) if samples else 0.0,
+            "largest": sizes,
+        }
+        print(json.dumps(summary, indent=2, default=str))
+    finally:
+        await close_checkpointer()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Landy checkpointer maintenance")
+    parser.add_argument(
+        "command",
+        choices=["setup", "prune", "measure"],
+        help="setup: run checkpoint schema migrations; prune: drop superseded checkpoints once; "
+             "measure: report bytes per thread and load latency",
+    )
+    parser.add_argument("--db-uri", default=None, help="Postgres URI (defaults to DB_URI)")
+    parser.add_argument("--keep-last", type=int, default=None, help="prune: checkpoints kept per thread")
+    parser.add_argument("--limit", type=int, default=20, help="measure: number of largest threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "setup":
+        asyncio.run(_run_setup(args.db_uri))
+    elif args.command == "prune":
+        keep_last = args.keep_last if args.keep_last is not None else env_int("CHECKPOINT_KEEP_LAST", 20)
+        asyncio.run(_run_prune(args.db_uri, keep_last))
+    else:
+        asyncio.run(_run_measure(args.db_uri, args.limit))
+
+
+if __name__ == "__main__":
+    main()
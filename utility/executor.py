@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from utility.env import env_int
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Bounded pool for blocking I/O (pymongo, index refreshes) off the event loop."""
+
+    global _executor
+
+    if _executor is None:
+        workers = env_int("BLOCKING_POOL_SIZE", 16)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="landy-blocking")
+        logger.info(f"Blocking thread pool started with {workers} workers")
+    return _executor
+
+
+async def run_sync(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn`` in the blocking pool, keeping the caller's context variables."""
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_blocking_executor(), call)
+
+
+def shutdown_blocking_executor() -> None:
+    global _executor
+
+    executor = _executor
+    _executor = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,25 +1,118 @@
 import os
-from langchain_openai import ChatOpenAI
+import threading
+from typing import Any, Dict, Optional, Tuple
+
 from dotenv import load_dotenv
-import os
+
+from utility.env import env_bool, env_float, env_int, env_str
+from utility.executor import run_sync
 
 load_dotenv()
 
 openai_api_key = os.getenv("OPENAI_API_KEY", "").strip()
 
-def load_llm(model = 'gpt-4.1'):
-    llm = ChatOpenAI(
-        model=model,
-        api_key=openai_api_key
-        # stream_usage=True,
-        # temperature=None,
-        # max_tokens=None,
-        # timeout=None,
-        # reasoning_effort="low",
-        # max_retries=2,
-        # api_key="...",  # If you prefer to pass api key in directly
-        # base_url="...",
-        # organization="...",
-        # other params...
-    )
-    return llm
\ No newline at end of file
+# (model, settings) -> ChatOpenAI; every client shares the HTTP pools below
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_http_clients: Optional[Tuple[Any, Any]] = None
+_lock = threading.Lock()
+
+
+def llm_settings(**overrides: Any) -> Dict[str, Any]:
+    """ChatOpenAI keyword arguments from LLM_* variables, with ``overrides`` on top."""
+
+    max_tokens = env_int("LLM_MAX_TOKENS", 0)
+    settings = {
+        "timeout": env_float("LLM_TIMEOUT_SECONDS", 60.0),
+        "max_retries": env_int("LLM_MAX_RETRIES", 2),
+        "max_tokens": max_tokens or None,
+        "stream_usage": env_bool("LLM_STREAM_USAGE", True),
+    }
+    base_url = env_str("OPENAI_BASE_URL")
+    if base_url:
+        settings["base_url"] = base_url
+    settings.update(overrides)
+    return settings
+
+
+def get_http_clients() -> Tuple[Any, Any]:
+    """Process-wide (sync, async) httpx clients with a tuned keep-alive pool."""
+
+    global _http_clients
+
+    if _http_clients is None:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=env_int("LLM_MAX_CONNECTIONS", 50),
+            max_keepalive_connections=env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 20),
+            keepalive_expiry=env_float("LLM_KEEPALIVE_SECONDS", 30.0),
+        )
+        timeout = httpx.Timeout(
+            env_float("LLM_TIMEOUT_SECONDS", 60.0),
+            connect=env_float("LLM_CONNECT_TIMEOUT_SECONDS", 5.0),
+        )
+        _http_clients = (
+            httpx.Client(limits=limits, timeout=timeout),
+            httpx.AsyncClient(limits=limits, timeout=timeout),
+        )
+    return _http_clients
+
+
+def _registry_key(model: str, settings: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (model, openai_api_key, tuple(sorted((name, repr(value)) for name, value in settings.items())))
+
+
+def load_llm(model = 'gpt-4.1', **overrides):
+    """Shared ChatOpenAI for ``model`` and settings; built once per process.
+
+    ``overrides`` are ChatOpenAI keyword arguments (``max_tokens``,
+    ``temperature``, ``base_url``...) and become part of the registry key.
+    """
+
+    settings = llm_settings(**overrides)
+    key = _registry_key(model, settings)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Deferred: the openai SDK is the largest import and only model calls need it
+            from langchain_openai import ChatOpenAI
+
+            http_client, http_async_client = get_http_clients()
+            client = ChatOpenAI(
+                model=model,
+                api_key=openai_api_key,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **settings,
+            )
+            _clients[key] = client
+    return client
+
+
+async def aload_llm(model = 'gpt-4.1', **overrides):
+    """Async twin of :func:`load_llm`; a first-time build runs in the blocking pool."""
+
+    client = _clients.get(_registry_key(model, llm_settings(**overrides)))
+    if client is not None:
+        return client
+    return await run_sync(load_llm, model, **overrides)
+
+
+async def close_llm_clients() -> None:
+    """Close the shared HTTP pools and forget every client (shutdown / tests)."""
+
+    global _http_clients
+
+    with _lock:
+        http_clients = _http_clients
+        _http_clients = None
+        _clients.clear()
+    if http_clients is not None:
+        http_client, http_async_client = http_clients
+        http_client.close()
+        await http_async_client.aclose()
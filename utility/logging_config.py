@@ -0,0 +1,201 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from utility.env import env_float, env_int, env_str
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+def truncate_payload(value: Any, max_chars: int = 500, max_items: int = 10, _depth: int = 0) -> Any:
+    """A bounded copy of ``value``: long lists/dicts/strings are cut, not fully rendered.
+
+    Work is proportional to the limits, not to the payload, so a list of
+    thousands of property IDs costs the same as one of ten.
+    """
+
+    if _depth > 4:
+        return "..."
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, dict):
+        items = list(value.items())[:max_items]
+        out = {str(k): truncate_payload(v, max_chars, max_items, _depth + 1) for k, v in items}
+        if len(value) > max_items:
+            out["..."] = f"+{len(value) - max_items} keys"
+        return out
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)[:max_items] if not isinstance(value, (list, tuple)) else value[:max_items]
+        out = [truncate_payload(v, max_chars, max_items, _depth + 1) for v in items]
+        if len(value) > max_items:
+            out.append(f"...(+{len(value) - max_items} items)")
+        return out
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return truncate_payload(str(value), max_chars, max_items, _depth + 1)
+
+
+class Payload:
+    """Log argument that is truncated and rendered only if the record is emitted.
+
+    ``logger.info("Preferences: %s", Payload(preferences))``
+    """
+
+    __slots__ = ("value", "max_chars", "max_items")
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None, max_items: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars if max_chars is not None else env_int("LOG_MAX_PAYLOAD_CHARS", 500)
+        self.max_items = max_items if max_items is not None else env_int("LOG_MAX_PAYLOAD_ITEMS", 10)
+
+    def __str__(self) -> str:
+        bounded = truncate_payload(self.value, self.max_chars, self.max_items)
+        return bounded if isinstance(bounded, str) else json.dumps(bounded, default=str)
+
+    __repr__ = __str__
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps one in ``1 / rate`` records per ``sample`` key; other records pass.
+
+    Mark repetitive events with ``extra={"sample": "<key>"}``.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % max(1, round(1 / self.rate)) == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, extras, exception."""
+
+    def __init__(self, max_traceback_chars: int = 4000):
+        super().__init__()
+        self.max_traceback_chars = max_traceback_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = truncate_payload(value)
+        if record.exc_info:
+            text = self.formatException(record.exc_info)
+            # Keep the end of the traceback, where the error is
+            if len(text) > self.max_traceback_chars:
+                text = "..." + text[-self.max_traceback_chars:]
+            entry["exception"] = text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The caller pays only for merging ``msg % args`` (cheap with ``Payload``
+    arguments); exception and JSON formatting happen on the listener.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        prepared = logging.makeLogRecord(vars(record))
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # A full queue means the writer is behind; drop rather than block the request
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for part in (spec or "").split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(stream=None) -> logging.handlers.QueueListener:
+    """Route all logging through a queue to one background writer (idempotent).
+
+    LOG_LEVEL sets the root level, LOG_LEVELS per-logger levels
+    (``"src.index=DEBUG,httpx=WARNING"``), LOG_FORMAT ``json`` or ``text``,
+    LOG_SAMPLE_RATE the share of ``sample``-tagged records kept.
+    """
+
+    global _listener, _queue_handler
+
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        if env_str("LOG_FORMAT", "json") == "text":
+            formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        else:
+            formatter = JsonFormatter(max_traceback_chars=env_int("LOG_MAX_TRACEBACK_CHARS", 4000))
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(formatter)
+
+        records: queue.Queue = queue.Queue(maxsize=env_int("LOG_QUEUE_SIZE", 10000))
+        handler = DeferredQueueHandler(records)
+        handler.addFilter(SamplingFilter(env_float("LOG_SAMPLE_RATE", 0.05)))
+
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel((env_str("LOG_LEVEL", "INFO") or "INFO").upper())
+        for name, level in _parse_levels(env_str("LOG_LEVELS", "") or "").items():
+            logging.getLogger(name).setLevel(level)
+
+        listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        listener.start()
+        _listener = listener
+        _queue_handler = handler
+        atexit.register(stop_logging)
+        return listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+
+    global _listener, _queue_handler
+
+    with _lock:
+        listener, handler = _listener, _queue_handler
+        _listener = _queue_handler = None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
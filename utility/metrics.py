@@ -0,0 +1,218 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utility.env import env_int
+
+# Seconds; LLM calls dominate the upper range
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Label value used once a label has seen its maximum number of distinct values
+OVERFLOW_LABEL = "other"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Prometheus-style histogram with a cap on distinct values per label.
+
+    Free-form labels (model, tool) accept their first ``max_label_values``
+    values; anything after that is reported as ``other`` so a misbehaving
+    caller cannot create unbounded series.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_label_values: Optional[int] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.max_label_values = max_label_values if max_label_values is not None else env_int("METRICS_MAX_LABEL_VALUES", 32)
+        self._seen: Dict[str, set] = {label: set() for label in self.labelnames}
+        # labels -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def _bounded(self, label: str, value: str) -> str:
+        seen = self._seen[label]
+        if value in seen:
+            return value
+        if len(seen) >= self.max_label_values:
+            return OVERFLOW_LABEL
+        seen.add(value)
+        return value
+
+    def observe(self, value: float, **labels: str) -> None:
+        with self._lock:
+            key = tuple(self._bounded(name, str(labels.get(name, ""))) for name in self.labelnames)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in sorted(self._series.items())]
+
+        samples = []
+        for key, counts, total, count in snapshot:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def render(self) -> str:
+        return _render(self, "histogram")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            for seen in self._seen.values():
+                seen.clear()
+
+
+class Counter:
+    """Monotonic counter with the same label cap as :class:`Histogram`."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], max_label_values: Optional[int] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_label_values = max_label_values if max_label_values is not None else env_int("METRICS_MAX_LABEL_VALUES", 32)
+        self._seen: Dict[str, set] = {label: set() for label in self.labelnames}
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    _bounded = Histogram._bounded
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            key = tuple(self._bounded(name, str(labels.get(name, ""))) for name in self.labelnames)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in snapshot]
+
+    def render(self) -> str:
+        return _render(self, "counter")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            for seen in self._seen.values():
+                seen.clear()
+
+
+class Gauge:
+    """Gauge read from ``collect`` at scrape time: ``{label values tuple: value}``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in sorted(self.collect().items())]
+
+    def render(self) -> str:
+        return _render(self, "gauge")
+
+    def clear(self) -> None:
+        # Values belong to whatever ``collect`` reads
+        pass
+
+
+def _render(metric, kind: str) -> str:
+    lines = [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {kind}"]
+    for name, labels, value in metric.samples():
+        rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        series = f"{name}{{{rendered}}}" if rendered else name
+        lines.append(f"{series} {_format_value(value)}")
+    return "\n".join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "landy_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("endpoint", "method", "status"),
+))
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "landy_stage_duration_seconds",
+    "Time spent per request stage (checkpointer, agent build, LLM, tool, DB query, serialization).",
+    ("endpoint", "stage", "model", "tool"),
+))
+
+PROMPT_TOKENS = REGISTRY.register(Counter(
+    "landy_llm_prompt_tokens_total",
+    "Prompt tokens sent to the model (kind=input) and the part served from the provider's prompt cache (kind=cached).",
+    ("endpoint", "prefix", "kind"),
+))
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every registered metric."""
+
+    return REGISTRY.render()
@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
+from utility.executor import run_sync
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -62,4 +64,31 @@ def get_property_listing_collections():
     client = _ensure_client()
     db = client["property"]
     collection = db["property_listing"]
-    return collection
\ No newline at end of file
+    return collection
+
+class AsyncCollection:
+    """Awaitable facade over a pymongo collection.
+
+    pymongo 3.x has no asyncio driver, so each call runs in the bounded
+    blocking pool (the same model Motor uses) and never stalls the event loop.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    async def find(self, query=None, projection=None):
+        return await run_sync(lambda: list(self._collection.find(query or {}, projection)))
+
+    async def find_one(self, query=None, projection=None):
+        return await run_sync(self._collection.find_one, query or {}, projection)
+
+    async def count_documents(self, query):
+        return await run_sync(self._collection.count_documents, query)
+
+    async def aggregate(self, pipeline):
+        return await run_sync(lambda: list(self._collection.aggregate(pipeline)))
+
+
+async def get_async_property_listing_collections() -> AsyncCollection:
+    # The first call connects and pings, so it also runs off the event loop
+    return AsyncCollection(await run_sync(get_property_listing_collections))
@@ -0,0 +1,249 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utility.metrics import PROMPT_TOKENS, REQUEST_SECONDS, STAGE_SECONDS
+
+# Endpoint label for work done outside an HTTP request (startup, scripts)
+NO_ENDPOINT = "none"
+
+# Query parameter / header that add the stage breakdown to JSON responses
+DEBUG_PARAM = "debug_timings"
+DEBUG_HEADER = b"x-debug-timings"
+
+
+class RequestTimings:
+    """Stage durations collected while one request is handled."""
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None, debug: bool = False):
+        self.scope = scope
+        self.debug = debug
+        self.started = time.perf_counter()
+        self.stages: Dict[str, list] = {}
+        self.prompt_tokens = {"input": 0, "cached": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        # The router fills in the matched route; unmatched paths share one label
+        route = (self.scope or {}).get("route")
+        return getattr(route, "path", None) or ("unmatched" if self.scope else NO_ENDPOINT)
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_prompt_tokens(self, input_tokens: int, cached_tokens: int) -> None:
+        with self._lock:
+            self.prompt_tokens["input"] += input_tokens
+            self.prompt_tokens["cached"] += cached_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {"ms": round(seconds * 1000, 3), "count": count}
+                for stage, (seconds, count) in self.stages.items()
+            }
+            prompt_tokens = dict(self.prompt_tokens)
+        summary = {"total_ms": round((time.perf_counter() - self.started) * 1000, 3), "stages": stages}
+        if prompt_tokens["input"]:
+            summary["prompt_tokens"] = prompt_tokens
+        return summary
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value, one metric per stage."""
+
+        parts = []
+        with self._lock:
+            for stage, (seconds, count) in self.stages.items():
+                part = f"{stage};dur={seconds * 1000:.1f}"
+                if count > 1:
+                    part += f';desc="{count} calls"'
+                parts.append(part)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record_stage(stage: str, seconds: float, model: str = "", tool: str = "") -> None:
+    """Add a stage duration to the current request and the stage histogram."""
+
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+    STAGE_SECONDS.observe(
+        seconds,
+        endpoint=timings.endpoint if timings is not None else NO_ENDPOINT,
+        stage=stage,
+        model=model,
+        tool=tool,
+    )
+
+
+def record_prompt_tokens(input_tokens: int, cached_tokens: int, prefix: str = "") -> None:
+    """Count one model call's prompt tokens, and the cached part, for the current endpoint."""
+
+    timings = _current.get()
+    if timings is not None:
+        timings.add_prompt_tokens(input_tokens, cached_tokens)
+    endpoint = timings.endpoint if timings is not None else NO_ENDPOINT
+    PROMPT_TOKENS.inc(input_tokens, endpoint=endpoint, prefix=prefix or "none", kind="input")
+    PROMPT_TOKENS.inc(cached_tokens, endpoint=endpoint, prefix=prefix or "none", kind="cached")
+
+
+def prompt_usage(response) -> Optional[Tuple[int, int]]:
+    """(input tokens, cached input tokens) from an ``LLMResult``, or None without usage data."""
+
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                details = usage.get("input_token_details") or {}
+                return usage.get("input_tokens", 0), details.get("cache_read", 0) or 0
+    return None
+
+
+@contextmanager
+def stage_span(stage: str, model: str = "", tool: str = "") -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, model=model, tool=tool)
+
+
+def attach_timings(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Add ``timings`` to a JSON response body when the request asked for it."""
+
+    timings = _current.get()
+    if timings is not None and timings.debug:
+        payload["timings"] = timings.summary()
+    return payload
+
+
+class StageTimingCallback(BaseCallbackHandler):
+    """Times LLM and tool runs of any graph it is passed to via ``callbacks``.
+
+    Streamed model calls also record ``llm_first_token``, and every model
+    call's prompt and cached tokens are counted under its ``prompt_cache_key``.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._starts: Dict[UUID, tuple] = {}
+        # run id -> prompt_cache_key of model calls still running
+        self._prefixes: Dict[UUID, str] = {}
+        self._first_token_pending: set = set()
+
+    def _start(self, run_id: UUID, stage: str, **labels: str) -> None:
+        self._starts[run_id] = (time.perf_counter(), stage, labels)
+
+    def _end(self, run_id: UUID) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            start, stage, labels = started
+            record_stage(stage, time.perf_counter() - start, **labels)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs) -> None:
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name") or "unknown"
+        self._start(run_id, "llm", model=model)
+        self._prefixes[run_id] = (kwargs.get("invocation_params") or {}).get("prompt_cache_key") or ""
+        self._first_token_pending.add(run_id)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs) -> None:
+        if run_id in self._first_token_pending:
+            self._first_token_pending.discard(run_id)
+            started = self._starts.get(run_id)
+            if started is not None:
+                record_stage("llm_first_token", time.perf_counter() - started[0], **started[2])
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs) -> None:
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name") or "unknown"
+        self._start(run_id, "llm", model=model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        self._first_token_pending.discard(run_id)
+        prefix = self._prefixes.pop(run_id, "")
+        usage = prompt_usage(response)
+        if usage is not None:
+            record_prompt_tokens(*usage, prefix=prefix)
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._first_token_pending.discard(run_id)
+        self._prefixes.pop(run_id, None)
+        self._end(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs) -> None:
+        self._start(run_id, "tool", tool=(serialized or {}).get("name") or kwargs.get("name") or "unknown")
+
+    def on_tool_end(self, output, *, run_id, **kwargs) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs) -> None:
+        self._end(run_id)
+
+
+STAGE_CALLBACK = StageTimingCallback()
+
+
+def with_stage_timing(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a graph ``config`` that reports LLM and tool timings."""
+
+    return {**config, "callbacks": [*(config.get("callbacks") or []), STAGE_CALLBACK]}
+
+
+def _wants_debug(scope: Dict[str, Any]) -> bool:
+    if any(name == DEBUG_HEADER and value not in (b"", b"0", b"false") for name, value in scope.get("headers", [])):
+        return True
+    query = scope.get("query_string", b"").decode("latin-1")
+    return any(part in (DEBUG_PARAM, f"{DEBUG_PARAM}=1", f"{DEBUG_PARAM}=true") for part in query.split("&"))
+
+
+class TimingMiddleware:
+    """ASGI middleware: per-request stage timings, Server-Timing header, request histogram."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope, debug=_wants_debug(scope))
+        token = _current.set(timings)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - timings.started,
+                endpoint=timings.endpoint,
+                method=scope.get("method", ""),
+                status=f"{status['code'] // 100}xx",
+            )
@@ -0,0 +1,49 @@
+import logging
+import math
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English/Malay listing text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str = "gpt-4.1"):
+    """tiktoken encoding for ``model``, or None when it cannot be loaded.
+
+    tiktoken downloads its BPE files on first use; offline hosts fall back
+    to a character estimate instead of failing the request.
+    """
+
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:
+        logger.warning(f"tiktoken encoding for {model} unavailable ({exc}); estimating tokens from characters")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4.1") -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4.1") -> str:
+    """Longest prefix of ``text`` that fits in ``max_tokens``."""
+
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,34 @@
+"""Units and amount suffixes shared by the free-text listing parsers.
+
+Both the v1 preference parser and the v2 filter fast path read these, so a
+message means the same price and size whichever endpoint receives it.
+"""
+
+import re
+from typing import Iterable, Optional
+
+SQFT_PER_ACRE = 43560.0
+SQFT_PER_SQM = 10.7639
+METRES_PER_FOOT = 0.3048
+
+# Amount suffix -> multiplier. A bare "m" is million in an amount ("RM2m",
+# budget "2m"); where a message may also hold lengths ("12m ceiling"), the
+# parser has to settle it from context and decline when it cannot.
+AMOUNT_MULTIPLIERS = {
+    'k': 1e3, 'thousand': 1e3,
+    'm': 1e6, 'mil': 1e6, 'million': 1e6, 'mln': 1e6, 'mn': 1e6, 'mio': 1e6, 'juta': 1e6,
+    'b': 1e9, 'bil': 1e9, 'billion': 1e9,
+}
+
+
+def amount_suffix_pattern(exclude: Iterable[str] = ()) -> str:
+    """Regex alternation of the amount suffixes, longest first."""
+
+    suffixes = sorted(set(AMOUNT_MULTIPLIERS) - set(exclude), key=len, reverse=True)
+    return "|".join(re.escape(s) for s in suffixes)
+
+
+def parse_amount(number: str, suffix: Optional[str] = None) -> float:
+    """``"1,250"`` / ``"2.5", "mil"`` -> value with the suffix applied."""
+
+    return float(number.replace(',', '')) * AMOUNT_MULTIPLIERS.get((suffix or '').lower(), 1.0)
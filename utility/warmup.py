@@ -0,0 +1,112 @@
+import importlib
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utility.env import env_bool, env_str
+from utility.timing import stage_span
+
+logger = logging.getLogger(__name__)
+
+# Kept out of src.index's import graph so /health starts fast; imported here instead
+DEFERRED_MODULES = ("langchain_openai", "agent.v1.orchestrator")
+
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+def _import_deferred() -> None:
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+
+
+def _llm_client() -> None:
+    from agent.v2.registry import DEFAULT_MODEL
+    from utility.llm_init import load_llm
+
+    # Builds the shared HTTP clients the SDK caches per process
+    load_llm(model=DEFAULT_MODEL)
+
+
+def _mongo_client() -> Optional[str]:
+    if not env_str("MONGODB_PW"):
+        return SKIPPED
+
+    from utility.property_listing_init import _ensure_client
+
+    _ensure_client()
+    return None
+
+
+def _listing_indexes() -> Optional[str]:
+    if not env_bool("MONGO_ENSURE_INDEXES", False) or not env_str("MONGODB_PW"):
+        return SKIPPED
+
+    from agent.v2.tools.mongo_indexes import ensure_indexes
+    from utility.property_listing_init import get_property_listing_collections
+
+    ensure_indexes(get_property_listing_collections())
+    return None
+
+
+def _listing_index() -> Optional[str]:
+    from agent.v2.tools.listing_index import get_listing_index, get_search_engine
+
+    if get_search_engine() != "memory" or not env_str("MONGODB_PW"):
+        return SKIPPED
+    get_listing_index().ensure_fresh()
+    return None
+
+
+def _location_index() -> Optional[str]:
+    from agent.v2.tools.listing_index import get_search_engine
+    from agent.v2.tools.location_index import get_location_match, get_location_resolver
+
+    # The memory engine resolves locations from its own ListingIndex
+    if get_search_engine() != "mongo" or get_location_match() != "index" or not env_str("MONGODB_PW"):
+        return SKIPPED
+    get_location_resolver().ensure_fresh()
+    return None
+
+
+def _agents(checkpointer) -> Optional[str]:
+    if checkpointer is None:
+        return SKIPPED
+
+    from agent.v2.registry import warm_agents
+
+    warm_agents(checkpointer)
+    return None
+
+
+def warm_up(checkpointer: Any = None) -> Dict[str, Any]:
+    """Pre-import, pre-compile and pre-connect before the first request.
+
+    Blocking; run it in the thread pool. A failing step is logged and the
+    others still run. Returns milliseconds per step (or ``skipped``/``failed``).
+    """
+
+    steps: List[Tuple[str, Callable[[], Optional[str]]]] = [
+        ("imports", _import_deferred),
+        ("llm_client", _llm_client),
+        ("mongo_connect", _mongo_client),
+        ("listing_indexes", _listing_indexes),
+        ("listing_index", _listing_index),
+        ("location_index", _location_index),
+        ("agents", lambda: _agents(checkpointer)),
+    ]
+
+    report: Dict[str, Any] = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            with stage_span(f"warmup_{name}"):
+                outcome = step()
+        except Exception as exc:
+            logger.warning("Warm-up step %s failed: %s", name, exc, exc_info=True)
+            report[name] = FAILED
+            continue
+        report[name] = outcome or round((time.perf_counter() - start) * 1000, 1)
+
+    logger.info("Warm-up finished: %s", report)
+    return report